@@ -20,7 +20,7 @@ class ApplicationLifecycle:
             for proxy in working_proxies:
                 await self.container.proxy_manager.add_proxy(proxy)
 
-            self.logger.info(f"Loaded {len(working_proxies)} working proxies")
+            self.logger.info("Loaded %s working proxies", len(working_proxies))
 
         self.logger.info("Lampa Proxy Server started successfully")
 
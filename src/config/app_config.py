@@ -30,6 +30,8 @@ class AppConfig(IConfig):
         self._our_domain = os.getenv('OUR_DOMAIN', '')
         self._our_scheme = os.getenv('OUR_SCHEME', 'http')
         self._replace_m3u8_domains = os.getenv('REPLACE_M3U8_DOMAINS', 'true').lower() == 'true'
+        # URL с видеорасширением стримится сразу, без предварительной пробы контента
+        self._trust_video_extensions = os.getenv('TRUST_VIDEO_EXTENSIONS', 'true').lower() == 'true'
 
         self._video_indicators = [
             'video/', 'application/x-mpegurl', 'application/vnd.apple.mpegurl',
@@ -181,6 +183,10 @@ class AppConfig(IConfig):
     def video_content_types(self) -> List[str]:
         return self._video_content_types
 
+    @property
+    def trust_video_extensions(self) -> bool:
+        return self._trust_video_extensions
+
     @property
     def proxy_list(self) -> List[str]:
         return self._proxy_list
@@ -1,6 +1,6 @@
 import httpx
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, List, Any, AsyncGenerator
+from typing import Callable, Dict, Optional, List, Any, AsyncGenerator
 from fastapi.responses import StreamingResponse
 
 from src.models.responses import (
@@ -63,6 +63,10 @@ class IConfig(ABC):
     @abstractmethod
     def video_patterns(self) -> List[str]: ...
 
+    @property
+    @abstractmethod
+    def trust_video_extensions(self) -> bool: ...
+
     @property
     @abstractmethod
     def proxy_list(self) -> List[str]: ...
@@ -79,7 +83,10 @@ class IProxyManager(ABC):
     """Интерфейс менеджера прокси"""
 
     @abstractmethod
-    async def validate_proxies(self, proxy_list: List[str]) -> List[str]: ...
+    async def validate_proxies(self, proxy_list: List[str], max_working: Optional[int] = None) -> List[str]: ...
+
+    @abstractmethod
+    def add_listener(self, callback: Callable[[], None]): ...
 
     @abstractmethod
     async def add_proxy(self, proxy: str) -> bool: ...
@@ -88,10 +95,19 @@ class IProxyManager(ABC):
     def get_random_proxy(self) -> Optional[str]: ...
 
     @abstractmethod
-    async def mark_proxy_success(self, proxy: str): ...
+    def get_proxy_p2c(self) -> Optional[str]: ...
+
+    @abstractmethod
+    def mark_proxy_success(self, proxy: str): ...
+
+    @abstractmethod
+    def mark_proxy_failure(self, proxy: str): ...
 
     @abstractmethod
-    async def mark_proxy_failure(self, proxy: str): ...
+    def release_proxy(self, proxy: str): ...
+
+    @abstractmethod
+    def record_rtt(self, proxy: str, rtt: float): ...
 
     @abstractmethod
     def get_stats(self) -> ProxyStatsResponse: ...
@@ -112,10 +128,16 @@ class IProxyGenerator(ABC):
     async def get_proxy(self) -> Optional[str]: ...
 
     @abstractmethod
-    async def mark_success(self, proxy: str): ...
+    def mark_success(self, proxy: str): ...
 
     @abstractmethod
-    async def mark_failure(self, proxy: str): ...
+    def mark_failure(self, proxy: str): ...
+
+    @abstractmethod
+    def release(self, proxy: str): ...
+
+    @abstractmethod
+    def record_rtt(self, proxy: str, rtt: float): ...
 
     @abstractmethod
     def has_proxies(self) -> bool: ...
@@ -133,6 +155,9 @@ class IHttpClientFactory(ABC):
                           proxy: str = None,
                           timeout: httpx.Timeout = None) -> AsyncGenerator[httpx.AsyncClient, None]: ...
 
+    @abstractmethod
+    def discard_proxy_clients(self, proxy: str): ...
+
     @abstractmethod
     async def cleanup(self): ...
 
@@ -151,7 +176,7 @@ class IVideoStreamerProcessor(ABC):
     async def stream_video(self,
                          target_url: str,
                          request_headers: Dict,
-                         range_header: str = None) -> StreamingResponse: ...
+                         range_header: str = None) -> Optional[StreamingResponse]: ...
 
 
 class IRequestProcessor(ABC):
@@ -162,7 +187,7 @@ class IRequestProcessor(ABC):
                            target_url: str,
                            method: str = 'GET',
                            data: Any = None,
-                           headers: Dict = None) -> AsyncGenerator[ProxyResponse, None]: ...
+                           headers: Dict = None) -> ProxyResponse: ...
 
 
 class Im3u8Processor(ABC):
@@ -173,7 +198,8 @@ class Im3u8Processor(ABC):
                            target_url: str,
                            method: str = 'GET',
                            data: Any = None,
-                           headers: Dict = None) -> AsyncGenerator[ProxyResponse, None]: ...
+                           headers: Dict = None,
+                           content_info: Optional[ContentInfoResponse] = None) -> Optional[StreamingResponse]: ...
 
 
 class IContentProcessor(ABC):
@@ -1,4 +1,5 @@
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Union
 from pydantic import BaseModel
 
 
@@ -29,7 +30,7 @@ class ProxyResponse(BaseModel):
     cookie: List[str]
     headers: Dict[str, Any]
     status: int
-    body: str
+    body: Union[bytes, str]
     error: Optional[str] = None
 
 
@@ -40,7 +41,9 @@ class VideoStreamResponse(BaseModel):
     supports_range: bool
 
 
-class ContentInfoResponse(BaseModel):
+@dataclass(slots=True, frozen=True)
+class ContentInfoResponse:
+    """Результат пробы контента. Внутренний объект, не сериализуется - валидация pydantic не нужна"""
     status_code: int
     content_type: str
     content_length: int
@@ -48,6 +51,7 @@ class ContentInfoResponse(BaseModel):
     headers: Dict[str, str]
     method_used: str
     error: Optional[str] = None
+    content: Optional[bytes] = None
 
 
 class ProxyStatsResponse(BaseModel):
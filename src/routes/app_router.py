@@ -1,15 +1,28 @@
 from datetime import datetime
 from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.responses import JSONResponse, Response
 
 from src.models.interfaces import IRouter, IContentProcessor, IHttpClientFactory, IProxyManager, IConfig
 from src.services.handlers.request_handler import RequestHandler
 from src.models.responses import (
-    HealthResponse, ProxyResponse, RootResponse,
+    HealthResponse, RootResponse,
     ApiInfoResponse
 )
 
 
+def _has_request_body(headers) -> bool:
+    """
+    Есть ли у запроса тело: request.stream() всегда истинен, поэтому без этой проверки
+    запрос без тела ушел бы в исходный сервер пустым chunked телом
+    """
+    if 'chunked' in headers.get('Transfer-Encoding', '').lower():
+        return True
+    try:
+        return int(headers.get('Content-Length', '0')) > 0
+    except ValueError:
+        return False
+
+
 class AppRouter(IRouter):
     """Роутер приложения с поддержкой всех типов запросов"""
 
@@ -69,7 +82,7 @@ class AppRouter(IRouter):
 
                 # Логируем Range заголовок для отладки перемотки
                 if 'Range' in request_headers:
-                    self.logger.info(f"Client Range header: {request_headers['Range']}")
+                    self.logger.info("Client Range header: %s", request_headers['Range'])
 
                 post_data = None
 
@@ -88,11 +101,15 @@ class AppRouter(IRouter):
                         elif 'application/json' in content_type:
                             post_data = await request.json()
 
-                        else:
-                            post_data = await request.body()
+                        elif _has_request_body(request.headers):
+                            # Тело не буферизуется, а передается потоком в исходный сервер.
+                            # Известный размер передаем дальше, иначе тело уйдет chunked
+                            post_data = request.stream()
+                            if content_length := request.headers.get('Content-Length'):
+                                request_headers['Content-Length'] = content_length
 
                     except Exception as e:
-                        self.logger.error(f"Error reading request body: {str(e)}")
+                        self.logger.error("Error reading request body: %s", e)
                         return JSONResponse(
                             content={'error': f'Failed to read request body: {str(e)}'},
                             status_code=400
@@ -112,8 +129,8 @@ class AppRouter(IRouter):
                     request_headers
                 )
 
-                # Если результат - StreamingResponse (видео), возвращаем его как есть
-                if isinstance(response_body, StreamingResponse):
+                # Готовый ответ (видео поток, m3u8, сериализованный enc3) возвращаем как есть
+                if isinstance(response_body, Response):
                     return response_body
 
                 # Обработка ошибок
@@ -124,16 +141,8 @@ class AppRouter(IRouter):
                         headers={'Access-Control-Allow-Origin': '*'}
                     )
 
-                # Вывод всего объекта ProxyResponse
-                if 'application/json' in response_content_type and isinstance(response_body, ProxyResponse):
-                    return JSONResponse(
-                        content=response_body.dict(),
-                        status_code=response_status,
-                        headers={'Access-Control-Allow-Origin': '*'}
-                    )
-
-                # Вывод тела сообщения
-                if 'application/json' in response_content_type:
+                # Вывод тела сообщения (сырые bytes отдаем как есть)
+                if 'application/json' in response_content_type and not isinstance(response_body, bytes):
                     return JSONResponse(
                         content=response_body,
                         status_code=response_status,
@@ -159,7 +168,7 @@ class AppRouter(IRouter):
                 )
 
             except Exception as e:
-                self.logger.error(f"Proxy request error: {str(e)}")
+                self.logger.error("Proxy request error: %s", e)
                 return JSONResponse(
                     status_code=500,
                     content={'error': f'Internal server error: {str(e)}'},
@@ -1,5 +1,7 @@
-from typing import Dict, Any, Optional, Tuple, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
+import asyncio
 import json
+import urllib.parse
 from fastapi import HTTPException
 from fastapi.responses import StreamingResponse, JSONResponse, Response
 
@@ -12,6 +14,31 @@ from src.utils.url_utils import (
 from src.models.responses import ProxyResponse
 
 
+# Заголовки, которые можно передать в закодированных параметрах
+FORWARD_HEADERS = frozenset({
+    'User-Agent', 'Origin', 'Referer', 'Cookie', 'Content-Type', 'Accept',
+    'x-csrf-token', 'Sec-Fetch-Dest', 'Sec-Fetch-Mode', 'Sec-Fetch-Site',
+    'Authorization', 'Range'
+})
+
+# Типы закодированных запросов
+ENCODED_HANDLERS = frozenset({'enc', 'enc1', 'enc2', 'enc3'})
+
+# Количество параметров enc2, сверх которого декодирование уходит в поток
+THREAD_DECODE_THRESHOLD = 4
+
+
+def _decode_params(segments: List[str]) -> List[Optional[str]]:
+    """Декодирует base64 параметры enc2, невалидные заменяются на None"""
+    decoded = []
+    for segment in segments:
+        try:
+            decoded.append(decode_base64_url(segment))
+        except Exception:
+            decoded.append(None)
+    return decoded
+
+
 class RequestHandler:
     """Обработчик запросов с поддержкой всех типов кодирования"""
 
@@ -36,19 +63,20 @@ class RequestHandler:
         if query_params is None:
             query_params = {}
 
-        segments = [s for s in path.strip('/').split('/') if s]
-        self.logger.info(f"Handling {method} request: /{path}")
+        # Для классификации достаточно первого сегмента пути
+        handler_type = path.lstrip('/').split('/', 1)[0]
+        self.logger.debug("Handling %s request: /%s", method, path)
 
-        if not segments:
+        if not handler_type:
             return {'error': 'Empty request path'}, 400, 'application/json'
 
-        handler_type = segments[0]
-        self.logger.info(f"Using handler: {handler_type}")
+        self.logger.debug("Using handler: %s", handler_type)
 
         try:
-            if handler_type in ['enc', 'enc1', 'enc2', 'enc3']:
+            if handler_type in ENCODED_HANDLERS:
+                # Полный список сегментов нужен только закодированным запросам
                 response = await self._handle_encoded_request(
-                    segments,
+                    [s for s in path.split('/') if s],
                     method,
                     post_data,
                     query_params,
@@ -66,7 +94,7 @@ class RequestHandler:
         except HTTPException:
             raise
         except Exception as e:
-            self.logger.error(f"Request handling error: {str(e)}")
+            self.logger.error("Request handling error: %s", e)
             return {'error': f'Internal server error: {str(e)}'}, 500, 'application/json'
 
     async def _handle_encoded_request(
@@ -78,7 +106,7 @@ class RequestHandler:
         request_headers: Dict
     ) -> Tuple[Any, int, str]:
         """Обработка закодированных запросов (enc/enc1/enc2/enc3)"""
-        self.logger.info(f"Processing encoded {method} request with {len(segments)} segments")
+        self.logger.debug("Processing encoded %s request with %d segments", method, len(segments))
 
         if len(segments) < 2:
             raise ValueError("Invalid encoded request - not enough segments")
@@ -89,7 +117,7 @@ class RequestHandler:
 
         # Декодируем base64 данные
         decoded_data = decode_base64_url(encoded_part)
-        self.logger.info(f"Decoded data: {decoded_data} from encoded: {handler_type}")
+        self.logger.debug("Decoded data: %s from encoded: %s", decoded_data, handler_type)
 
         # Парсим параметры из декодированных данных
         encoded_params, url_segments_from_encoded = parse_encoded_data(decoded_data)
@@ -107,36 +135,26 @@ class RequestHandler:
             if not url_segments_from_encoded:
                 raise ValueError("No URL found in encoded data for enc2")
 
-            for param in additional_segments:
-                try:
-                    # Декодируем base64 данные
-                    decoded_data = decode_base64_url(param)
-                    if decoded_data:
-                        # Безопасное разбиение на параметры
-                        new_params = {}
-                        for pair in decoded_data.split('&'):
-                            if '=' in pair:
-                                key, value = pair.split('=', 1)
-                                new_params[key] = value
-                            else:
-                                # Обработка параметров без значения
-                                new_params[pair] = None
-
-                        query_params = {**query_params, **new_params}
-
-                except Exception as e:
-                    continue
+            # Большие пачки параметров декодируем вне event loop
+            if len(additional_segments) > THREAD_DECODE_THRESHOLD:
+                decoded_params = await asyncio.to_thread(_decode_params, additional_segments)
+            else:
+                decoded_params = _decode_params(additional_segments)
+
+            for decoded_data in decoded_params:
+                if decoded_data:
+                    # Параметры без значения сохраняются с пустой строкой
+                    new_params = dict(urllib.parse.parse_qsl(decoded_data, keep_blank_values=True))
+                    query_params = {**query_params, **new_params}
 
             target_url = build_url(url_segments_from_encoded, query_params)
 
         if isinstance(encoded_params, dict):
-            for key in ['User-Agent', 'Origin', 'Referer', 'Cookie', 'Content-Type', 'Accept',
-                        'x-csrf-token', 'Sec-Fetch-Dest', 'Sec-Fetch-Mode', 'Sec-Fetch-Site',
-                        'Authorization', 'Range']:
-                if key in encoded_params:
-                    request_headers[key] = encoded_params[key]
+            for key, value in encoded_params.items():
+                if key in FORWARD_HEADERS:
+                    request_headers[key] = value
 
-        self.logger.info(f"Proxying {method} with encode type {handler_type} request to: {target_url}")
+        self.logger.info("Proxying %s with encode type %s request to: %s", method, handler_type, target_url)
 
         # Обработка Range заголовка для видео
         range_header = request_headers.get('Range')
@@ -151,7 +169,7 @@ class RequestHandler:
         )
 
         # Обработка результата в зависимости от типа кодирования
-        if isinstance(result, StreamingResponse):
+        if isinstance(result, Response):
             return result, 200, ''
 
         if isinstance(result, ProxyResponse):
@@ -164,17 +182,30 @@ class RequestHandler:
                     response_body = json.loads(response_body)
 
             elif handler_type == 'enc3':
-                if 'text/html' in response_content_type or 'text/plain' in response_content_type and is_valid_json(response_body):
-                    response_content_type = 'application/json'
-                    response_body = result
-
-                elif 'application/json' in response_content_type:
-                    response_body = result
+                if ('text/html' in response_content_type or 'text/plain' in response_content_type and is_valid_json(response_body)
+                        or 'application/json' in response_content_type):
+                    # ProxyResponse сериализуется один раз, минуя jsonable_encoder в роутере
+                    return self._json_envelope(result), response_status, 'application/json'
 
             return response_body, response_status, response_content_type
 
         return result, 500, 'application/octet-stream'
 
+    def _with_text_body(self, result: ProxyResponse) -> ProxyResponse:
+        """Декодирует тело ответа для сериализации всего ProxyResponse в JSON"""
+        if isinstance(result.body, bytes):
+            result.body = result.body.decode('utf-8', errors='replace')
+        return result
+
+    def _json_envelope(self, result: ProxyResponse) -> Response:
+        """Готовый JSON ответ со всем ProxyResponse"""
+        return Response(
+            content=self._with_text_body(result).model_dump_json(),
+            status_code=result.status,
+            media_type='application/json',
+            headers={'Access-Control-Allow-Origin': '*'}
+        )
+
     async def _handle_direct_request(
         self,
         path: str,
@@ -186,7 +217,7 @@ class RequestHandler:
         """Обработка прямых URL запросов"""
         target_url = build_url([path], query_params)
 
-        self.logger.info(f"Proxying {method} request to: {target_url}")
+        self.logger.info("Proxying %s request to: %s", method, target_url)
 
         # Обработка Range заголовка
         range_header = request_headers.get('Range')
@@ -1,11 +1,75 @@
+import re
 import urllib.parse
-from typing import Dict, Any
+from dataclasses import replace
+from enum import IntFlag
+from functools import lru_cache
+from typing import Dict, Any, Iterable, Optional, Pattern, Tuple
+
+from cachetools import TTLCache
 
 from src.models.responses import ContentInfoResponse
 from src.utils.logger import get_logger
 from src.models.interfaces import IContentProcessor, IConfig, IHttpClientFactory, IContentInfoGetter, IVideoStreamerProcessor, IRequestProcessor, Im3u8Processor
 
 
+M3U8_MAGIC = b'#extm3u'
+# Расширения плейлистов: по ним нельзя сразу стримить, нужен m3u8 процессор
+PLAYLIST_EXTENSIONS = ('.m3u8', '.m3u')
+M3U8_BYTES_INDICATORS = (b'#ext-x-version:', b'#ext-inf:', b'#ext-x-targetduration:')
+
+# Кэш информации о контенте для повторных проб одного URL
+CONTENT_INFO_CACHE_SIZE = 2048
+CONTENT_INFO_CACHE_TTL = 30
+# Ответы на запросы с этими заголовками зависят от клиента и не кэшируются.
+# Range клиента сюда не входит: проба всегда запрашивает первые байты файла
+UNCACHEABLE_HEADERS = ('Authorization', 'Cookie')
+# Файлы больше этого размера с поддержкой Range считаются возможным видео
+VIDEO_SIZE_THRESHOLD = 1000000
+
+
+class VideoSignal(IntFlag):
+    """Признаки видео контента, по которым принимается решение о стриминге"""
+    NONE = 0
+    CONTENT_TYPE = 1
+    OCTET_STREAM = 2
+    SIZE_RANGE = 4
+
+
+def _compile_substrings(substrings: Iterable[str]) -> Optional[Pattern]:
+    """
+    Собирает подстроки в одно регулярное выражение: поиск любой из них за один проход.
+    Подстроки приводятся к нижнему регистру - сравниваются с URL и content-type в нижнем регистре
+    """
+    substrings = list(dict.fromkeys(substring.lower() for substring in substrings))
+    if not substrings:
+        return None
+    return re.compile('|'.join(map(re.escape, substrings)))
+
+
+@lru_cache(maxsize=4096)
+def _has_extension(url_lower: str, extensions: Tuple[str, ...]) -> bool:
+    """Кэшируемая проверка расширения в пути URL"""
+    # urlsplit оставляет в пути параметры сегмента (/video.mp4;jsessionid=x), их отбрасываем
+    path = urllib.parse.urlsplit(url_lower).path.partition(';')[0]
+    return bool(path) and path.endswith(extensions)
+
+
+@lru_cache(maxsize=4096)
+def _classify_url(url_lower: str, extensions: Tuple[str, ...], patterns: Optional[Pattern]) -> bool:
+    """Кэшируемая проверка URL по расширениям и паттернам видео"""
+    # Проверяем расширения файлов
+    if _has_extension(url_lower, extensions):
+        return True
+
+    return patterns is not None and patterns.search(url_lower) is not None
+
+
+@lru_cache(maxsize=1024)
+def _classify_content_type(content_type_lower: str, indicators: Optional[Pattern]) -> bool:
+    """Кэшируемая проверка content-type по индикаторам видео"""
+    return indicators is not None and indicators.search(content_type_lower) is not None
+
+
 class ContentProcessor(IContentProcessor):
     """Основной процессор контента"""
 
@@ -24,6 +88,20 @@ class ContentProcessor(IContentProcessor):
         self.m3u8_processor = m3u8_processor
         self.logger = get_logger('content-processor', self.config.log_level)
 
+        # Кортеж и скомпилированные выражения хешируемы и используются как ключи кэша классификации
+        # Суффиксы для одного вызова str.endswith; URL сравнивается в нижнем регистре
+        self._video_extensions = tuple(ext.lower() for ext in self.config.video_extensions)
+        # Расширения, по которым видео определяется без сетевой пробы
+        self._direct_video_extensions = tuple(
+            ext for ext in self._video_extensions if ext not in PLAYLIST_EXTENSIONS
+        ) if self.config.trust_video_extensions else ()
+        # Все паттерны ищутся в URL одним проходом регулярного выражения
+        self._video_patterns = _compile_substrings(self.config.video_patterns)
+        self._video_indicators = _compile_substrings(self.config.video_indicators)
+
+        # URL -> ContentInfoResponse без тела или False для отрицательного результата
+        self._info_cache = TTLCache(maxsize=CONTENT_INFO_CACHE_SIZE, ttl=CONTENT_INFO_CACHE_TTL)
+
     async def process_content(self,
                            target_url: str,
                            method: str = 'GET',
@@ -34,10 +112,26 @@ class ContentProcessor(IContentProcessor):
         if headers is None:
             headers = {}
 
-        self.logger.info(f"Processing {method} content to: {target_url}")
+        self.logger.debug("Processing %s content to: %s", method, target_url)
 
         if method.upper() == 'GET':
 
+            # Видеофайл с известным расширением: проба контента не нужна,
+            # стример сам запросит размер файла
+            if self._is_direct_video_url(target_url):
+                self.logger.debug("Video detected by extension: %s", target_url)
+                response = await self.video_streamer.stream_video(
+                    target_url, headers, range_header)
+                if response is not None:
+                    return response
+
+                # Источник ответил ошибкой: ее отдает обычный процессор с исходным статусом
+                return await self.request_processor.process_request(
+                    target_url,
+                    method,
+                    data,
+                    headers)
+
             content_info = await self._content_info(target_url,headers)
             if content_info:
 
@@ -45,85 +139,107 @@ class ContentProcessor(IContentProcessor):
                 is_m3u8 = await self._is_m3u8_content(target_url, content_info)
                 if is_m3u8:
                     return await self.m3u8_processor.process_request(
-                        target_url, method, data,headers)
+                        target_url, method, data, headers, content_info)
 
                 # Проверка на наличие файла для потокового воспроизведения
                 is_video = await self._is_video_content(target_url, content_info)
                 if is_video:
-                    return await self.video_streamer.stream_video(
+                    response = await self.video_streamer.stream_video(
                         target_url, headers, range_header)
+                    if response is not None:
+                        return response
 
         # Для не-GET запросов или не-видео контента используем обычный процессор
-        async for result in self.request_processor.process_request(
+        return await self.request_processor.process_request(
             target_url,
             method,
             data,
-            headers):
-            return result
+            headers)
 
-    async def _content_info(self, url: str, headers: Dict) -> bool | ContentInfoResponse:
+    async def _content_info(self, url: str, headers: Dict, cache_bust: bool = False) -> bool | ContentInfoResponse:
         """Получение информации о контенте"""
+        cacheable = not any(header in headers for header in UNCACHEABLE_HEADERS)
+        if cacheable and not cache_bust:
+            cached = self._info_cache.get(url)
+            if cached is not None:
+                self.logger.debug("Content info cache hit: %s", url)
+                return cached
+
         try:
-            content_info = await self.content_getter.get_content_info(url, headers, use_head=True)
+            # Ranged GET вместо HEAD: заодно получаем первые байты для проверки на m3u8
+            content_info = await self.content_getter.get_content_info(url, headers, use_head=False)
 
+            # Сетевые ошибки не кэшируем - следующая попытка может быть успешной
             if content_info.error:
-                self.logger.warning(f"Error checking m3u8 content: {content_info.error}")
+                self.logger.warning("Error checking m3u8 content: %s", content_info.error)
                 return False
 
             if content_info.status_code not in [200, 206]:
-                return False
+                content_info = False
+
+            if cacheable:
+                await self._cache_content_info(url, content_info)
 
             return content_info
 
         except Exception as e:
-            self.logger.warning(f"Error checking m3u8 content: {str(e)}")
+            self.logger.warning("Error checking m3u8 content: %s", e)
             return False
 
+    async def _cache_content_info(self, url: str, content_info: bool | ContentInfoResponse):
+        """
+        Кэширует только метаданные пробы. Плейлисты не кэшируются совсем: живой HLS плейлист
+        обновляется чаще TTL, а его начало M3U8Processor отдает без повторного запроса
+        """
+        if not content_info:
+            self._info_cache[url] = content_info
+        elif not await self._is_m3u8_content(url, content_info):
+            self._info_cache[url] = replace(content_info, content=None)
+
     async def _is_video_content(self, target_url: str, content_info:ContentInfoResponse) -> bool:
         """Улучшенная проверка видео контента с использованием HEAD запросов"""
         if not self._is_video_url(target_url):
             return False
 
+        signals = self._video_signals(content_info)
+        if signals:
+            self.logger.info("Video detected by %s: %s (content-type: %s, %d bytes)",
+                             signals.name, target_url, content_info.content_type, content_info.content_length)
+        return bool(signals)
+
+    def _video_signals(self, content_info: ContentInfoResponse) -> VideoSignal:
+        """Собирает признаки видео за один проход, URL проверяется вызывающим кодом"""
         content_type = content_info.content_type.lower()
+        signals = VideoSignal.NONE
 
         # Проверяем content-type
-        for indicator in self.config.video_indicators:
-            if indicator in content_type:
-                self.logger.info(f"Video detected by content-type: {content_type}")
-                return True
+        if _classify_content_type(content_type, self._video_indicators):
+            signals |= VideoSignal.CONTENT_TYPE
 
-        # Дополнительные проверки для специфических типов
-        if 'octet-stream' in content_type and self._is_video_url(target_url):
-            self.logger.info(f"Video detected as octet-stream with video URL: {target_url}")
-            return True
-
-        # Проверяем по другим заголовкам
-        content_length = content_info.content_length
-        accept_ranges = content_info.accept_ranges.lower()
+        # Дополнительные проверки для специфических типов: URL уже проверен вызывающим кодом
+        if 'octet-stream' in content_type:
+            signals |= VideoSignal.OCTET_STREAM
 
         # Большие файлы с поддержкой range запросов могут быть видео
-        if content_length > 1000000 and accept_ranges == 'bytes':
-            self.logger.info(f"Possible video detected by size and range support: {content_length} bytes")
-            return True
+        if content_info.content_length > VIDEO_SIZE_THRESHOLD and content_info.accept_ranges.lower() == 'bytes':
+            signals |= VideoSignal.SIZE_RANGE
 
-        return False
+        return signals
 
     def _is_video_url(self, url: str) -> bool:
         """Проверяет, является ли URL видеофайлом по расширению и паттернам"""
-        url_lower = url.lower()
-        url_parts = urllib.parse.urlparse(url_lower)
+        return _classify_url(url.lower(), self._video_extensions, self._video_patterns)
 
-        # Проверяем расширения файлов
-        if url_parts.path and any(url_parts.path.endswith(ext) for ext in self.config.video_extensions):
-            return True
-
-        return any(pattern in url_lower for pattern in self.config.video_patterns)
+    def _is_direct_video_url(self, url: str) -> bool:
+        """Проверяет, можно ли стримить URL без пробы контента - только по расширению"""
+        if not self._direct_video_extensions:
+            return False
+        return _has_extension(url.lower(), self._direct_video_extensions)
 
     def _is_video_content_type(self, content_type: str) -> bool:
         if not content_type:
             return False
-        content_type_lower = content_type.lower()
-        return any(indicator in content_type_lower for indicator in self.config.video_indicators)
+        return _classify_content_type(content_type.lower(), self._video_indicators)
 
     async def _is_m3u8_content(self, target_url: str, content_info:ContentInfoResponse) -> bool:
         """Проверяет, является ли контент m3u8 плейлистом"""
@@ -142,14 +258,14 @@ class ContentProcessor(IContentProcessor):
 
         # Проверяем содержимое ответа на наличие признаков m3u8
         if hasattr(content_info, 'content') and content_info.content:
-            content_sample = content_info.content[:1024].decode('utf-8', errors='ignore').lower()
+            # Проверяем байты напрямую, без декодирования в строку
+            content_sample = content_info.content[:1024].lower()
             # M3U8 файлы обычно начинаются с #EXTM3U
-            if content_sample.startswith('#extm3u'):
+            if content_sample.startswith(M3U8_MAGIC):
                 return True
 
             # Или содержат типичные m3u8 теги
-            m3u8_indicators = ['#ext-x-version:', '#ext-inf:', '#ext-x-targetduration:']
-            if any(indicator in content_sample for indicator in m3u8_indicators):
+            if any(indicator in content_sample for indicator in M3U8_BYTES_INDICATORS):
                 return True
 
         return False
@@ -1,14 +1,22 @@
 import re
 import urllib.parse
-from typing import Dict, Any, AsyncGenerator
+from contextlib import AsyncExitStack
+from typing import Dict, Any, AsyncGenerator, Optional
+
+from fastapi.responses import StreamingResponse
 
 from src.utils.url_utils import encode_base64_url
 from src.utils.logger import get_logger
 from src.models.interfaces import IRequestProcessor, IConfig, IHttpClientFactory, IProxyGenerator, ITimeoutConfigurator
-from src.models.responses import ProxyResponse
+from src.models.responses import ContentInfoResponse
 
 
 URL_PATTERN = re.compile(r'https?://[^\s"\',]+|/[^\s"\',]*', flags=re.IGNORECASE)
+URI_ATTR_PATTERN = re.compile(r'URI="([^"]+)"')
+
+M3U8_CHUNK_SIZE = 64 * 1024
+M3U8_URI_ATTR = 'URI="'
+M3U8_EMBEDDED_URL_CHARS = (' ', '\t', '"', "'", ',')
 
 
 class M3U8Processor(IRequestProcessor):
@@ -27,19 +35,51 @@ class M3U8Processor(IRequestProcessor):
         self.request_processor = request_processor
         self.logger = get_logger('m3u8-processor', self.config.log_level)
 
+        # Префикс enc2 ссылок пересчитывается только при смене схемы/домена
+        self._enc_prefix_key = None
+        self._enc_prefix_value = ''
+
+    @property
+    def _enc_prefix(self) -> str:
+        """Префикс вида scheme://domain/enc2/ для переписанных ссылок"""
+        key = (self.config.our_scheme, self.config.our_domain)
+        if key != self._enc_prefix_key:
+            self._enc_prefix_key = key
+            self._enc_prefix_value = f"{key[0]}://{key[1]}/enc2/"
+        return self._enc_prefix_value
+
     async def process_request(self,
                            target_url: str,
                            method: str = 'GET',
                            data: Any = None,
-                           headers: Dict = None) -> AsyncGenerator[ProxyResponse, None]:
+                           headers: Dict = None,
+                           content_info: Optional[ContentInfoResponse] = None) -> Optional[StreamingResponse]:
         """Обрабатывает m3u8 плейлист, подменяя домены на наш"""
 
+        # Плейлист целиком поместился в уже прочитанное начало файла - повторный запрос не нужен.
+        # При сжатии источника размер относится к сжатому телу, такое начало не используем
+        prefix = content_info.content if content_info else None
+        if (prefix and len(prefix) == content_info.content_length
+                and not content_info.headers.get('content-encoding')):
+            self.logger.debug("Using prefetched m3u8 playlist: %s", target_url)
+            content = prefix.decode('utf-8', errors='replace')
+            return StreamingResponse(
+                iter((self._replace_domains_in_m3u8(content, target_url).encode('utf-8'),)),
+                media_type='application/vnd.apple.mpegurl',
+                headers={
+                    'Cache-Control': 'no-cache',
+                    'Access-Control-Allow-Origin': '*'
+                }
+            )
+
         return await self._process_m3u8_playlist(target_url, headers)
 
-    async def _process_m3u8_playlist(self, target_url: str, headers: Dict) -> ProxyResponse:
-        """Обрабатывает m3u8 плейлист, подменяя домены на наш"""
+    async def _process_m3u8_playlist(self, target_url: str, headers: Dict) -> Optional[StreamingResponse]:
+        """Обрабатывает m3u8 плейлист потоково, подменяя домены на наш"""
+        stack = AsyncExitStack()
+        proxy = None
         try:
-            self.logger.info(f"Processing m3u8 playlist: {target_url}")
+            self.logger.debug("Processing m3u8 playlist: %s", target_url)
 
             request_headers = headers.copy()
 
@@ -48,69 +88,110 @@ class M3U8Processor(IRequestProcessor):
             timeout_multiplier = 1
             if proxy:
                 timeout_multiplier = 10
+                # Прокси занят, пока открыт поток: возвращается вместе с закрытием стека
+                stack.callback(self.proxy_generator.release, proxy)
 
             # Создаем таймаут для запроса
             timeout = self.timeout_configurator.create_timeout_config(timeout_multiplier)
 
-            # Получаем содержимое m3u8 плейлиста
-            async with self.http_factory.create_client(
+            # Клиент и поток остаются открытыми до конца отдачи плейлиста
+            client = await stack.enter_async_context(self.http_factory.create_client(
                 headers=request_headers,
                 is_video=False,
                 follow_redirects=False,
                 verify_ssl=False,
                 proxy=proxy,
                 timeout=timeout
-            ) as client:
+            ))
 
-                response = await client.get(target_url)
+            response = await stack.enter_async_context(client.stream('GET', target_url))
 
-                self.logger.info(f"Response status: {response.status_code}")
+            self.logger.debug("Response status: %s", response.status_code)
 
-                if response.status_code == 200:
+            if proxy:
+                self.proxy_generator.mark_success(proxy)
 
-                    # Подменяем домены в плейлисте
-                    modified_content = self._replace_domains_in_m3u8(response.text, target_url)
+            if response.status_code != 200:
+                await stack.aclose()
+                return None
 
-                    return ProxyResponse(
-                        currentUrl=str(target_url),
-                        cookie=[],
-                        headers={
-                            'Content-Type': 'application/vnd.apple.mpegurl',
-                            'Cache-Control': 'no-cache'
-                        },
-                        status=response.status_code,
-                        body=modified_content
-                    )
+            return StreamingResponse(
+                self._create_m3u8_generator(response, target_url, stack),
+                media_type='application/vnd.apple.mpegurl',
+                headers={
+                    'Cache-Control': 'no-cache',
+                    'Access-Control-Allow-Origin': '*'
+                }
+            )
 
         except Exception as e:
-            self.logger.error(f"Error processing m3u8 playlist: {str(e)}")
+            await stack.aclose()
+            self.logger.error("Error processing m3u8 playlist: %s", e)
+            if proxy:
+                self.proxy_generator.mark_failure(proxy)
             raise e
 
-            # В случае ошибки возвращаем оригинальный контент
-            # async for result in self.request_processor.process_request(target_url, method, data, headers):
-            #     return result
+    async def _create_m3u8_generator(self, response, base_url: str, stack: AsyncExitStack) -> AsyncGenerator[bytes, None]:
+        """Читает плейлист чанками и отдает переписанные строки по мере получения"""
+        async with stack:
+            tail = ''
+            async for chunk in response.aiter_text(chunk_size=M3U8_CHUNK_SIZE):
+                chunk = tail + chunk
+
+                # Незавершенную строку оставляем до следующего чанка
+                last_newline = max(chunk.rfind('\n'), chunk.rfind('\r'))
+                if last_newline == -1:
+                    tail = chunk
+                    continue
+
+                tail = chunk[last_newline + 1:]
+                yield self._replace_domains_in_m3u8(chunk[:last_newline + 1], base_url).encode('utf-8')
+
+            if tail:
+                yield self._replace_domains_in_m3u8(tail, base_url).encode('utf-8')
 
     def _replace_domains_in_m3u8(self, content: str, base_url: str) -> str:
-        """Упрощенная замена доменов в m3u8 плейлисте"""
+        """Построчная замена доменов в фрагменте m3u8 плейлиста"""
         try:
             if not self.config.our_domain:
                 return content
 
-            # Простой поиск и замена всех URL в контенте
-            def replace_url(match):
-                url = match.group(0)
-                if not url.startswith(('http://', 'https://')):
-                    url = urllib.parse.urljoin(base_url, url)
+            return ''.join(
+                self._rewrite_m3u8_line(line, base_url)
+                for line in content.splitlines(keepends=True)
+            )
 
-                parsed = urllib.parse.urlparse(url)
-                if parsed.netloc:  # Если есть домен - заменяем
-                    return f"{self.config.our_scheme}://{self.config.our_domain}/enc2/{encode_base64_url(url)}"
+        except Exception as e:
+            self.logger.error("Error replacing domains in m3u8: %s", e)
+            return content
 
-                return url
+    def _rewrite_m3u8_line(self, line: str, base_url: str) -> str:
+        """Переписывает одну строку плейлиста"""
+        if line.startswith('#'):
+            # В тегах URL встречается только в атрибуте URI="..." (KEY, MAP, MEDIA, I-FRAME...),
+            # остальные теги и комментарии в регулярное выражение не попадают
+            if M3U8_URI_ATTR in line:
+                return URI_ATTR_PATTERN.sub(
+                    lambda match: f'URI="{self._rewrite_one_url(match.group(1), base_url)}"', line)
+            return line
 
-            # Заменяем все URL в контенте
-            return URL_PATTERN.sub(replace_url, content)
+        url = line.strip()
+        if not url:
+            return line
 
-        except Exception as e:
-            self.logger.error(f"Error replacing domains in m3u8: {str(e)}")
-            return content
+        # Строка с URL внутри текста - полная обработка регулярным выражением
+        if any(char in url for char in M3U8_EMBEDDED_URL_CHARS):
+            return URL_PATTERN.sub(lambda match: self._rewrite_one_url(match.group(0), base_url), line)
+
+        return line.replace(url, self._rewrite_one_url(url, base_url), 1)
+
+    def _rewrite_one_url(self, url: str, base_url: str) -> str:
+        """Заменяет домен в одном URL на наш"""
+        if not url.startswith(('http://', 'https://')):
+            url = urllib.parse.urljoin(base_url, url)
+
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.netloc:  # Если есть домен - заменяем
+            return self._enc_prefix + encode_base64_url(url)
+
+        return url
@@ -1,9 +1,10 @@
 import re
 import urllib.parse
-from typing import Dict, Any, AsyncGenerator
+from typing import Dict, Any, AsyncIterable, AsyncIterator, List, Union
 import httpx
 
 from src.utils.logger import get_logger
+from src.utils.url_utils import DUPLICATE_PROTOCOL_PATTERN
 from src.models.interfaces import IRequestProcessor, IConfig, IHttpClientFactory, IProxyGenerator, ITimeoutConfigurator
 from src.models.responses import ProxyResponse
 
@@ -28,17 +29,17 @@ class RequestProcessor(IRequestProcessor):
     async def process_request(self,
                            target_url: str,
                            method: str = 'GET',
-                           data: Any = None,
-                           headers: Dict = None) -> AsyncGenerator[ProxyResponse, None]:
+                           data: Union[Dict, str, bytes, AsyncIterable[bytes], None] = None,
+                           headers: Dict = None) -> ProxyResponse:
         if headers is None:
             headers = {}
 
-        self.logger.info(f"Processing {method} request to: {target_url}")
+        self.logger.debug("Processing %s request to: %s", method, target_url)
         target_url = self._normalize_url(target_url)
 
         proxy = None
         try:
-            parsed = urllib.parse.urlparse(target_url)
+            parsed = urllib.parse.urlsplit(target_url)
             if not parsed.hostname:
                 raise ValueError(f"Invalid hostname: {target_url}")
 
@@ -54,11 +55,18 @@ class RequestProcessor(IRequestProcessor):
                 request_headers.update(headers)
 
             request_params = {}
+            body_chunks = None
             if method.upper() in ['POST', 'PUT', 'DELETE'] and data:
                 if isinstance(data, dict):
                     request_params['data'] = data
-                else:
+                elif isinstance(data, (bytes, str)):
                     request_params['content'] = data
+                else:
+                    # Асинхронный итератор отправляется потоково: с Content-Length клиента,
+                    # а без него httpx выставит Transfer-Encoding: chunked.
+                    # Прочитанное запоминаем - итератор одноразовый, а редирект повторит тело
+                    body_chunks = []
+                    request_params['content'] = self._record_stream(data, body_chunks)
 
             proxy = await self.proxy_generator.get_proxy() if self.proxy_generator.has_proxies() else None
 
@@ -81,38 +89,34 @@ class RequestProcessor(IRequestProcessor):
 
                 response = await client.request(method, target_url, **request_params)
 
-                self.logger.info(f"Response status: {response.status_code}")
+                self.logger.debug("Response status: %s", response.status_code)
 
                 # Обрабатываем редиректы
                 if response.status_code in [301, 302, 303, 307, 308]:
-                    async for redirect_result in self._handle_redirect(response, request_headers, method, data):
-                        yield redirect_result
-                    return
+                    if body_chunks is not None:
+                        data = b''.join(body_chunks)
+                    return await self._handle_redirect(response, request_headers, method, data)
 
                 if proxy:
-                    await self.proxy_generator.mark_success(proxy)
-
-                # Собираем cookies
-                cookies = []
-                resp_headers = {}
-                for name, value in response.headers.multi_items():
-                    name_lower = name.lower()
-                    if name_lower == 'set-cookie':
-                        cookies.append(value)
-                    resp_headers[name_lower] = value
+                    self.proxy_generator.mark_success(proxy)
+
+                # Ключи httpx.Headers.items() уже в нижнем регистре,
+                # cookies собираем отдельным списком
+                resp_headers = dict(response.headers.items())
+                cookies = response.headers.get_list('set-cookie')
                 resp_headers['set-cookie'] = cookies
 
-                yield ProxyResponse(
+                return ProxyResponse(
                     currentUrl=str(response.url),
                     cookie=cookies,
                     headers=resp_headers,
                     status=response.status_code,
-                    body=response.text
+                    body=response.content
                 )
 
         except httpx.TimeoutException:
-            self.logger.error(f"✕ Request timeout: {target_url}")
-            yield ProxyResponse(
+            self.logger.error("✕ Request timeout: %s", target_url)
+            return ProxyResponse(
                 currentUrl=target_url,
                 cookie=[],
                 headers={},
@@ -122,10 +126,10 @@ class RequestProcessor(IRequestProcessor):
             )
 
         except httpx.RequestError as e:
-            self.logger.error(f"✕ Request failed: {target_url} - {str(e)}")
+            self.logger.error("✕ Request failed: %s - %s", target_url, e)
             if proxy:
-                await self.proxy_generator.mark_failure(proxy)
-            yield ProxyResponse(
+                self.proxy_generator.mark_failure(proxy)
+            return ProxyResponse(
                 currentUrl=target_url,
                 cookie=[],
                 headers={},
@@ -135,10 +139,10 @@ class RequestProcessor(IRequestProcessor):
             )
 
         except Exception as e:
-            self.logger.error(f"✕ Unexpected error: {target_url} - {str(e)}")
+            self.logger.error("✕ Unexpected error: %s - %s", target_url, e)
             if proxy:
-                await self.proxy_generator.mark_failure(proxy)
-            yield ProxyResponse(
+                self.proxy_generator.mark_failure(proxy)
+            return ProxyResponse(
                 currentUrl=target_url,
                 cookie=[],
                 headers={},
@@ -147,7 +151,18 @@ class RequestProcessor(IRequestProcessor):
                 error=f'Unexpected error: {str(e)}'
             )
 
-    async def _handle_redirect(self, response, original_headers, method, data, redirect_count=0):
+        finally:
+            # Редирект и таймаут не отмечают прокси, но вернуть его нужно всегда
+            if proxy:
+                self.proxy_generator.release(proxy)
+
+    async def _record_stream(self, data: AsyncIterable[bytes], chunks: List[bytes]) -> AsyncIterator[bytes]:
+        """Передает тело потоково, сохраняя прочитанные чанки для повтора при редиректе"""
+        async for chunk in data:
+            chunks.append(chunk)
+            yield chunk
+
+    async def _handle_redirect(self, response, original_headers, method, data, redirect_count=0) -> ProxyResponse:
         if redirect_count >= self.config.max_redirects:
             raise ValueError(f"Too many redirects (max: {self.config.max_redirects})")
 
@@ -155,39 +170,34 @@ class RequestProcessor(IRequestProcessor):
             raise ValueError("Redirect response without Location header")
 
         redirect_url = response.headers['location']
-        self.logger.info(f"Following redirect {redirect_count + 1} to: {redirect_url}")
+        self.logger.info("Following redirect %d to: %s", redirect_count + 1, redirect_url)
 
         if not redirect_url.startswith(('http://', 'https://')):
-            parsed_original = urllib.parse.urlparse(str(response.url))
+            parsed_original = urllib.parse.urlsplit(str(response.url))
             base_url = f"{parsed_original.scheme}://{parsed_original.netloc}"
             redirect_url = urllib.parse.urljoin(base_url, redirect_url)
 
-        async for result in self.process_request(redirect_url, method, data, original_headers):
-            yield result
+        return await self.process_request(redirect_url, method, data, original_headers)
 
     def _normalize_url(self, url: str) -> str:
         if not url:
             raise ValueError("Empty URL")
 
-        self.logger.debug(f"Original URL for normalization: {url}")
+        self.logger.debug("Original URL for normalization: %s", url)
 
-        protocols = ['https://', 'http://']
-        for proto1 in protocols:
-            for proto2 in protocols:
-                duplicate = proto1 + proto2
-                if url.startswith(duplicate):
-                    url = url[len(proto1):]
-                    self.logger.debug(f"Removed duplicate protocol: {url}")
-                    break
+        # Убираем дублирующийся протокол
+        url, removed = DUPLICATE_PROTOCOL_PATTERN.subn('', url, count=1)
+        if removed:
+            self.logger.debug("Removed duplicate protocol: %s", url)
 
         if url.startswith('//'):
             url = 'https:' + url
-            self.logger.debug(f"Fixed protocol-relative URL: {url}")
+            self.logger.debug("Fixed protocol-relative URL: %s", url)
 
         url = URL_PATTERN.sub(r'\1/\2', url)
 
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
 
-        self.logger.debug(f"Normalized URL: {url}")
+        self.logger.debug("Normalized URL: %s", url)
         return url
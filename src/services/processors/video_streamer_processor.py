@@ -1,4 +1,6 @@
 import asyncio
+import logging
+import time
 from typing import Dict, Optional, Tuple, AsyncGenerator
 
 import httpx
@@ -10,6 +12,28 @@ from src.utils.logger import get_logger
 from src.models.interfaces import IVideoStreamerProcessor, IConfig, IHttpClientFactory, IContentInfoGetter, IProxyGenerator, ITimeoutConfigurator
 
 
+logger = get_logger('video-streamer')
+
+# Постоянная часть заголовков ответа, к ней добавляются тип и размер контента
+VIDEO_RESPONSE_HEADERS = {
+    'Accept-Ranges': 'bytes',
+    'Cache-Control': 'no-cache, no-store, must-revalidate, max-age=0',
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': '*',
+    'Access-Control-Expose-Headers': 'Content-Length, Content-Range, Accept-Ranges',
+    'X-Content-Type-Options': 'nosniff',
+    'X-Accel-Buffering': 'no',
+    'Connection': 'keep-alive',
+    'Keep-Alive': 'timeout=600',
+}
+
+# Статусы пробы источника, при которых видео стримится
+STREAMABLE_STATUSES = (200, 206)
+
+# Шаг отладочного лога прогресса потока
+PROGRESS_LOG_STEP = 10 * 1024 * 1024
+
+
 class VideoStreamerProcessor(IVideoStreamerProcessor):
     """Потоковая передача видео"""
 
@@ -24,15 +48,21 @@ class VideoStreamerProcessor(IVideoStreamerProcessor):
         self.content_getter = content_getter
         self.proxy_generator = proxy_generator
         self.timeout_configurator = timeout_configurator
-        self.logger = get_logger('video-streamer', self.config.log_level)
+        # Логгер общий для модуля, уровень задается конфигурацией, как и в get_logger
+        self.logger = logger
+        if self.config.log_level:
+            logger.setLevel(self.config.log_level)
 
     async def stream_video(self,
                            target_url: str,
                            request_headers: Dict,
-                           range_header: str = None) -> StreamingResponse:
-
+                           range_header: str = None) -> Optional[StreamingResponse]:
+        """
+        Потоковая передача видео. None - источник ответил ошибкой, такой ответ
+        отдается обычным процессором запросов с исходным статусом и телом
+        """
         self.logger.info(
-            f"Video content detected, using streaming: {target_url} with range {range_header}")
+            "Video content detected, using streaming: %s with range %s", target_url, range_header)
 
         content_info = await self.content_getter.get_content_info(
             target_url,
@@ -44,7 +74,12 @@ class VideoStreamerProcessor(IVideoStreamerProcessor):
                 status_code=500, detail=f"Failed to get video info: {content_info.error}")
 
         self.logger.info(
-            f"Content info: status={content_info.status_code}, size={content_info.content_length}, type={content_info.content_type}")
+            "Content info: status=%s, size=%s, type=%s", content_info.status_code, content_info.content_length, content_info.content_type)
+
+        if content_info.status_code not in STREAMABLE_STATUSES:
+            self.logger.warning(
+                "Source returned status %s, video streaming skipped: %s", content_info.status_code, target_url)
+            return None
 
         file_size = content_info.content_length
         content_type = content_info.content_type
@@ -53,22 +88,29 @@ class VideoStreamerProcessor(IVideoStreamerProcessor):
             self.logger.warning(
                 "File size is unknown, range requests may not work properly")
 
-        start_byte, end_byte = self._parse_range_header(
-            range_header, file_size)
+        # Без заголовка Range клиенту нужен весь файл: диапазон не разбираем
+        # и источнику его не передаем, чтобы тот мог отдать обычный 200
+        range_requested = bool(range_header)
+        if not range_requested:
+            start_byte, end_byte = 0, file_size - 1 if file_size > 0 else 0
 
-        self.logger.info(
-            f"Requested range: {start_byte}-{end_byte} (file size: {file_size})")
+        else:
+            start_byte, end_byte = self._parse_range_header(
+                range_header, file_size)
+
+            self.logger.info(
+                "Requested range: %s-%s (file size: %s)", start_byte, end_byte, file_size)
 
-        range_requested = False
-        if range_header or start_byte > 0 or (file_size > 0 and end_byte < file_size - 1):
             if file_size > 0:
                 request_headers['Range'] = f'bytes={start_byte}-{end_byte}'
             else:
                 request_headers['Range'] = f'bytes={start_byte}-'
 
-            range_requested = True
             self.logger.info(
-                f"Streaming Range to source: {request_headers['Range']}")
+                "Streaming Range to source: %s", request_headers['Range'])
+
+        # Поток передается без декодирования, поэтому сжатие у источника не запрашиваем
+        request_headers['Accept-Encoding'] = 'identity'
 
         stream_generator = self._create_stream_generator(
             target_url, request_headers)
@@ -111,47 +153,50 @@ class VideoStreamerProcessor(IVideoStreamerProcessor):
                 timeout=timeout
             ) as client:
 
+                started = time.perf_counter()
                 async with client.stream('GET', target_url) as response:
+                    if proxy:
+                        self.proxy_generator.record_rtt(proxy, time.perf_counter() - started)
+
                     self.logger.info(
-                        f"Source response status: {response.status_code}")
+                        "Source response status: %s", response.status_code)
 
                     if response.status_code == 404:
                         self.logger.error(
-                            f"Video not found (404): {target_url}")
+                            "Video not found (404): %s", target_url)
                         return
 
                     elif response.status_code == 416:
                         self.logger.error(
-                            f"Range not satisfiable (416): {target_url}")
+                            "Range not satisfiable (416): %s", target_url)
                         return
 
                     elif response.status_code >= 400:
                         self.logger.error(
-                            f"Source server error {response.status_code}: {target_url}")
+                            "Source server error %s: %s", response.status_code, target_url)
                         return
 
-                    response_content_type = response.headers.get(
-                        'content-type', '')
-
-                    content_range = response.headers.get('content-range', '')
-
-                    response_content_length = response.headers.get(
-                        'content-length', 'unknown')
+                    # Заголовки источника читаем один раз
+                    source_headers = response.headers
+                    response_content_type = source_headers.get('content-type', '')
+                    content_range = source_headers.get('content-range', '')
+                    response_content_length = source_headers.get('content-length', 'unknown')
 
                     self.logger.info(
-                        f"Video content-type: {response_content_type}")
-
-                    self.logger.info(f"Content-Range: {content_range}")
-
-                    self.logger.info(
-                        f"Content-Length: {response_content_length}")
+                        "Video content-type: %s, Content-Range: %s, Content-Length: %s",
+                        response_content_type, content_range, response_content_length)
 
                     # Определяем ожидаемое количество байт
                     expected_bytes = self._get_expected_bytes(
                         content_range, response_content_length)
 
-                    # Читаем и передаем данные чанками
-                    async for chunk in response.aiter_bytes(chunk_size=self.config.stream_chunk_size):
+                    # Уровень логирования проверяется один раз, а не на каждом чанке
+                    debug = self.logger.isEnabledFor(logging.DEBUG)
+                    # Чанки aiter_raw произвольного размера, поэтому прогресс пишется по порогу, а не по кратности
+                    next_log_at = PROGRESS_LOG_STEP
+
+                    # Передаем данные как есть, чанками источника: без декодирования и перенарезки
+                    async for chunk in response.aiter_raw():
                         if not stream_active:
                             break
 
@@ -162,63 +207,69 @@ class VideoStreamerProcessor(IVideoStreamerProcessor):
                         bytes_streamed += len(chunk)
 
                         # Логируем прогресс каждые 10MB для отладки
-                        if bytes_streamed % (10 * 1024 * 1024) == 0:
-                            self.logger.debug(f"Stream progress: {bytes_streamed // (1024 * 1024)}MB")
+                        if debug and bytes_streamed >= next_log_at:
+                            self.logger.debug("Stream progress: %dMB", bytes_streamed // (1024 * 1024))
+                            next_log_at = (bytes_streamed // PROGRESS_LOG_STEP + 1) * PROGRESS_LOG_STEP
 
                         # Проверяем, не достигли ли мы ожидаемого конца
                         if expected_bytes > 0 and bytes_streamed >= expected_bytes:
                             self.logger.info(
-                                f"Reached expected end of stream: {bytes_streamed}/{expected_bytes} bytes")
+                                "Reached expected end of stream: %d/%d bytes", bytes_streamed, expected_bytes)
                             yield chunk
                             break
 
                         yield chunk
 
                     self.logger.info(
-                        f"Video stream completed: {bytes_streamed} bytes streamed")
+                        "Video stream completed: %s bytes streamed", bytes_streamed)
 
                     if proxy:
-                        await self.proxy_generator.mark_success(proxy)
+                        self.proxy_generator.mark_success(proxy)
 
         except asyncio.CancelledError as e:
-            self.logger.info(f"Video stream was cancelled by client: {str(e)}")
+            self.logger.info("Video stream was cancelled by client: %s", e)
             stream_active = False
 
         except httpx.HTTPStatusError as e:
-            self.logger.error(f"HTTP error during video streaming: {e.response.status_code}")
+            self.logger.error("HTTP error during video streaming: %s", e.response.status_code)
             stream_active = False
 
         except httpx.TimeoutException:
-            self.logger.error(f"Video stream timeout: {target_url}")
+            self.logger.error("Video stream timeout: %s", target_url)
             stream_active = False
 
         except httpx.RequestError as e:
-            self.logger.error(f"Video stream request error: {str(e)}")
+            self.logger.error("Video stream request error: %s", e)
             stream_active = False
 
         except Exception as e:
-            self.logger.error(f"Unexpected video stream error: {str(e)}")
+            self.logger.error("Unexpected video stream error: %s", e)
             stream_active = False
             if proxy:
-                await self.proxy_generator.mark_failure(proxy)
+                self.proxy_generator.mark_failure(proxy)
+
+        finally:
+            # Ранний выход, отмена и закрытие генератора клиентом (GeneratorExit) тоже возвращают прокси
+            if proxy:
+                self.proxy_generator.release(proxy)
 
     def _get_expected_bytes(self, content_range: str, response_content_length: str) -> int:
         if content_range:
             # Парсим Content-Range: bytes start-end/total
             match = FULL_RANGE_MATCH_PATTERN.match(content_range)
-            if match:
+            if match and match.group(1) is not None:
                 range_start = int(match.group(1))
                 range_end = int(match.group(2))
                 expected_bytes = range_end - range_start + 1
                 self.logger.info(
-                    f"Expected bytes from Content-Range: {expected_bytes}")
+                    "Expected bytes from Content-Range: %s", expected_bytes)
                 return expected_bytes
 
         elif response_content_length != 'unknown':
             try:
                 expected_bytes = int(response_content_length)
                 self.logger.info(
-                    f"Expected bytes from Content-Length: {expected_bytes}")
+                    "Expected bytes from Content-Length: %s", expected_bytes)
                 return expected_bytes
 
             except ValueError:
@@ -232,18 +283,7 @@ class VideoStreamerProcessor(IVideoStreamerProcessor):
                                   start_byte: int,
                                   end_byte: int,
                                   file_size: int) -> Dict[str, str]:
-        response_headers = {
-            'Accept-Ranges': 'bytes',
-            'Cache-Control': 'no-cache, no-store, must-revalidate, max-age=0',
-            'Access-Control-Allow-Origin': '*',
-            'Access-Control-Allow-Headers': '*',
-            'Access-Control-Expose-Headers': 'Content-Length, Content-Range, Accept-Ranges',
-            'Content-Type': content_type,
-            'X-Content-Type-Options': 'nosniff',
-            'X-Accel-Buffering': 'no',
-            'Connection': 'keep-alive',
-            'Keep-Alive': 'timeout=600',
-        }
+        response_headers = {**VIDEO_RESPONSE_HEADERS, 'Content-Type': content_type}
 
         # Устанавливаем правильный статус код и заголовки
         if range_requested and file_size > 0:
@@ -251,11 +291,11 @@ class VideoStreamerProcessor(IVideoStreamerProcessor):
             response_headers['Content-Range'] = f'bytes {start_byte}-{end_byte}/{file_size}'
             response_headers['Content-Length'] = str(content_length)
             self.logger.info(
-                f"Sending 206 Partial Content: {content_length} bytes (range: {start_byte}-{end_byte})")
+                "Sending 206 Partial Content: %s bytes (range: %s-%s)", content_length, start_byte, end_byte)
 
         elif not range_requested and file_size > 0:
             response_headers['Content-Length'] = str(file_size)
-            self.logger.info(f"Sending 200 OK: {file_size} bytes")
+            self.logger.info("Sending 200 OK: %s bytes", file_size)
 
         else:
             self.logger.info(
@@ -267,40 +307,35 @@ class VideoStreamerProcessor(IVideoStreamerProcessor):
         if not range_header:
             return 0, file_size - 1 if file_size > 0 else 0
 
-        try:
-            range_match = RANGE_MATCH_PATTERN.match(range_header)
-            if not range_match:
-                return 0, file_size - 1 if file_size > 0 else 0
-
-            start = int(range_match.group(1))
-            end_str = range_match.group(2)
-
-            if end_str:
-                end = int(end_str)
-            else:
-                end = file_size - 1 if file_size > 0 else 0
-
-            if file_size > 0:
-                if start < 0:
-                    start = 0
-                if start >= file_size:
-                    start = file_size - 1
-                    end = file_size - 1
-                if end >= file_size:
-                    end = file_size - 1
-                if start > end:
-                    start, end = end, start
-
-            if file_size > 0 and (end - start) > self.config.max_range_size:
-                end = start + self.config.max_range_size - 1
-                if end >= file_size:
-                    end = file_size - 1
-
-            self.logger.debug(
-                f"Parsed range: {start}-{end} (file size: {file_size})")
-            return start, end
-
-        except Exception as e:
+        # Регулярное выражение пропускает только цифры, поэтому int() ниже не может упасть
+        range_match = RANGE_MATCH_PATTERN.match(range_header)
+        if not range_match:
             self.logger.error(
-                f"Error parsing range header '{range_header}': {str(e)}")
+                "Error parsing range header '%s': unsupported format", range_header)
             return 0, file_size - 1 if file_size > 0 else 0
+
+        start = int(range_match.group(1))
+        end_str = range_match.group(2)
+
+        if end_str:
+            end = int(end_str)
+        else:
+            end = file_size - 1 if file_size > 0 else 0
+
+        if file_size > 0:
+            if start >= file_size:
+                start = file_size - 1
+                end = file_size - 1
+            if end >= file_size:
+                end = file_size - 1
+            if start > end:
+                start, end = end, start
+
+        if file_size > 0 and (end - start) > self.config.max_range_size:
+            end = start + self.config.max_range_size - 1
+            if end >= file_size:
+                end = file_size - 1
+
+        self.logger.debug(
+            "Parsed range: %s-%s (file size: %s)", start, end, file_size)
+        return start, end
@@ -14,18 +14,31 @@ class DefaultProxyGenerator(IProxyGenerator):
         self.config = config
         self.logger = get_logger('proxy-generator', self.config.log_level)
 
+        # Наличие прокси пересчитывается лениво после изменения рабочего списка
+        self._has_proxies_cached: Optional[bool] = None
+        self.proxy_manager.add_listener(self._invalidate)
+
+    def _invalidate(self):
+        self._has_proxies_cached = None
+
     async def get_proxy(self) -> Optional[str]:
         if not self.has_proxies():
             return None
-        return self.proxy_manager.get_random_proxy()
+        return self.proxy_manager.get_proxy_p2c()
+
+    def mark_success(self, proxy: str):
+        self.proxy_manager.mark_proxy_success(proxy)
+
+    def mark_failure(self, proxy: str):
+        self.proxy_manager.mark_proxy_failure(proxy)
 
-    async def mark_success(self, proxy: str):
-        await self.proxy_manager.mark_proxy_success(proxy)
+    def release(self, proxy: str):
+        self.proxy_manager.release_proxy(proxy)
 
-    async def mark_failure(self, proxy: str):
-        await self.proxy_manager.mark_proxy_failure(proxy)
+    def record_rtt(self, proxy: str, rtt: float):
+        self.proxy_manager.record_rtt(proxy, rtt)
 
     def has_proxies(self) -> bool:
-        return (self.config.use_proxy and
-                self.proxy_manager.working_proxies and
-                len(self.proxy_manager.working_proxies) > 0)
+        if self._has_proxies_cached is None:
+            self._has_proxies_cached = bool(self.config.use_proxy and self.proxy_manager.working_proxies)
+        return self._has_proxies_cached
@@ -1,5 +1,8 @@
+import asyncio
 import random
-from typing import List, Dict, Optional
+from collections import defaultdict
+from functools import lru_cache
+from typing import Callable, List, Dict, Optional
 
 import httpx
 
@@ -8,6 +11,45 @@ from src.models.interfaces import IHttpClientFactory, ITimeoutConfigurator, IPro
 from src.models.responses import ProxyStatsResponse
 
 
+# Сколько прокси проверяется одновременно
+PROXY_VALIDATION_CONCURRENCY = 20
+
+# URL для проверки работоспособности прокси
+PROXY_TEST_URLS = (
+    "https://ifconfig.me/ip",
+    "http://httpbin.org/ip",
+    "http://api.ipify.org?format=json"
+)
+
+# Схемы, с которыми прокси уже нормализован, и типичные порты SOCKS
+PROXY_SCHEMES = ('http://', 'https://', 'socks5://')
+SOCKS_PORTS = (':1080', ':9050')
+
+# Сглаживание задержки прокси (EWMA) и штраф в секундах за каждую ошибку сверх успехов
+PROXY_RTT_ALPHA = 0.2
+PROXY_FAILURE_PENALTY = 1.0
+
+logger = get_logger('proxy-manager')
+
+
+@lru_cache(maxsize=4096)
+def _normalize_proxy(proxy: str) -> str:
+    """
+    Нормализация формата прокси
+    """
+    proxy = proxy.strip()
+
+    # Добавляем схему если отсутствует
+    if not proxy.startswith(PROXY_SCHEMES):
+        # Пробуем определить тип прокси по порту или добавляем http:// по умолчанию
+        if any(port in proxy for port in SOCKS_PORTS):
+            proxy = f"socks5://{proxy}"
+        else:
+            proxy = f"http://{proxy}"
+
+    return proxy
+
+
 class ProxyManager(IProxyManager):
     """
     Менеджер для работы с прокси
@@ -20,37 +62,101 @@ class ProxyManager(IProxyManager):
         self.config = config
         self.http_factory = http_factory
         self.timeout_configurator = timeout_configurator
+        # Список нужен для random.choice, индекс позиций - для O(1) проверки и удаления
         self._working_proxies: List[str] = []
+        self._working_index: Dict[str, int] = {}
+        # Число выданных, но еще не возвращенных через release_proxy прокси
+        self._inflight: Dict[str, int] = defaultdict(int)
         self._proxy_stats: Dict[str, Dict[str, int]] = {}
-        self.logger = get_logger('proxy-manager', self.config.log_level)
+        # Суммы по статистике ведутся на ходу, get_stats их не пересчитывает
+        self._total_success = 0
+        self._total_failures = 0
+        # Сглаженное время до первого ответа через прокси, в секундах
+        self._rtt: Dict[str, float] = {}
+        self._listeners: List[Callable[[], None]] = []
+        # Логгер общий для модуля, уровень задается конфигурацией, как и в get_logger
+        self.logger = logger
+        if self.config.log_level:
+            logger.setLevel(self.config.log_level)
+
+    def add_listener(self, callback: Callable[[], None]):
+        """
+        Подписка на изменение списка рабочих прокси
+        """
+        self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in self._listeners:
+            callback()
 
-    async def validate_proxies(self, proxy_list: List[str]) -> List[str]:
+    async def validate_proxies(self, proxy_list: List[str], max_working: Optional[int] = None) -> List[str]:
         """
-        Валидация списка прокси
+        Валидация списка прокси. Если задан max_working, проверка прекращается,
+        как только найдено столько рабочих прокси
         """
         if not proxy_list:
             self.logger.warning("No proxies provided for validation")
             return []
 
-        working_proxies = []
-        self.logger.info(f"Starting validation of {len(proxy_list)} proxies...")
+        self.logger.info("Starting validation of %s proxies...", len(proxy_list))
 
         # Создаем таймаут для валидации прокси
         validation_timeout = self.timeout_configurator.create_timeout_config(30.0)
 
-        for i, proxy in enumerate(proxy_list, 1):
-            self.logger.debug(f"Testing proxy {i}/{len(proxy_list)}: {proxy}")
-            if await self.test_proxy(proxy, validation_timeout):
-                working_proxies.append(proxy)
-                self.logger.info(f"✓ Proxy validated: {proxy}")
-            else:
-                self.logger.warning(f"✗ Proxy failed: {proxy}")
+        # Прокси проверяются параллельно, таймауты не складываются
+        semaphore = asyncio.Semaphore(PROXY_VALIDATION_CONCURRENCY)
+
+        async def _validate(i: int, proxy: str) -> bool:
+            async with semaphore:
+                self.logger.debug("Testing proxy %s/%s: %s", i, len(proxy_list), proxy)
+                if await self.test_proxy(proxy, validation_timeout):
+                    self.logger.info("✓ Proxy validated: %s", proxy)
+                    return True
+
+                self.logger.warning("✗ Proxy failed: %s", proxy)
+                # Клиент проверки нерабочему прокси больше не понадобится
+                self.http_factory.discard_proxy_clients(_normalize_proxy(proxy))
+                return False
+
+        tasks = [asyncio.create_task(_validate(i, proxy)) for i, proxy in enumerate(proxy_list, 1)]
+        working_count = 0
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                try:
+                    ok = await next_result
+                except Exception:
+                    continue
+
+                if ok:
+                    working_count += 1
+                    if max_working and working_count >= max_working:
+                        break
+        finally:
+            # Оставшиеся проверки больше не нужны
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        working_proxies = [
+            proxy for proxy, task in zip(proxy_list, tasks)
+            if not task.cancelled() and task.exception() is None and task.result() is True
+        ]
+        if max_working:
+            working_proxies = working_proxies[:max_working]
 
         self.logger.info(
-            f"Proxy validation completed: {len(working_proxies)}/{len(proxy_list)} working")
+            "Proxy validation completed: %s/%s working", len(working_proxies), len(proxy_list))
 
         return working_proxies
 
+    @staticmethod
+    async def _probe_status(client, test_url: str) -> int:
+        """
+        Код ответа тестового URL без загрузки тела - для проверки живости его достаточно
+        """
+        async with client.stream('GET', test_url) as response:
+            return response.status_code
+
     async def test_proxy(self, proxy: str, timeout: httpx.Timeout = None) -> bool:
         """
         Тестирование отдельного прокси
@@ -61,7 +167,7 @@ class ProxyManager(IProxyManager):
 
         try:
             # Нормализуем формат прокси
-            normalized_proxy = self._normalize_proxy(proxy)
+            normalized_proxy = _normalize_proxy(proxy)
 
             async with self.http_factory.create_client(
                 proxy=normalized_proxy,
@@ -70,74 +176,53 @@ class ProxyManager(IProxyManager):
                 follow_redirects=True
             ) as client:
 
-                #response = await client.get("http://httpbin.org/ip")
-                # Используем несколько тестовых URL
-                test_urls = [
-                    "https://ifconfig.me/ip",
-                    "http://httpbin.org/ip",
-                    "http://api.ipify.org?format=json"
-                ]
+                # Все тестовые URL запрашиваются одновременно, побеждает первый ответ 200
+                tasks = {}
+                for test_url in PROXY_TEST_URLS:
+                    self.logger.info("Testing proxy %s with URL: %s", proxy, test_url)
+                    tasks[asyncio.create_task(self._probe_status(client, test_url))] = test_url
 
-                for test_url in test_urls:
-                    try:
-                        self.logger.info(f"Testing proxy {proxy} with URL: {test_url}")
-                        response = await client.get(test_url)
+                pending = set(tasks)
+                try:
+                    while pending:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
 
-                        if response.status_code == 200:
+                        for task in done:
+                            test_url = tasks[task]
                             try:
-                                response_content_type = response.headers.get('content-type', '').lower()
-                                if 'application/json' in response_content_type:
-                                    data = response.json()
-                                else:
-                                    data = response.read()
-
-                                #self.logger.info(f"✓ Proxy {proxy} is working with {test_url},: {data}")
+                                status_code = task.result()
+                            except Exception as e:
+                                self.logger.warning("✗ Proxy %s failed for %s: %s", proxy, test_url, e)
+                                continue
 
-                            except:
-                                self.logger.info(f"✗ Proxy test response text: {response.text[:200]}...")
+                            if status_code == 200:
+                                return True
 
-                            return True
+                            self.logger.warning("Proxy %s returned status %s for %s", proxy, status_code, test_url)
 
-                        else:
-                            self.logger.warning(f"Proxy {proxy} returned status {response.status_code} for {test_url}")
-
-                    except Exception as e:
-                        self.logger.warning(f"✗ Proxy {proxy} failed for {test_url}: {str(e)}")
-                        continue
+                finally:
+                    # Оставшиеся запросы больше не нужны
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
 
                 # Если ни один URL не сработал
-                self.logger.warning(f"✗ Proxy {proxy} failed for all test URLs")
+                self.logger.warning("✗ Proxy %s failed for all test URLs", proxy)
                 return False
 
 
         except httpx.ConnectError as e:
-            self.logger.warning(f"✗ Proxy {proxy} connection error: {str(e)}")
+            self.logger.warning("✗ Proxy %s connection error: %s", proxy, e)
             return False
 
         except httpx.TimeoutException:
-            self.logger.warning(f"✗ Proxy {proxy} timeout")
+            self.logger.warning("✗ Proxy %s timeout", proxy)
             return False
 
         except Exception as e:
-            self.logger.debug(f"Proxy test failed for {proxy}: {str(e)}")
+            self.logger.debug("Proxy test failed for %s: %s", proxy, e)
             return False
 
-    def _normalize_proxy(self, proxy: str) -> str:
-        """
-        Нормализация формата прокси
-        """
-        proxy = proxy.strip()
-
-        # Добавляем схему если отсутствует
-        if not proxy.startswith(('http://', 'https://', 'socks5://')):
-            # Пробуем определить тип прокси по порту или добавляем http:// по умолчанию
-            if ':1080' in proxy or ':9050' in proxy:
-                proxy = f"socks5://{proxy}"
-            else:
-                proxy = f"http://{proxy}"
-
-        return proxy
-
     async def add_proxy(self, proxy: str) -> bool:
         """
         Добавление прокси в рабочий список. Возвращает True если прокси добавлен
@@ -146,27 +231,85 @@ class ProxyManager(IProxyManager):
             self.logger.warning("Attempted to add empty proxy")
             return False
 
-        if proxy not in self._working_proxies:
+        if proxy not in self._working_index:
+            self._working_index[proxy] = len(self._working_proxies)
             self._working_proxies.append(proxy)
             self._proxy_stats[proxy] = {'success': 0, 'failures': 0}
-            self.logger.debug(f"Added proxy to working list: {proxy}")
+            self._notify()
+            self.logger.debug("Added proxy to working list: %s", proxy)
             return True
         else:
-            self.logger.debug(f"Proxy already in working list: {proxy}")
+            self.logger.debug("Proxy already in working list: %s", proxy)
             return False
 
+    def _selection_weights(self) -> List[int]:
+        """
+        Веса прокси для случайного выбора: успехи минус ошибки, но не меньше 1.
+        Не кэшируются: статистика меняется почти на каждом запросе, а штатный
+        выбор прокси в DefaultProxyGenerator идет через get_proxy_p2c
+        """
+        weights = []
+        for proxy in self._working_proxies:
+            stats = self._proxy_stats.get(proxy)
+            weights.append(max(1, stats['success'] - stats['failures']) if stats else 1)
+        return weights
+
     def get_random_proxy(self) -> Optional[str]:
         """
-        Получение случайного рабочего прокси
+        Получение случайного рабочего прокси, надежные прокси выбираются чаще
+        """
+        if not self._working_proxies:
+            self.logger.debug("No working proxies available")
+            return None
+
+        proxy = random.choices(self._working_proxies, weights=self._selection_weights())[0]
+        self.logger.debug("Selected random proxy: %s", proxy)
+        return proxy
+
+    def get_proxy_p2c(self) -> Optional[str]:
+        """
+        Выбор менее загруженного из двух случайных прокси (power of two choices)
         """
         if not self._working_proxies:
             self.logger.debug("No working proxies available")
             return None
 
-        proxy = random.choice(self._working_proxies)
-        self.logger.debug(f"Selected random proxy: {proxy}")
+        if len(self._working_proxies) < 2:
+            proxy = self._working_proxies[0]
+        else:
+            proxy = min(random.sample(self._working_proxies, 2), key=self._load_key)
+
+        self._inflight[proxy] += 1
+        self.logger.debug("Selected proxy (p2c): %s", proxy)
         return proxy
 
+    def _load_key(self, proxy: str) -> tuple:
+        """
+        Загрузка прокси: сначала незавершенные запросы, затем задержка со штрафом за ошибки.
+        Прокси без замеров считается быстрым, чтобы он тоже получал запросы
+        """
+        stats = self._proxy_stats.get(proxy)
+        penalty = PROXY_FAILURE_PENALTY * max(0, stats['failures'] - stats['success']) if stats else 0
+        return self._inflight.get(proxy, 0), self._rtt.get(proxy, 0.0) + penalty
+
+    def record_rtt(self, proxy: str, rtt: float):
+        """
+        Учет времени ответа через прокси в скользящем среднем
+        """
+        if proxy not in self._working_index:
+            return
+
+        previous = self._rtt.get(proxy)
+        self._rtt[proxy] = rtt if previous is None else PROXY_RTT_ALPHA * rtt + (1 - PROXY_RTT_ALPHA) * previous
+
+    def release_proxy(self, proxy: str):
+        """
+        Возврат прокси, выданного get_proxy_p2c. Вызывается ровно один раз на выдачу,
+        независимо от исхода запроса: отметки успеха и ошибки счетчик не трогают
+        """
+        if self._inflight.get(proxy, 0) > 0:
+            self._inflight[proxy] -= 1
+
     # def get_proxy_with_failover(self, excluded_proxies: List[str] = None) -> Optional[str]:
     #     """
     #     Получение прокси с исключением неудачных
@@ -196,16 +339,17 @@ class ProxyManager(IProxyManager):
     #     self.logger.debug(f"Selected proxy with failover: {selected_proxy}")
     #     return selected_proxy
 
-    async def mark_proxy_success(self, proxy: str):
+    def mark_proxy_success(self, proxy: str):
         """
         Отметка успешного использования прокси
         """
         if proxy and proxy in self._proxy_stats:
             self._proxy_stats[proxy]['success'] += 1
+            self._total_success += 1
             self.logger.debug(
-                f"Marked proxy success: {proxy} (successes: {self._proxy_stats[proxy]['success']})")
+                "Marked proxy success: %s (successes: %s)", proxy, self._proxy_stats[proxy]['success'])
 
-    async def mark_proxy_failure(self, proxy: str):
+    def mark_proxy_failure(self, proxy: str):
         """
         Отметка неудачного использования прокси
         """
@@ -214,22 +358,35 @@ class ProxyManager(IProxyManager):
 
         if proxy in self._proxy_stats:
             self._proxy_stats[proxy]['failures'] += 1
+            self._total_failures += 1
             failures = self._proxy_stats[proxy]['failures']
-            self.logger.warning(f"Marked proxy failure: {proxy} (failures: {failures})")
+            self.logger.warning("Marked proxy failure: %s (failures: %s)", proxy, failures)
 
             # Если слишком много ошибок, удаляем прокси
             if failures > 5:
-                await self.remove_proxy(proxy)
+                self.remove_proxy(proxy)
 
-    async def remove_proxy(self, proxy: str) -> bool:
+    def remove_proxy(self, proxy: str) -> bool:
         """
         Удаление прокси из рабочего списка. Возвращает True если прокси был удален
         """
-        if proxy in self._working_proxies:
-            self._working_proxies.remove(proxy)
-            if proxy in self._proxy_stats:
-                del self._proxy_stats[proxy]
-            self.logger.warning(f"Removed proxy from working list: {proxy}")
+        index = self._working_index.pop(proxy, None)
+        if index is not None:
+            # Последний элемент переносится на место удаляемого
+            last = self._working_proxies.pop()
+            if index < len(self._working_proxies):
+                self._working_proxies[index] = last
+                self._working_index[last] = index
+
+            stats = self._proxy_stats.pop(proxy, None)
+            if stats:
+                self._total_success -= stats['success']
+                self._total_failures -= stats['failures']
+            self._inflight.pop(proxy, None)
+            self._rtt.pop(proxy, None)
+            self.http_factory.discard_proxy_clients(proxy)
+            self._notify()
+            self.logger.warning("Removed proxy from working list: %s", proxy)
             return True
         return False
 
@@ -237,12 +394,12 @@ class ProxyManager(IProxyManager):
         """
         Получение статистики по прокси
         """
-        total_success = sum(stats.get('success', 0) for stats in self._proxy_stats.values())
-        total_failures = sum(stats.get('failures', 0) for stats in self._proxy_stats.values())
+        total_success = self._total_success
+        total_failures = self._total_failures
 
         self.logger.debug(
-            f"Proxy stats: {len(self._working_proxies)} working, "
-            f"{total_success} total successes, {total_failures} total failures"
+            "Proxy stats: %s working, %s total successes, %s total failures",
+            len(self._working_proxies), total_success, total_failures
         )
 
         return ProxyStatsResponse(
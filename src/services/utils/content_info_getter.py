@@ -1,3 +1,4 @@
+from dataclasses import replace
 from typing import Dict
 
 from src.utils.url_utils import FULL_RANGE_MATCH_PATTERN
@@ -6,6 +7,10 @@ from src.models.interfaces import IContentInfoGetter, IConfig, IHttpClientFactor
 from src.models.responses import ContentInfoResponse
 
 
+# Сколько первых байт читаем для определения типа контента
+SNIFF_SIZE = 2048
+
+
 class ContentInfoGetter(IContentInfoGetter):
     """Получение информации о контенте"""
 
@@ -29,12 +34,24 @@ class ContentInfoGetter(IContentInfoGetter):
                 head_info = await self._try_head_request(url, headers)
                 if head_info.content_length > 0:
                     return head_info
+            else:
+                sniff_info = await self._try_sniff_request(url, headers)
+                if sniff_info.content_length > 0:
+                    return sniff_info
+
+                if not sniff_info.error:
+                    # Сервер отдал весь файл без Range - размер уточняем через HEAD
+                    if sniff_info.status_code == 200:
+                        head_info = await self._try_head_request(url, headers)
+                        if head_info.content_length > 0:
+                            return replace(head_info, content=sniff_info.content)
+                    return sniff_info
 
             get_info = await self._try_get_requests(url, headers)
             return get_info
 
         except Exception as e:
-            self.logger.error(f"Failed to get content info for {url}: {str(e)}")
+            self.logger.error("Failed to get content info for %s: %s", url, e)
             return ContentInfoResponse(
                 status_code=0,
                 content_type='application/octet-stream',
@@ -46,8 +63,9 @@ class ContentInfoGetter(IContentInfoGetter):
             )
 
     async def _try_head_request(self, url: str, headers: Dict) -> ContentInfoResponse:
+        proxy = None
         try:
-            self.logger.debug(f"Trying HEAD request for: {url}")
+            self.logger.debug("Trying HEAD request for: %s", url)
             proxy = await self.proxy_generator.get_proxy() if self.proxy_generator.has_proxies() else None
 
             timeout_multiplier = 10.0
@@ -86,12 +104,12 @@ class ContentInfoGetter(IContentInfoGetter):
                 )
 
                 if proxy:
-                    await self.proxy_generator.mark_success(proxy)
+                    self.proxy_generator.mark_success(proxy)
 
                 return content_info
 
         except Exception as e:
-            self.logger.warning(f"HEAD request failed: {str(e)}")
+            self.logger.warning("HEAD request failed: %s", e)
             return ContentInfoResponse(
                 status_code=0,
                 content_type='',
@@ -102,6 +120,97 @@ class ContentInfoGetter(IContentInfoGetter):
                 error=str(e)
             )
 
+        finally:
+            if proxy:
+                self.proxy_generator.release(proxy)
+
+    async def _try_sniff_request(self, url: str, headers: Dict) -> ContentInfoResponse:
+        """GET первых SNIFF_SIZE байт: размер и начало файла за один запрос"""
+        proxy = None
+        try:
+            self.logger.debug("Trying ranged GET sniff for: %s", url)
+
+            sniff_headers = headers.copy()
+            sniff_headers['Range'] = f'bytes=0-{SNIFF_SIZE - 1}'
+            # Размер берется из заголовков, а начало тела - после декодирования:
+            # без сжатия они совпадают и начало файла можно отдать как есть
+            sniff_headers['Accept-Encoding'] = 'identity'
+
+            proxy = await self.proxy_generator.get_proxy() if self.proxy_generator.has_proxies() else None
+
+            timeout_multiplier = 10.0
+            if proxy:
+                timeout_multiplier = 30.0
+
+            timeout = self.timeout_configurator.create_timeout_config(timeout_multiplier)
+
+            async with self.http_factory.create_client(
+                headers=sniff_headers,
+                is_video=False,
+                follow_redirects=True,
+                verify_ssl=True,
+                proxy=proxy,
+                timeout=timeout
+            ) as client:
+
+                async with client.stream('GET', url) as response:
+                    # Сервер может проигнорировать Range - читаем не больше SNIFF_SIZE
+                    content = bytearray()
+                    async for chunk in response.aiter_bytes():
+                        content += chunk
+                        if len(content) >= SNIFF_SIZE:
+                            break
+
+                    content_info = ContentInfoResponse(
+                        status_code=response.status_code,
+                        content_type=response.headers.get('content-type', ''),
+                        content_length=self._parse_content_length(response),
+                        accept_ranges=response.headers.get('accept-ranges', 'bytes'),
+                        headers=dict(response.headers),
+                        method_used='GET_SNIFF',
+                        content=bytes(content[:SNIFF_SIZE])
+                    )
+
+                    if proxy:
+                        self.proxy_generator.mark_success(proxy)
+
+                    return content_info
+
+        except Exception as e:
+            self.logger.warning("Sniff request failed: %s", e)
+            if proxy:
+                self.proxy_generator.mark_failure(proxy)
+            return ContentInfoResponse(
+                status_code=0,
+                content_type='',
+                content_length=0,
+                accept_ranges='bytes',
+                headers={},
+                method_used='GET_SNIFF',
+                error=str(e)
+            )
+
+        finally:
+            if proxy:
+                self.proxy_generator.release(proxy)
+
+    def _parse_content_length(self, response) -> int:
+        """Полный размер файла из Content-Range (206) или Content-Length (200)"""
+        # Парсим Content-Range для определения полного размера
+        if response.status_code == 206 and 'content-range' in response.headers:
+            match = FULL_RANGE_MATCH_PATTERN.match(response.headers['content-range'])
+            if match:
+                return int(match.group(3))
+
+        # Используем Content-Length если доступен
+        elif response.status_code == 200 and response.headers.get('content-length'):
+            try:
+                return int(response.headers.get('content-length'))
+            except (ValueError, TypeError):
+                pass
+
+        return 0
+
     async def _try_get_requests(self, target_url: str, headers: Dict) -> ContentInfoResponse:
         strategies = [
             {'Range': 'bytes=0-0', 'description': 'Range 0-0'},
@@ -136,43 +245,31 @@ class ContentInfoGetter(IContentInfoGetter):
                 ) as client:
 
                     async with client.stream('GET', target_url) as response:
-                        content_length = 0
-
-                        # Парсим Content-Range для определения полного размера
-                        if response.status_code == 206 and 'content-range' in response.headers:
-                            content_range = response.headers['content-range']
-                            match = FULL_RANGE_MATCH_PATTERN.match(content_range)
-                            if match:
-                                content_length = int(match.group(3))
-
-                        # Используем Content-Length если доступен
-                        elif response.status_code == 200 and response.headers.get('content-length'):
-                            try:
-                                content_length = int(response.headers.get('content-length'))
-                            except (ValueError, TypeError):
-                                pass
-
                         content_info = ContentInfoResponse(
                             status_code=response.status_code,
                             content_type=response.headers.get('content-type', ''),
-                            content_length=content_length,
+                            content_length=self._parse_content_length(response),
                             accept_ranges=response.headers.get('accept-ranges', 'bytes'),
                             headers=dict(response.headers),
                             method_used=f"GET_{strategy.get('description', 'SIMPLE')}"
                         )
 
                         if proxy:
-                            await self.proxy_generator.mark_success(proxy)
+                            self.proxy_generator.mark_success(proxy)
 
                         return content_info
 
             except Exception as e:
-                self.logger.warning(f"GET strategy failed: {str(e)}")
+                self.logger.warning("GET strategy failed: %s", e)
                 if proxy:
-                    await self.proxy_generator.mark_failure(proxy)
+                    self.proxy_generator.mark_failure(proxy)
                 continue
 
-        self.logger.warning(f"Could not determine content length for: {url}")
+            finally:
+                if proxy:
+                    self.proxy_generator.release(proxy)
+
+        self.logger.warning("Could not determine content length for: %s", target_url)
         return ContentInfoResponse(
             status_code=0,
             content_type='',
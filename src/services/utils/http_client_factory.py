@@ -1,11 +1,64 @@
-from typing import Dict, AsyncGenerator
+import asyncio
+from typing import Dict, AsyncGenerator, Optional
 from contextlib import asynccontextmanager
+from http.cookiejar import CookieJar, DefaultCookiePolicy
 import httpx
 
 from src.utils.logger import get_logger
 from src.models.interfaces import IHttpClientFactory, IConfig, ITimeoutConfigurator
 
 
+# Пул соединений: HTTP/2 мультиплексирует запросы к одному источнику
+CLIENT_LIMITS = httpx.Limits(
+    max_keepalive_connections=200,
+    max_connections=500,
+    keepalive_expiry=30.0
+)
+
+
+def _no_cookies_jar() -> CookieJar:
+    """Cookie jar, который ничего не сохраняет: клиенты общие для всех запросов"""
+    return CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+
+
+def _timeout_key(timeout) -> tuple:
+    """Хешируемое представление таймаута для ключа кэша клиентов"""
+    try:
+        return (timeout.connect, timeout.read, timeout.write, timeout.pool)
+    except AttributeError:
+        return (timeout,)
+
+
+class PooledClient:
+    """Общий клиент из пула с заголовками конкретного запроса"""
+
+    __slots__ = ('client', 'headers')
+
+    def __init__(self, client: httpx.AsyncClient, headers: Dict):
+        self.client = client
+        self.headers = headers
+
+    def _with_headers(self, kwargs: Dict) -> Dict:
+        request_headers = kwargs.get('headers')
+        kwargs['headers'] = {**self.headers, **request_headers} if request_headers else self.headers
+        return kwargs
+
+    async def request(self, method: str, url, **kwargs) -> httpx.Response:
+        return await self.client.request(method, url, **self._with_headers(kwargs))
+
+    async def get(self, url, **kwargs) -> httpx.Response:
+        return await self.client.get(url, **self._with_headers(kwargs))
+
+    async def head(self, url, **kwargs) -> httpx.Response:
+        return await self.client.head(url, **self._with_headers(kwargs))
+
+    async def post(self, url, **kwargs) -> httpx.Response:
+        return await self.client.post(url, **self._with_headers(kwargs))
+
+    def stream(self, method: str, url, **kwargs):
+        return self.client.stream(method, url, **self._with_headers(kwargs))
+
+
 class HttpClientFactory(IHttpClientFactory):
     """Фабрика HTTP клиентов"""
 
@@ -16,6 +69,8 @@ class HttpClientFactory(IHttpClientFactory):
         self.timeout_configurator = timeout_configurator
         self.logger = get_logger('http-factory', self.config.log_level)
         self._client_cache = {}
+        # Фоновое закрытие клиентов выбывших прокси, cleanup() его дожидается
+        self._closing_tasks = set()
 
     @asynccontextmanager
     async def create_client(self,
@@ -24,7 +79,7 @@ class HttpClientFactory(IHttpClientFactory):
                           follow_redirects: bool = True,
                           verify_ssl: bool = False,
                           proxy: str = None,
-                          timeout: httpx.Timeout = None) -> AsyncGenerator[httpx.AsyncClient, None]:
+                          timeout: httpx.Timeout = None) -> AsyncGenerator[PooledClient, None]:
 
         if headers is None:
             headers = {}
@@ -33,22 +88,42 @@ class HttpClientFactory(IHttpClientFactory):
         if timeout is None:
             timeout = self.timeout_configurator.create_timeout_config()
 
-        client_params = {
-            'headers': headers.copy(),
-            'timeout': timeout,
-            'follow_redirects': follow_redirects,
-            'verify': verify_ssl
-        }
-
         if proxy:
-            client_params['proxy'] = proxy
-            self.logger.info(f"Using specified proxy: {proxy}")
+            self.logger.info("Using specified proxy: %s", proxy)
 
-        client = httpx.AsyncClient(**client_params)
-        try:
-            yield client
-        finally:
-            await client.aclose()
+        client = self._get_client(follow_redirects, verify_ssl, proxy, timeout)
+
+        # Клиент не закрывается на выходе: его соединения используют следующие запросы,
+        # закрываются клиенты в cleanup() при остановке приложения
+        yield PooledClient(client, headers.copy())
+
+    def _get_client(self,
+                    follow_redirects: bool,
+                    verify_ssl: bool,
+                    proxy: Optional[str],
+                    timeout: httpx.Timeout) -> httpx.AsyncClient:
+        """Клиент из кэша по параметрам соединения, создается при первом обращении"""
+        client_key = (proxy, verify_ssl, follow_redirects, _timeout_key(timeout))
+
+        client = self._client_cache.get(client_key)
+        if client is None:
+            client_params = {
+                'timeout': timeout,
+                'follow_redirects': follow_redirects,
+                'verify': verify_ssl,
+                'http2': True,
+                'limits': CLIENT_LIMITS,
+                'cookies': _no_cookies_jar()
+            }
+
+            if proxy:
+                client_params['proxy'] = proxy
+
+            client = httpx.AsyncClient(**client_params)
+            self._client_cache[client_key] = client
+            self.logger.debug("Created cached client: %s", client_key)
+
+        return client
 
     def get_client_cache_info(self) -> Dict:
         """Получение информации о кэше клиентов"""
@@ -62,13 +137,42 @@ class HttpClientFactory(IHttpClientFactory):
             }
         }
 
-    async def cleanup(self):
-        for client_key, client in self._client_cache.items():
-            try:
-                await client.aclose()
-                self.logger.debug(f"Closed cached client: {client_key}")
-            except Exception as e:
-                self.logger.warning(f"Error closing cached client {client_key}: {str(e)}")
+    def discard_proxy_clients(self, proxy: str):
+        """Убирает из кэша клиенты выбывшего прокси и закрывает их в фоне"""
+        client_keys = [client_key for client_key in self._client_cache if client_key[0] == proxy]
+        if not client_keys:
+            return
 
+        clients = [self._client_cache.pop(client_key) for client_key in client_keys]
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Вне цикла событий закрыть клиенты нельзя, из кэша они уже убраны
+            return
+
+        task = loop.create_task(self._close_clients(client_keys, clients))
+        self._closing_tasks.add(task)
+        task.add_done_callback(self._closing_tasks.discard)
+
+    async def _close_clients(self, client_keys, clients):
+        # Закрываем клиенты одновременно, ошибка одного не мешает остальным
+        results = await asyncio.gather(
+            *(client.aclose() for client in clients),
+            return_exceptions=True
+        )
+
+        for client_key, result in zip(client_keys, results):
+            if isinstance(result, Exception):
+                self.logger.warning("Error closing cached client %s: %s", client_key, result)
+            else:
+                self.logger.debug("Closed cached client: %s", client_key)
+
+    async def cleanup(self):
+        client_keys = list(self._client_cache)
+        clients = list(self._client_cache.values())
         self._client_cache.clear()
 
+        await self._close_clients(client_keys, clients)
+        await asyncio.gather(*self._closing_tasks, return_exceptions=True)
+
@@ -1,9 +1,29 @@
+from functools import lru_cache
+from typing import Optional
+
 import httpx
 
 from src.utils.logger import get_logger
 from src.models.interfaces import ITimeoutConfigurator, IConfig
 
 
+def _scale(value: Optional[float], timeout_multiplier: float) -> Optional[float]:
+    """Масштабирование таймаута, None (без ограничения) остается None"""
+    return None if value is None else value * timeout_multiplier
+
+
+@lru_cache(maxsize=32)
+def _make_timeout(connect: Optional[float], read: Optional[float], write: Optional[float],
+                  pool: Optional[float], timeout_multiplier: float) -> httpx.Timeout:
+    """Таймаут для набора значений, одинаковые параметры дают один и тот же объект"""
+    return httpx.Timeout(
+        connect=_scale(connect, timeout_multiplier),
+        read=_scale(read, timeout_multiplier),
+        write=_scale(write, timeout_multiplier),
+        pool=_scale(pool, timeout_multiplier)
+    )
+
+
 class TimeoutConfigurator(ITimeoutConfigurator):
     """Класс для конфигурации таймаутов HTTP клиентов"""
 
@@ -14,9 +34,14 @@ class TimeoutConfigurator(ITimeoutConfigurator):
     def create_timeout_config(self, timeout_multiplier: int = 1) -> httpx.Timeout:
         """Создание таймаута для клиента"""
 
-        return httpx.Timeout(
-            connect=self.config.timeout_connect * timeout_multiplier,
-            read=self.config.timeout_read * timeout_multiplier,
-            write=self.config.timeout_write * timeout_multiplier,
-            pool=self.config.timeout_pool * timeout_multiplier
+        return _make_timeout(
+            self.config.timeout_connect,
+            self.config.timeout_read,
+            self.config.timeout_write,
+            self.config.timeout_pool,
+            timeout_multiplier
         )
+
+    def cache_clear(self):
+        """Сброс кэша таймаутов (после перезагрузки конфигурации)"""
+        _make_timeout.cache_clear()
@@ -1,5 +1,10 @@
 import logging
 
+
+LOGGER_CONFIGURED_ATTR = '_lampa_configured'
+RESET_CODE = "\033[0m"
+
+
 class ColorFilter(logging.Filter):
     COLOR_CODES = {
         "DEBUG": "\033[90m",     # Серый
@@ -7,13 +12,20 @@ class ColorFilter(logging.Filter):
         "WARNING": "\033[93m",   # Желтый
         "ERROR": "\033[91m",     # Красный
         "CRITICAL": "\033[95m",  # Фиолетовый
-        "RESET": "\033[0m",      # Сброс цвета
+        "RESET": RESET_CODE,     # Сброс цвета
     }
 
+    # Пары (цвет, сброс) считаются один раз для всех записей
+    _LEVEL_TO_PAIR = {
+        level: (color, RESET_CODE)
+        for level, color in COLOR_CODES.items()
+        if level != "RESET"
+    }
+    _DEFAULT_PAIR = (RESET_CODE, RESET_CODE)
+
     def filter(self, record):
         # Добавляем цветовые коды в запись
-        record.color_code = self.COLOR_CODES.get(record.levelname, self.COLOR_CODES["RESET"])
-        record.reset_code = self.COLOR_CODES["RESET"]
+        record.color_code, record.reset_code = self._LEVEL_TO_PAIR.get(record.levelname, self._DEFAULT_PAIR)
         return True
 
 def get_logger(logger_name: str = __name__, log_level: int = None, filter=None):
@@ -22,6 +34,11 @@ def get_logger(logger_name: str = __name__, log_level: int = None, filter=None):
     if log_level:
         logger.setLevel(log_level)
 
+    # Повторный вызов для того же имени не должен добавлять еще один обработчик.
+    # Проверяем собственную метку: чужие обработчики (например, pytest) не мешают настройке
+    if getattr(logger, LOGGER_CONFIGURED_ATTR, False):
+        return logger
+
     logger.propagate = False
 
     handler = logging.StreamHandler()
@@ -42,5 +59,6 @@ def get_logger(logger_name: str = __name__, log_level: int = None, filter=None):
         handler.addFilter(filter)
 
     logger.addHandler(handler)
+    setattr(logger, LOGGER_CONFIGURED_ATTR, True)
 
     return logger
\ No newline at end of file
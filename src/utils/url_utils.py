@@ -1,34 +1,62 @@
 import re
 import urllib.parse
 import base64
+import binascii
 import json
-from typing import Dict, List, Tuple, Any, Optional
+from functools import lru_cache
+from typing import Dict, List, Tuple, Any, Optional, Union
+
+try:
+    # SIMD-реализация base64 (libbase64), API совместим со стандартным модулем
+    import pybase64 as base64_impl
+except ImportError:
+    base64_impl = base64
+
+try:
+    # Быстрый JSON-парсер, при его отсутствии используется стандартный модуль
+    import orjson as json_impl
+except ImportError:
+    json_impl = json
 
 
-URL_PATTERN = re.compile(r'(https?://[^\s]+)', flags=re.IGNORECASE)
 REPLACE_WRONG_SLASHES_PATTERN = re.compile(r"(https?:/)([^/])", flags=re.IGNORECASE)
 RANGE_MATCH_PATTERN= re.compile(r'bytes=(\d+)-(\d*)', flags=re.IGNORECASE)
-FULL_RANGE_MATCH_PATTERN= re.compile(r'bytes\s+\*?/?(\d+)-?(\d+)?/(\d+)', flags=re.IGNORECASE)
+# Content-Range: bytes start-end/total или bytes */total (у ответа 416 диапазона нет)
+FULL_RANGE_MATCH_PATTERN= re.compile(r'bytes\s+(?:(\d+)-(\d+)|\*)/(\d+)', flags=re.IGNORECASE)
+
+# Перевод URL-safe алфавита base64 в стандартный за один проход
+URLSAFE_TO_STANDARD_TABLE = str.maketrans('-_', '+/')
+
+# Одни и те же ссылки (плейлисты, сегменты) приходят многократно - результат кэшируется
+URL_CACHE_SIZE = 4096
 
+# Параметр prox_enc: сегмент "param", за которым идет сегмент "ключ=значение"
+ENCODED_PARAM_MARKER = '/param/'
 
+# Протокол в начале "склеенного" URL, за которым следует еще один протокол.
+# Снимается один протокол за вызов; общий для normalize_url и RequestProcessor
+DUPLICATE_PROTOCOL_PATTERN = re.compile(r'^https?://(?=https?://)', flags=re.IGNORECASE)
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def decode_base64_url(encoded_str: str) -> str:
     """Декодирование base64 URL с обработкой ошибок"""
     try:
-        decoded_url = urllib.parse.unquote(encoded_str)
-
-        # Заменяем URL-safe символы обратно
-        decoded_url = decoded_url.replace('-', '+').replace('_', '/')
+        # Без '%' в строке unquote ничего не меняет - пропускаем лишний проход
+        decoded_url = urllib.parse.unquote(encoded_str) if '%' in encoded_str else encoded_str
 
         # Добавляем padding если необходимо
-        missing_padding = len(decoded_url) % 4
-        if missing_padding:
-            decoded_url += '=' * (4 - missing_padding)
+        decoded_url += '=' * (-len(decoded_url) & 3)
 
-        result = base64.b64decode(decoded_url).decode('utf-8')
+        if '+' in decoded_url or '/' in decoded_url:
+            # Стандартный алфавит (возможно вперемешку с URL-safe) - приводим к нему
+            decoded_url = decoded_url.translate(URLSAFE_TO_STANDARD_TABLE)
+            return base64_impl.b64decode(decoded_url).decode('utf-8')
 
-        return result
+        # URL-safe алфавит (- и _) декодируется без предварительной замены символов
+        return base64_impl.urlsafe_b64decode(decoded_url).decode('utf-8')
 
-    except base64.binascii.Error as e:
+    except binascii.Error as e:
         raise ValueError(f"Invalid base64 string: {str(e)}")
 
     except UnicodeDecodeError as e:
@@ -38,41 +66,25 @@ def decode_base64_url(encoded_str: str) -> str:
         raise ValueError(f"Unexpected error during decoding: {str(e)}")
 
 
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def encode_base64_url(original_str: str) -> str:
     """Кодирование строки в base64 URL-safe формат"""
     try:
-        # Преобразуем строку в байты
-        original_bytes = original_str.encode('utf-8')
-
-        # Кодируем в base64
-        base64_bytes = base64.b64encode(original_bytes)
-        base64_str = base64_bytes.decode('utf-8')
-
-        # Делаем URL-safe: заменяем + на - и / на _
-        url_safe_str = base64_str.replace('+', '-').replace('/', '_')
-
-        # Убираем padding (=)
-        url_safe_str = url_safe_str.rstrip('=')
-
-        return url_safe_str
+        # URL-safe алфавит (- и _ вместо + и /), padding (=) убираем
+        return base64_impl.urlsafe_b64encode(original_str.encode('utf-8')).rstrip(b'=').decode('ascii')
 
     except Exception as e:
         raise ValueError(f"Base64 encoding error: {str(e)}")
 
 
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def normalize_url(url: str) -> str:
     """Нормализация URL и исправление проблем с протоколом"""
     if not url:
         raise ValueError("Empty URL")
 
-    # Убираем дублирующиеся протоколы
-    protocols = ['https://', 'http://']
-    for proto1 in protocols:
-        for proto2 in protocols:
-            duplicate = proto1 + proto2
-            if url.startswith(duplicate):
-                url = url[len(proto1):]
-                break
+    # Убираем дублирующийся протокол
+    url = DUPLICATE_PROTOCOL_PATTERN.sub('', url, count=1)
 
     # Обрабатываем protocol-relative URLs (начинающиеся с //)
     if url.startswith('//'):
@@ -91,34 +103,59 @@ def normalize_url(url: str) -> str:
 def parse_encoded_data(encoded_str: str) -> Tuple[Dict[str, str], List[str]]:
     """Парсинг закодированных данных в формате prox_enc"""
     params = {}
-    url = []
 
     if not encoded_str:
-        return params, url
-
-    # Разделяем строку по символу '/'
-    parts = encoded_str.split('/')
-
-    i = 0
-    n = 0
+        return params, []
+
+    # Пары "param/ключ=значение" ищем курсором по строке, не разбивая ее на сегменты.
+    # Ведущий '/' позволяет искать маркер и в самом начале строки
+    path = '/' + encoded_str
+    path_len = len(path)
+    tail_start = 0
+    marker_pos = path.find(ENCODED_PARAM_MARKER)
+    while marker_pos != -1:
+        kv_start = marker_pos + len(ENCODED_PARAM_MARKER)
+        kv_end = path.find('/', kv_start)
+        if kv_end == -1:
+            kv_end = path_len
+
+        key, sep, value = path[kv_start:kv_end].partition('=')
+        if not sep:
+            # Сегмент без '=' не является параметром - ищем следующий маркер
+            marker_pos = path.find(ENCODED_PARAM_MARKER, marker_pos + 1)
+            continue
+
+        # Декодируем URL-encoded значение
+        params[key] = urllib.parse.unquote(value) if '%' in value else value
+        tail_start = kv_end
+        marker_pos = path.find(ENCODED_PARAM_MARKER, kv_end)
+
+    if not tail_start:
+        return params, encoded_str.split('/')
+
+    # URL - это все сегменты после последнего параметра
+    return params, path[tail_start + 1:].split('/') if tail_start < path_len else []
+
+
+def _find_embedded_url(text: str) -> Optional[str]:
+    """Поиск первой ссылки http(s):// в строке: до первого пробельного символа"""
+    # Ищем разделитель "://" и проверяем протокол перед ним - дешевле регулярного выражения
+    separator_pos = text.find('://')
+    while separator_pos != -1:
+        if separator_pos >= 5 and text[separator_pos - 5:separator_pos].lower() == 'https':
+            start = separator_pos - 5
+        elif separator_pos >= 4 and text[separator_pos - 4:separator_pos].lower() == 'http':
+            start = separator_pos - 4
+        else:
+            start = -1
 
-    # Обрабатываем части последовательно
-    while i < len(parts):
-        # Если находим "param", то следующий элемент должен быть в формате "ключ=значение"
-        if parts[i] == 'param' and i + 1 < len(parts):
-            key_value = parts[i + 1]
-            if '=' in key_value:
-                key, value = key_value.split('=', 1)
-                # Декодируем URL-encoded значение
-                decoded_value = urllib.parse.unquote(value)
-                params[key] = decoded_value
-                i += 2  # Пропускаем два элемента: 'param' и 'ключ=значение'
-                n = i
-                continue
+        # После протокола должен быть хотя бы один непробельный символ
+        if start != -1 and text[separator_pos + 3:separator_pos + 4].strip():
+            return text[start:].split(maxsplit=1)[0]
 
-        i += 1
+        separator_pos = text.find('://', separator_pos + 1)
 
-    return params, parts[n:]
+    return None
 
 
 def build_url(segments: List[str], query_params: Optional[Dict] = None) -> str:
@@ -128,14 +165,11 @@ def build_url(segments: List[str], query_params: Optional[Dict] = None) -> str:
 
     url = '/'.join(segments)
 
-    url_match = URL_PATTERN.search(url)
-    if url_match:
-        url = url_match.group(1)
-    else:
-        url = normalize_url(url)
+    url = _find_embedded_url(url) or normalize_url(url)
 
-    parsed = urllib.parse.urlparse(url)
-    if not parsed.netloc:
+    # Хост - все между "://" и первым из символов /?#
+    _, _, rest = url.partition('://')
+    if not rest or rest[0] in '/?#':
         raise ValueError(f"Invalid hostname in URL: {url}")
 
     # Добавляем query-параметры если они переданы
@@ -149,21 +183,18 @@ def build_url(segments: List[str], query_params: Optional[Dict] = None) -> str:
         else:
             raise ValueError("query_params must be a dictionary or list of tuples")
 
-        # Объединяем существующие query-параметры с новыми
-        current_query = parsed.query
-        if current_query:
-            new_query = f"{current_query}&{query_string}"
-        else:
-            new_query = query_string
-
-        # Собираем URL с новыми параметрами
-        parsed = parsed._replace(query=new_query)
-        url = urllib.parse.urlunparse(parsed)
+        # Объединяем существующие query-параметры с новыми, фрагмент остается в конце
+        url, hash_sign, fragment = url.partition('#')
+        if '?' not in url:
+            url += '?'
+        elif not url.endswith('?'):
+            url += '&'
+        url = f"{url}{query_string}{hash_sign}{fragment}"
 
     return url
 
 
-def is_valid_json(text: str) -> bool:
+def is_valid_json(text: Union[str, bytes]) -> bool:
     """Проверка валидности JSON включая примитивы"""
     if not text:
         return False
@@ -172,12 +203,26 @@ def is_valid_json(text: str) -> bool:
     if not text:
         return False
 
+    # Первый и последний символ сравниваем как строки и для bytes
+    first, last = text[:1], text[-1:]
+    if isinstance(text, bytes):
+        first, last = first.decode('latin-1'), last.decode('latin-1')
+
     # Стандартная проверка JSON
-    if (text.startswith('{') and text.endswith('}')) or (text.startswith('[') and text.endswith(']')):
+    if (first == '{' and last == '}') or (first == '[' and last == ']'):
+        try:
+            json_impl.loads(text)
+            return True
+        except ValueError:
+            if json_impl is json:
+                return False
+
+        # orjson строже стандартного модуля: NaN, Infinity, числа вне double и одиночные
+        # суррогаты он отвергает. Тело потом разбирает json.loads, поэтому решает он
         try:
             json.loads(text)
             return True
-        except (json.JSONDecodeError, ValueError):
+        except ValueError:
             return False
 
     return False
@@ -185,38 +230,29 @@ def is_valid_json(text: str) -> bool:
 
 def parse_range_header(range_header: Optional[str], file_size: int) -> Tuple[int, int]:
     """Парсит заголовок Range и возвращает начальный и конечный байты"""
+    last_byte = file_size - 1 if file_size > 0 else 0
     if not range_header:
-        return 0, file_size - 1 if file_size > 0 else 0
-
-    try:
-        # Формат: bytes=start-end
-        range_match = RANGE_MATCH_PATTERN.match(range_header)
-        if not range_match:
-            return 0, file_size - 1 if file_size > 0 else 0
-
-        start = int(range_match.group(1))
-        end_str = range_match.group(2)
-
-        if end_str:
-            end = int(end_str)
-        else:
-            # Если конец не указан, используем до конца файла
-            end = file_size - 1 if file_size > 0 else 0
-
-        # Валидация диапазона
-        if file_size > 0:
-            if start < 0:
-                start = 0
-            if start >= file_size:
-                # Если начало после конца файла, возвращаем пустой диапазон
-                start = file_size - 1
-                end = file_size - 1
-            if end >= file_size:
-                end = file_size - 1
-            if start > end:
-                start, end = end, start  # Корректируем если начало после конца
-
-        return start, end
-
-    except Exception as e:
-        return 0, file_size - 1 if file_size > 0 else 0
+        return 0, last_byte
+
+    # Формат: bytes=start-end. Регулярное выражение пропускает только цифры,
+    # поэтому int() ниже не может упасть
+    range_match = RANGE_MATCH_PATTERN.match(range_header)
+    if not range_match:
+        return 0, last_byte
+
+    start_str, end_str = range_match.groups()
+    start = int(start_str)
+    # Если конец не указан, используем до конца файла
+    end = int(end_str) if end_str else last_byte
+
+    # Валидация диапазона
+    if file_size > 0:
+        if start > last_byte:
+            # Если начало после конца файла, возвращаем пустой диапазон
+            return last_byte, last_byte
+        if end > last_byte:
+            end = last_byte
+        if start > end:
+            return end, start  # Корректируем если начало после конца
+
+    return start, end
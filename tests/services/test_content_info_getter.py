@@ -1,19 +1,50 @@
+import asyncio
+import logging
+
 import pytest
 import httpx
-from unittest.mock import Mock, AsyncMock, patch
+from unittest.mock import Mock, AsyncMock, MagicMock, patch
 from src.models.interfaces import IConfig, IHttpClientFactory, IProxyGenerator, ITimeoutConfigurator
 from src.models.responses import ContentInfoResponse
-from src.services.content_info_getter import ContentInfoGetter
+from src.services.utils.content_info_getter import ContentInfoGetter
+
+
+# Общие заголовки ответа 206 для векторов парсинга content-range
+RANGE_RESPONSE_HEADERS = {"content-type": "video/mp4", "accept-ranges": "bytes"}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mute_logs():
+    """Тесты не проверяют логи - отключаем их на время модуля"""
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+class _AsyncContext:
+    """Асинхронный контекстный менеджер, отдающий заранее заданное значение"""
+
+    def __init__(self, value):
+        self.value = value
+
+    async def __aenter__(self):
+        return self.value
+
+    async def __aexit__(self, *exc_info):
+        return None
 
 
 class TestContentInfoGetter:
     """Тесты для ContentInfoGetter"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_dependencies(self):
-        """Создает моки всех зависимостей"""
+        """Создает моки всех зависимостей один раз на модуль"""
         config = Mock(spec=IConfig)
+        config.log_level = 'INFO'
         http_factory = Mock(spec=IHttpClientFactory)
+        # create_client используется как асинхронный контекстный менеджер
+        http_factory.create_client = MagicMock()
         proxy_generator = Mock(spec=IProxyGenerator)
         timeout_configurator = Mock(spec=ITimeoutConfigurator)
 
@@ -24,30 +55,58 @@ class TestContentInfoGetter:
             'timeout_configurator': timeout_configurator
         }
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
+    def transport_cases(self):
+        """Ответы MockTransport по пути запроса: {path: {'code': ..., 'headers': {...}}}"""
+        return {}
+
+    @pytest.fixture(scope="module")
+    def transport_requests(self):
+        """Запросы, дошедшие до MockTransport"""
+        return []
+
+    @pytest.fixture(scope="module")
+    def mock_transport_client(self, transport_cases, transport_requests):
+        """Один настоящий httpx-клиент на модуль, сеть подменена MockTransport"""
+        def handler(request: httpx.Request) -> httpx.Response:
+            transport_requests.append(request)
+            case = transport_cases[request.url.path]
+            return httpx.Response(status_code=case['code'], headers=case['headers'])
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        yield client
+        asyncio.run(client.aclose())
+
+    @pytest.fixture(autouse=True)
+    def reset_dependencies(self, mock_dependencies, mock_transport_client, transport_cases, transport_requests):
+        """Сбрасывает настройки и вызовы моков перед каждым тестом"""
+        for mock in mock_dependencies.values():
+            mock.reset_mock(return_value=True, side_effect=True)
+
+        # Значения по умолчанию: без прокси, таймаут - заглушка
+        mock_dependencies['proxy_generator'].has_proxies.return_value = False
+        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
+
+        transport_cases.clear()
+        transport_requests.clear()
+        # По умолчанию фабрика отдает общий клиент на MockTransport
+        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_transport_client
+
+    @pytest.fixture(scope="module")
     def content_info_getter(self, mock_dependencies):
         """Создает экземпляр ContentInfoGetter с моками зависимостей"""
         return ContentInfoGetter(**mock_dependencies)
 
     @pytest.mark.asyncio
-    async def test_get_content_info_successful_head(self, content_info_getter, mock_dependencies):
+    async def test_get_content_info_successful_head(self, content_info_getter, mock_dependencies, transport_cases,
+                                                   transport_requests):
         """Тест успешного HEAD запроса"""
         # Arrange
         url = "https://example.com/video.mp4"
         headers = {"User-Agent": "test-agent"}
 
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
         # Правильное мокирование асинхронного контекстного менеджера
-        mock_client = AsyncMock()
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.headers = {"content-type": "video/mp4", "content-length": "1024"}
-        mock_client.head.return_value = mock_response
-
-        # Настраиваем асинхронный контекстный менеджер
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        transport_cases['/video.mp4'] = {'code': 200, 'headers': {"content-type": "video/mp4", "content-length": "1024"}}
         mock_dependencies['http_factory'].create_client.return_value.__aexit__.return_value = None
 
         # Act
@@ -59,7 +118,7 @@ class TestContentInfoGetter:
         assert result.content_length == 1024
         assert result.method_used == "HEAD"
         mock_dependencies['http_factory'].create_client.assert_called_once()
-        mock_client.head.assert_called_once_with(url)
+        assert [(request.method, str(request.url)) for request in transport_requests] == [('HEAD', url)]
 
     @pytest.mark.asyncio
     async def test_get_content_info_head_zero_length_falls_back_to_get(self, content_info_getter, mock_dependencies):
@@ -67,9 +126,6 @@ class TestContentInfoGetter:
         # Arrange
         url = "https://example.com/video.mp4"
 
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
         # HEAD запрос возвращает 0 content_length
         mock_client_head = AsyncMock()
         mock_response_head = Mock()
@@ -82,15 +138,12 @@ class TestContentInfoGetter:
         mock_response_stream = AsyncMock()
         mock_response_stream.status_code = 206
         mock_response_stream.headers = {"content-range": "bytes 0-0/2048", "content-type": "video/mp4"}
-        mock_client_get.stream.return_value.__aenter__.return_value = mock_response_stream
+        mock_client_get.stream = Mock(return_value=_AsyncContext(mock_response_stream))
 
-        # Чередуем возвращаемые клиенты
+        # Первый клиент - для HEAD, второй - для GET
         mock_dependencies['http_factory'].create_client.side_effect = [
-            AsyncMock().__aenter__.return_value.__aenter__.return_value if i == 0 else
-            AsyncMock().__aenter__.return_value.__aenter__.return_value
-            for i in range(2)
+            _AsyncContext(mock_client_head), _AsyncContext(mock_client_get)
         ]
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.side_effect = [mock_client_head, mock_client_get]
 
         # Act
         result = await content_info_getter.get_content_info(url, use_head=True)
@@ -105,9 +158,6 @@ class TestContentInfoGetter:
         # Arrange
         url = "https://example.com/video.mp4"
 
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
         # HEAD запрос выбрасывает исключение
         mock_client_head = AsyncMock()
         mock_client_head.head.side_effect = httpx.RequestError("Connection error")
@@ -117,12 +167,12 @@ class TestContentInfoGetter:
         mock_response_stream = AsyncMock()
         mock_response_stream.status_code = 200
         mock_response_stream.headers = {"content-type": "video/mp4", "content-length": "1024"}
-        mock_client_get.stream.return_value.__aenter__.return_value = mock_response_stream
+        mock_client_get.stream = Mock(return_value=_AsyncContext(mock_response_stream))
 
+        # Первый клиент - для HEAD, второй - для GET
         mock_dependencies['http_factory'].create_client.side_effect = [
-            AsyncMock().__aenter__.return_value for _ in range(2)
+            _AsyncContext(mock_client_head), _AsyncContext(mock_client_get)
         ]
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.side_effect = [mock_client_head, mock_client_get]
 
         # Act
         result = await content_info_getter.get_content_info(url, use_head=True)
@@ -133,21 +183,13 @@ class TestContentInfoGetter:
         assert result.error is None
 
     @pytest.mark.asyncio
-    async def test_get_content_info_use_head_false_direct_get(self, content_info_getter, mock_dependencies):
+    async def test_get_content_info_use_head_false_direct_get(self, content_info_getter, mock_dependencies, transport_cases,
+                                                             transport_requests):
         """Тест когда use_head=False и сразу используется GET"""
         # Arrange
         url = "https://example.com/video.mp4"
 
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_response_stream = AsyncMock()
-        mock_response_stream.status_code = 200
-        mock_response_stream.headers = {"content-type": "video/mp4", "content-length": "1024"}
-        mock_client.stream.return_value.__aenter__.return_value = mock_response_stream
-
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        transport_cases['/video.mp4'] = {'code': 200, 'headers': {"content-type": "video/mp4", "content-length": "1024"}}
 
         # Act
         result = await content_info_getter.get_content_info(url, use_head=False)
@@ -155,27 +197,43 @@ class TestContentInfoGetter:
         # Assert
         assert result.content_length == 1024
         assert "GET" in result.method_used
-        mock_client.head.assert_not_called()
+        assert all(request.method != 'HEAD' for request in transport_requests)
+
+    @pytest.mark.asyncio
+    async def test_try_sniff_request_disables_compression(self, content_info_getter, mock_dependencies, transport_cases):
+        """Тест что проба запрашивает тело без сжатия: размер и прочитанное начало должны совпадать"""
+        # Arrange
+        url = "https://example.com/index.m3u8"
+        headers = {"Accept-Encoding": "gzip"}
+        playlist = b"#EXTM3U\n"
+
+        transport_cases['/index.m3u8'] = {'code': 206, 'headers': {
+            "content-type": "application/vnd.apple.mpegurl",
+            "content-range": f"bytes 0-{len(playlist) - 1}/{len(playlist)}"}}
+
+        # Act
+        await content_info_getter._try_sniff_request(url, headers)
+
+        # Assert
+        sniff_headers = mock_dependencies['http_factory'].create_client.call_args.kwargs['headers']
+        assert sniff_headers['Accept-Encoding'] == 'identity'
+        assert headers == {"Accept-Encoding": "gzip"}
 
     @pytest.mark.asyncio
-    async def test_get_content_info_all_methods_fail(self, content_info_getter, mock_dependencies, caplog):
+    async def test_get_content_info_all_methods_fail(self, content_info_getter, mock_dependencies):
         """Тест когда все методы (HEAD и все GET стратегии) завершаются ошибкой"""
         # Arrange
         url = "https://example.com/video.mp4"
 
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
         # Все запросы выбрасывают исключения
-        mock_client = AsyncMock()
-        mock_client.head.side_effect = Exception("HEAD failed")
-        mock_client.stream.side_effect = Exception("GET failed")
+        mock_client = Mock()
+        mock_client.head = AsyncMock(side_effect=Exception("HEAD failed"))
+        mock_client.stream = Mock(side_effect=Exception("GET failed"))
 
         mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
 
         # Act
-        with caplog.at_level('WARNING'):
-            result = await content_info_getter.get_content_info(url, use_head=True)
+        result = await content_info_getter.get_content_info(url, use_head=True)
 
         # Assert
         assert result.status_code == 0
@@ -184,7 +242,7 @@ class TestContentInfoGetter:
         assert "All GET strategies failed" in result.error
 
     @pytest.mark.asyncio
-    async def test_get_content_info_with_proxy(self, content_info_getter, mock_dependencies):
+    async def test_get_content_info_with_proxy(self, content_info_getter, mock_dependencies, transport_cases):
         """Тест использования прокси"""
         # Arrange
         url = "https://example.com/video.mp4"
@@ -192,15 +250,8 @@ class TestContentInfoGetter:
 
         mock_dependencies['proxy_generator'].has_proxies.return_value = True
         mock_dependencies['proxy_generator'].get_proxy.return_value = proxy_url
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.headers = {"content-type": "video/mp4", "content-length": "1024"}
-        mock_client.head.return_value = mock_response
 
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        transport_cases['/video.mp4'] = {'code': 200, 'headers': {"content-type": "video/mp4", "content-length": "1024"}}
 
         # Act
         result = await content_info_getter.get_content_info(url, use_head=True)
@@ -218,7 +269,6 @@ class TestContentInfoGetter:
 
         mock_dependencies['proxy_generator'].has_proxies.return_value = True
         mock_dependencies['proxy_generator'].get_proxy.return_value = proxy_url
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
 
         mock_client = AsyncMock()
         mock_client.head.side_effect = httpx.RequestError("Proxy connection failed")
@@ -234,21 +284,12 @@ class TestContentInfoGetter:
         mock_dependencies['proxy_generator'].mark_success.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_try_head_request_success(self, content_info_getter, mock_dependencies):
+    async def test_try_head_request_success(self, content_info_getter, mock_dependencies, transport_cases):
         """Тест успешного HEAD запроса через отдельный метод"""
         # Arrange
         url = "https://example.com/video.mp4"
 
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.headers = {"content-type": "video/mp4", "content-length": "1024", "accept-ranges": "bytes"}
-        mock_client.head.return_value = mock_response
-
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        transport_cases['/video.mp4'] = {'code': 200, 'headers': {"content-type": "video/mp4", "content-length": "1024", "accept-ranges": "bytes"}}
 
         # Act
         result = await content_info_getter._try_head_request(url, {})
@@ -262,21 +303,12 @@ class TestContentInfoGetter:
         assert result.error is None
 
     @pytest.mark.asyncio
-    async def test_try_head_request_invalid_content_length(self, content_info_getter, mock_dependencies):
+    async def test_try_head_request_invalid_content_length(self, content_info_getter, mock_dependencies, transport_cases):
         """Тест HEAD запроса с некорректным content-length"""
         # Arrange
         url = "https://example.com/video.mp4"
 
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.headers = {"content-type": "video/mp4", "content-length": "invalid"}
-        mock_client.head.return_value = mock_response
-
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        transport_cases['/video.mp4'] = {'code': 200, 'headers': {"content-type": "video/mp4", "content-length": "invalid"}}
 
         # Act
         result = await content_info_getter._try_head_request(url, {})
@@ -286,24 +318,16 @@ class TestContentInfoGetter:
         assert result.content_length == 0
 
     @pytest.mark.asyncio
-    async def test_try_get_requests_success_first_strategy(self, content_info_getter, mock_dependencies):
+    async def test_try_get_requests_success_first_strategy(self, content_info_getter, mock_dependencies, transport_cases):
         """Тест успешного GET запроса с первой стратегией"""
         # Arrange
         url = "https://example.com/video.mp4"
 
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_response_stream = AsyncMock()
-        mock_response_stream.status_code = 206
-        mock_response_stream.headers = {
+        transport_cases['/video.mp4'] = {'code': 206, 'headers': {
             "content-range": "bytes 0-0/2048",
             "content-type": "video/mp4",
             "accept-ranges": "bytes"
-        }
-        mock_client.stream.return_value.__aenter__.return_value = mock_response_stream
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        }}
 
         # Act
         result = await content_info_getter._try_get_requests(url, {})
@@ -319,16 +343,7 @@ class TestContentInfoGetter:
         # Arrange
         url = "https://example.com/video.mp4"
 
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-
-        # Первая стратегия падает, вторая успешна
-        mock_response_stream_fail = AsyncMock()
-        mock_response_stream_fail.__aenter__.side_effect = httpx.RequestError("First strategy failed")
-
-        mock_response_stream_success = AsyncMock()
+        mock_response_stream_success = Mock()
         mock_response_stream_success.status_code = 206
         mock_response_stream_success.headers = {
             "content-range": "bytes 0-999/4096",
@@ -336,10 +351,12 @@ class TestContentInfoGetter:
             "accept-ranges": "bytes"
         }
 
-        mock_client.stream.side_effect = [
-            mock_response_stream_fail,
-            mock_response_stream_success
-        ]
+        # Первая стратегия падает, вторая успешна
+        mock_client = Mock()
+        mock_client.stream = Mock(side_effect=[
+            httpx.RequestError("First strategy failed"),
+            _AsyncContext(mock_response_stream_success)
+        ])
 
         mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
 
@@ -357,16 +374,7 @@ class TestContentInfoGetter:
         # Arrange
         url = "https://example.com/video.mp4"
 
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-
-        # Первые две стратегии падают, третья успешна
-        mock_response_stream_fail = AsyncMock()
-        mock_response_stream_fail.__aenter__.side_effect = httpx.RequestError("Strategy failed")
-
-        mock_response_stream_success = AsyncMock()
+        mock_response_stream_success = Mock()
         mock_response_stream_success.status_code = 200
         mock_response_stream_success.headers = {
             "content-type": "video/mp4",
@@ -374,11 +382,13 @@ class TestContentInfoGetter:
             "accept-ranges": "bytes"
         }
 
-        mock_client.stream.side_effect = [
-            mock_response_stream_fail,
-            mock_response_stream_fail,
-            mock_response_stream_success
-        ]
+        # Первые две стратегии падают, третья успешна
+        mock_client = Mock()
+        mock_client.stream = Mock(side_effect=[
+            httpx.RequestError("Strategy failed"),
+            httpx.RequestError("Strategy failed"),
+            _AsyncContext(mock_response_stream_success)
+        ])
 
         mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
 
@@ -391,24 +401,16 @@ class TestContentInfoGetter:
         assert result.method_used == "GET_SIMPLE"
 
     @pytest.mark.asyncio
-    async def test_try_get_requests_invalid_content_length(self, content_info_getter, mock_dependencies):
+    async def test_try_get_requests_invalid_content_length(self, content_info_getter, mock_dependencies, transport_cases):
         """Тест GET запроса с некорректным content-length"""
         # Arrange
         url = "https://example.com/video.mp4"
 
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_response_stream = AsyncMock()
-        mock_response_stream.status_code = 200
-        mock_response_stream.headers = {
+        transport_cases['/video.mp4'] = {'code': 200, 'headers': {
             "content-type": "video/mp4",
             "content-length": "invalid",
             "accept-ranges": "bytes"
-        }
-        mock_client.stream.return_value.__aenter__.return_value = mock_response_stream
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        }}
 
         # Act
         result = await content_info_getter._try_get_requests(url, {})
@@ -426,12 +428,9 @@ class TestContentInfoGetter:
 
         mock_dependencies['proxy_generator'].has_proxies.return_value = True
         mock_dependencies['proxy_generator'].get_proxy.return_value = proxy_url
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
 
-        mock_client = AsyncMock()
-        mock_response_stream = AsyncMock()
-        mock_response_stream.__aenter__.side_effect = httpx.RequestError("Proxy GET failed")
-        mock_client.stream.return_value = mock_response_stream
+        mock_client = Mock()
+        mock_client.stream = Mock(side_effect=httpx.RequestError("Proxy GET failed"))
         mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
 
         # Act
@@ -442,32 +441,19 @@ class TestContentInfoGetter:
         assert mock_dependencies['proxy_generator'].mark_failure.call_count == 3
 
     @pytest.mark.asyncio
-    async def test_try_get_requests_content_range_parsing(self, content_info_getter, mock_dependencies):
+    @pytest.mark.parametrize("content_range,expected_length", [
+        ("bytes 0-999/5000", 5000),
+        ("bytes */1000", 1000),
+        ("bytes 50-100/2000", 2000),
+    ])
+    async def test_try_get_requests_content_range_parsing(self, content_info_getter, mock_dependencies, transport_cases,
+                                                          content_range, expected_length):
         """Тест парсинга content-range"""
-        test_cases = [
-            ("bytes 0-999/5000", 5000),
-            ("bytes */1000", 1000),
-            ("bytes 50-100/2000", 2000),
-        ]
-
-        for content_range, expected_length in test_cases:
-            mock_dependencies['proxy_generator'].has_proxies.return_value = False
-            mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
+        transport_cases['/video.mp4'] = {'code': 206, 'headers': {**RANGE_RESPONSE_HEADERS, "content-range": content_range}}
 
-            mock_client = AsyncMock()
-            mock_response_stream = AsyncMock()
-            mock_response_stream.status_code = 206
-            mock_response_stream.headers = {
-                "content-range": content_range,
-                "content-type": "video/mp4",
-                "accept-ranges": "bytes"
-            }
-            mock_client.stream.return_value.__aenter__.return_value = mock_response_stream
-            mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        result = await content_info_getter._try_get_requests("https://example.com/video.mp4", {})
 
-            result = await content_info_getter._try_get_requests("https://example.com/video.mp4", {})
-
-            assert result.content_length == expected_length
+        assert result.content_length == expected_length
 
     @pytest.mark.asyncio
     async def test_get_content_info_exception_handling(self, content_info_getter, mock_dependencies):
@@ -475,10 +461,10 @@ class TestContentInfoGetter:
         # Arrange
         url = "https://example.com/video.mp4"
 
-        mock_dependencies['timeout_configurator'].create_timeout_config.side_effect = Exception("Config error")
-
-        # Act
-        result = await content_info_getter.get_content_info(url)
+        # Ошибки отдельных запросов перехватываются внутри, здесь проверяется внешний обработчик
+        with patch.object(content_info_getter, '_try_head_request', side_effect=Exception("Config error")):
+            # Act
+            result = await content_info_getter.get_content_info(url)
 
         # Assert
         assert result.status_code == 0
@@ -493,23 +479,14 @@ class TestContentInfoGetter:
         assert getter.http_factory == mock_dependencies['http_factory']
         assert getter.proxy_generator == mock_dependencies['proxy_generator']
         assert getter.timeout_configurator == mock_dependencies['timeout_configurator']
-        assert getter.logger.name == 'lampa-proxy-content-getter'
+        assert getter.logger.name == 'content-getter'
 
     @pytest.mark.asyncio
-    async def test_default_headers(self, content_info_getter, mock_dependencies):
+    async def test_default_headers(self, content_info_getter, mock_dependencies, transport_cases):
         """Тест headers по умолчанию"""
         url = "https://example.com/video.mp4"
 
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.headers = {"content-type": "video/mp4", "content-length": "1024"}
-        mock_client.head.return_value = mock_response
-
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        transport_cases['/video.mp4'] = {'code': 200, 'headers': {"content-type": "video/mp4", "content-length": "1024"}}
 
         result = await content_info_getter.get_content_info(url)
 
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+import httpx
+from unittest.mock import Mock, MagicMock
+from src.models.interfaces import IConfig, IHttpClientFactory, IProxyGenerator, ITimeoutConfigurator
+from src.services.utils.content_info_getter import ContentInfoGetter
+
+pytest.importorskip("pytest_benchmark")
+
+
+URL = "https://example.com/video.mp4"
+
+# Ответы MockTransport по методу запроса
+HEAD_FAST_PATH = {
+    'HEAD': (200, {"content-type": "video/mp4", "content-length": "1024", "accept-ranges": "bytes"}),
+}
+HEAD_ZERO_FALLS_BACK_TO_GET = {
+    'HEAD': (200, {"content-type": "video/mp4", "content-length": "0"}),
+    'GET': (206, {"content-type": "video/mp4", "content-range": "bytes 0-0/2048", "accept-ranges": "bytes"}),
+}
+
+# Ответ 206 для замера разбора Content-Range
+CONTENT_RANGE_RESPONSE = httpx.Response(
+    status_code=206, headers={"content-type": "video/mp4", "content-range": "bytes 0-999/5000"})
+
+
+class _AsyncContext:
+    """Асинхронный контекстный менеджер, отдающий заранее заданное значение"""
+
+    def __init__(self, value):
+        self.value = value
+
+    async def __aenter__(self):
+        return self.value
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+class TestContentInfoGetterBenchmark:
+    """Микробенчмарки управляющей логики ContentInfoGetter без сети"""
+
+    @pytest.fixture(scope="module")
+    def event_loop_for_benchmark(self):
+        """Один event loop на модуль: в замер не попадает создание loop"""
+        loop = asyncio.new_event_loop()
+        yield loop
+        loop.close()
+
+    @pytest.fixture
+    def make_getter(self, event_loop_for_benchmark):
+        """Создает ContentInfoGetter, клиент которого отвечает по заданной таблице"""
+        clients = []
+
+        def factory(responses):
+            def handler(request: httpx.Request) -> httpx.Response:
+                status_code, headers = responses[request.method]
+                return httpx.Response(status_code=status_code, headers=headers)
+
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            clients.append(client)
+
+            config = Mock(spec=IConfig)
+            config.log_level = 'CRITICAL'
+            http_factory = Mock(spec=IHttpClientFactory)
+            http_factory.create_client = MagicMock(return_value=_AsyncContext(client))
+            proxy_generator = Mock(spec=IProxyGenerator)
+            proxy_generator.has_proxies.return_value = False
+            timeout_configurator = Mock(spec=ITimeoutConfigurator)
+
+            return ContentInfoGetter(config, http_factory, proxy_generator, timeout_configurator)
+
+        yield factory
+
+        for client in clients:
+            event_loop_for_benchmark.run_until_complete(client.aclose())
+
+    def test_bench_head_fast_path(self, benchmark, make_getter, event_loop_for_benchmark):
+        """HEAD сразу возвращает размер"""
+        getter = make_getter(HEAD_FAST_PATH)
+
+        result = benchmark(lambda: event_loop_for_benchmark.run_until_complete(
+            getter.get_content_info(URL, use_head=True)))
+
+        assert result.method_used == "HEAD"
+        assert result.content_length == 1024
+
+    def test_bench_head_falls_back_to_get(self, benchmark, make_getter, event_loop_for_benchmark):
+        """HEAD без размера, размер берется из Content-Range первой GET-стратегии"""
+        getter = make_getter(HEAD_ZERO_FALLS_BACK_TO_GET)
+
+        result = benchmark(lambda: event_loop_for_benchmark.run_until_complete(
+            getter.get_content_info(URL, use_head=True)))
+
+        assert result.method_used == "GET_Range 0-0"
+        assert result.content_length == 2048
+
+    def test_bench_parse_content_length(self, benchmark, make_getter):
+        """Разбор Content-Range отдельно от пути запроса"""
+        getter = make_getter({})
+
+        content_length = benchmark(getter._parse_content_length, CONTENT_RANGE_RESPONSE)
+
+        assert content_length == 5000
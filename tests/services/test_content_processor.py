@@ -1,11 +1,24 @@
 import pytest
-import urllib.parse
+from types import SimpleNamespace
 from unittest.mock import Mock, AsyncMock, patch
-from typing import Dict, Any
 
-from src.models.interfaces import IConfig, IHttpClientFactory, IContentInfoGetter, IVideoStreamer, IRequestProcessor
 from src.models.responses import ContentInfoResponse
-from src.services.content_processor import ContentProcessor
+from src.services.processors.content_processor import ContentProcessor
+from src.services.processors.video_streamer_processor import VideoStreamerProcessor
+
+
+def _content_info(**overrides) -> ContentInfoResponse:
+    """Результат пробы контента, по умолчанию - видео с поддержкой Range"""
+    fields = {
+        'status_code': 200,
+        'content_type': "video/mp4",
+        'content_length': 1024000,
+        'accept_ranges': "bytes",
+        'headers': {},
+        'method_used': "GET_SNIFF",
+    }
+    fields.update(overrides)
+    return ContentInfoResponse(**fields)
 
 
 class TestContentProcessor:
@@ -13,23 +26,28 @@ class TestContentProcessor:
 
     @pytest.fixture
     def mock_dependencies(self):
-        """Создает моки всех зависимостей"""
-        config = Mock(spec=IConfig)
-        http_factory = Mock(spec=IHttpClientFactory)
-        content_getter = Mock(spec=IContentInfoGetter)
-        video_streamer = Mock(spec=IVideoStreamer)
-        request_processor = Mock(spec=IRequestProcessor)
-
-        config.video_extensions = ['.mp4', '.avi', '.mkv', '.mov']
-        config.video_patterns = ['/video/', '/stream/', 'video=true']
-        config.video_indicators = ['video/mp4', 'video/avi', 'video/x-matroska', 'video/quicktime', 'application/video+mp4']
+        """Создает заглушки всех зависимостей: без spec-моков, только используемые атрибуты"""
+        config = SimpleNamespace(
+            log_level='INFO',
+            video_extensions=['.mp4', '.avi', '.mkv', '.mov'],
+            video_patterns=['/video/', '/stream/', 'video=true'],
+            video_indicators=['video/mp4', 'video/avi', 'video/x-matroska', 'video/quicktime', 'application/video+mp4'],
+            # Классификация проверяется через content_getter, без короткого пути по расширению
+            trust_video_extensions=False,
+        )
+        http_factory = SimpleNamespace()
+        content_getter = SimpleNamespace(get_content_info=AsyncMock())
+        video_streamer = SimpleNamespace(stream_video=AsyncMock())
+        request_processor = SimpleNamespace(process_request=AsyncMock())
+        m3u8_processor = SimpleNamespace(process_request=AsyncMock())
 
         return {
             'config': config,
             'http_factory': http_factory,
             'content_getter': content_getter,
             'video_streamer': video_streamer,
-            'request_processor': request_processor
+            'request_processor': request_processor,
+            'm3u8_processor': m3u8_processor
         }
 
     @pytest.fixture
@@ -37,6 +55,11 @@ class TestContentProcessor:
         """Создает экземпляр ContentProcessor с моками зависимостей"""
         return ContentProcessor(**mock_dependencies)
 
+    @pytest.fixture
+    def propagate_logs(self, content_processor, monkeypatch):
+        """Логгер процессора не передает записи корневому логгеру, caplog их без этого не видит"""
+        monkeypatch.setattr(content_processor.logger, 'propagate', True)
+
     @pytest.mark.asyncio
     async def test_process_content_get_video(self, content_processor, mock_dependencies):
         """Тест обработки GET запроса для видео контента"""
@@ -44,15 +67,15 @@ class TestContentProcessor:
         headers = {"User-Agent": "test"}
         range_header = "bytes=0-1000"
 
-        content_processor._is_video_content = AsyncMock(return_value=True)
+        mock_dependencies['content_getter'].get_content_info.return_value = _content_info()
 
         expected_result = Mock()
         mock_dependencies['video_streamer'].stream_video.return_value = expected_result
 
         result = await content_processor.process_content(url, 'GET', None, headers, range_header)
 
-        content_processor._is_video_content.assert_called_once_with(url, headers)
-        mock_dependencies['video_streamer'].stream_video.assert_called_once_with(url, headers, range_header)
+        mock_dependencies['content_getter'].get_content_info.assert_awaited_once_with(url, headers, use_head=False)
+        mock_dependencies['video_streamer'].stream_video.assert_awaited_once_with(url, headers, range_header)
         assert result == expected_result
 
     @pytest.mark.asyncio
@@ -61,17 +84,33 @@ class TestContentProcessor:
         url = "https://example.com/image.jpg"
         headers = {"User-Agent": "test"}
 
-        content_processor._is_video_content = AsyncMock(return_value=False)
+        mock_dependencies['content_getter'].get_content_info.return_value = _content_info(content_type="image/jpeg")
 
         expected_result = Mock()
-        async def mock_process_request(*args, **kwargs):
-            yield expected_result
+        mock_dependencies['request_processor'].process_request.return_value = expected_result
+
+        result = await content_processor.process_content(url, 'GET', None, headers)
 
-        mock_dependencies['request_processor'].process_request = mock_process_request
+        mock_dependencies['request_processor'].process_request.assert_awaited_once_with(url, 'GET', None, headers)
+        mock_dependencies['video_streamer'].stream_video.assert_not_called()
+        assert result == expected_result
+
+    @pytest.mark.asyncio
+    async def test_process_content_get_m3u8(self, content_processor, mock_dependencies):
+        """Тест обработки GET запроса для m3u8 плейлиста"""
+        url = "https://example.com/live/index.m3u8"
+        headers = {"User-Agent": "test"}
+        content_info = _content_info(content_type="application/vnd.apple.mpegurl", content_length=512)
+
+        mock_dependencies['content_getter'].get_content_info.return_value = content_info
+
+        expected_result = Mock()
+        mock_dependencies['m3u8_processor'].process_request.return_value = expected_result
 
         result = await content_processor.process_content(url, 'GET', None, headers)
 
-        content_processor._is_video_content.assert_called_once_with(url, headers)
+        mock_dependencies['m3u8_processor'].process_request.assert_awaited_once_with(
+            url, 'GET', None, headers, content_info)
         assert result == expected_result
 
     @pytest.mark.asyncio
@@ -83,14 +122,11 @@ class TestContentProcessor:
         headers = {"Content-Type": "application/json"}
 
         expected_result = Mock()
-        async def mock_process_request(*args, **kwargs):
-            yield expected_result
-
-        mock_dependencies['request_processor'].process_request = mock_process_request
+        mock_dependencies['request_processor'].process_request.return_value = expected_result
 
         result = await content_processor.process_content(url, method, data, headers)
 
-        content_processor._is_video_content.assert_not_called()
+        mock_dependencies['content_getter'].get_content_info.assert_not_called()
         mock_dependencies['video_streamer'].stream_video.assert_not_called()
         assert result == expected_result
 
@@ -99,262 +135,258 @@ class TestContentProcessor:
         """Тест обработки с headers по умолчанию"""
         url = "https://example.com/test"
 
-        expected_result = Mock()
-        async def mock_process_request(*args, **kwargs):
-            yield expected_result
+        mock_dependencies['content_getter'].get_content_info.return_value = _content_info(content_type="text/html")
 
-        mock_dependencies['request_processor'].process_request = mock_process_request
+        expected_result = Mock()
+        mock_dependencies['request_processor'].process_request.return_value = expected_result
 
         result = await content_processor.process_content(url, 'GET')
 
+        mock_dependencies['request_processor'].process_request.assert_awaited_once_with(url, 'GET', None, {})
         assert result == expected_result
 
     @pytest.mark.asyncio
-    async def test_is_video_content_success_by_content_type(self, content_processor, mock_dependencies):
-        """Тест проверки видео контента по content-type"""
+    async def test_process_content_trusted_extension_skips_probe(self, mock_dependencies):
+        """Тест что видео с известным расширением стримится без пробы контента"""
+        mock_dependencies['config'].trust_video_extensions = True
+        content_processor = ContentProcessor(**mock_dependencies)
         url = "https://example.com/video.mp4"
-        headers = {"Accept": "*/*"}
-
-        content_info = ContentInfoResponse(
-            status_code=200,
-            content_type="video/mp4",
-            content_length=1024000,
-            accept_ranges="bytes",
-            headers={},
-            method_used="HEAD"
-        )
 
-        mock_dependencies['content_getter'].get_content_info.return_value = content_info
+        await content_processor.process_content(url, 'GET', None, {})
+
+        mock_dependencies['content_getter'].get_content_info.assert_not_called()
+        mock_dependencies['video_streamer'].stream_video.assert_awaited_once_with(url, {}, None)
+
+    @pytest.mark.asyncio
+    async def test_process_content_trusted_extension_streams(self, mock_dependencies):
+        """Тест что по короткому пути отдается ответ стримера, обычный процессор не вызывается"""
+        mock_dependencies['config'].trust_video_extensions = True
+        content_processor = ContentProcessor(**mock_dependencies)
+        streaming_response = Mock()
+        mock_dependencies['video_streamer'].stream_video.return_value = streaming_response
+
+        result = await content_processor.process_content("https://example.com/video.mp4", 'GET', None, {}, "bytes=0-")
+
+        assert result is streaming_response
+        mock_dependencies['request_processor'].process_request.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_process_content_trusted_extension_error_status_fallback(self, mock_dependencies):
+        """Тест что ошибка источника (404) по короткому пути отдается обычным процессором с исходным статусом"""
+        mock_dependencies['config'].trust_video_extensions = True
+        mock_dependencies['config'].max_range_size = 10485760
+        mock_dependencies['content_getter'].get_content_info.return_value = _content_info(
+            status_code=404, content_type="text/html", content_length=512, method_used="HEAD")
+        # Настоящий стример: статус пробы проверяет он
+        mock_dependencies['video_streamer'] = VideoStreamerProcessor(
+            mock_dependencies['config'],
+            mock_dependencies['http_factory'],
+            mock_dependencies['content_getter'],
+            SimpleNamespace(),
+            SimpleNamespace())
+        content_processor = ContentProcessor(**mock_dependencies)
+        url = "https://example.com/missing.mp4"
+        headers = {}
+        not_found = Mock(status=404)
+        mock_dependencies['request_processor'].process_request.return_value = not_found
+
+        result = await content_processor.process_content(url, 'GET', None, headers)
+
+        assert result is not_found
+        mock_dependencies['content_getter'].get_content_info.assert_awaited_once_with(url, headers, use_head=True)
+        mock_dependencies['request_processor'].process_request.assert_awaited_once_with(url, 'GET', None, {})
 
-        result = await content_processor._is_video_content(url, headers)
+    @pytest.mark.asyncio
+    async def test_process_content_probed_video_error_status_fallback(self, content_processor, mock_dependencies):
+        """Тест что отказ стримера после пробы тоже переходит к обычному процессору"""
+        mock_dependencies['content_getter'].get_content_info.return_value = _content_info()
+        mock_dependencies['video_streamer'].stream_video.return_value = None
+
+        await content_processor.process_content("https://example.com/video.mp4", 'GET', None, {})
+
+        mock_dependencies['request_processor'].process_request.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_is_video_content_success_by_content_type(self, content_processor):
+        """Тест проверки видео контента по content-type"""
+        result = await content_processor._is_video_content("https://example.com/video.mp4", _content_info())
 
         assert result is True
-        mock_dependencies['content_getter'].get_content_info.assert_called_once_with(url, headers, use_head=True)
 
     @pytest.mark.asyncio
-    async def test_is_video_content_success_by_octet_stream_with_video_url(self, content_processor, mock_dependencies):
+    async def test_is_video_content_success_by_octet_stream_with_video_url(self, content_processor):
         """Тест проверки видео контента для octet-stream с видео URL"""
-        url = "https://example.com/video.mp4"
-        headers = {"Accept": "*/*"}
-
-        content_info = ContentInfoResponse(
-            status_code=200,
-            content_type="application/octet-stream",
-            content_length=1024000,
-            accept_ranges="bytes",
-            headers={},
-            method_used="HEAD"
-        )
+        content_info = _content_info(content_type="application/octet-stream", accept_ranges="none")
 
-        mock_dependencies['content_getter'].get_content_info.return_value = content_info
-
-        result = await content_processor._is_video_content(url, headers)
+        result = await content_processor._is_video_content("https://example.com/video.mp4", content_info)
 
         assert result is True
 
     @pytest.mark.asyncio
-    async def test_is_video_content_success_by_size_and_range(self, content_processor, mock_dependencies, caplog):
+    async def test_is_video_content_success_by_size_and_range(self, content_processor):
         """Тест проверки видео контента по размеру и поддержке range"""
-        url = "https://example.com/largefile.bin"
-        headers = {"Accept": "*/*"}
-
-        content_info = ContentInfoResponse(
-            status_code=200,
-            content_type="application/octet-stream",
-            content_length=2000000,
-            accept_ranges="bytes",
-            headers={},
-            method_used="HEAD"
-        )
-
-        mock_dependencies['content_getter'].get_content_info.return_value = content_info
+        content_info = _content_info(content_type="text/plain", content_length=2000000)
 
         with patch.object(content_processor, '_is_video_url', return_value=True):
-            with caplog.at_level('INFO'):
-                result = await content_processor._is_video_content(url, headers)
+            result = await content_processor._is_video_content("https://example.com/largefile.bin", content_info)
 
-            assert result is True
-            assert "Possible video detected by size and range support: 2000000 bytes" in caplog.text
+        assert result is True
 
     @pytest.mark.asyncio
-    async def test_is_video_content_non_200_status(self, content_processor, mock_dependencies):
-        """Тест проверки видео контента с статусом не 200/206"""
-        url = "https://example.com/video.mp4"
-        headers = {"Accept": "*/*"}
-
-        content_info = ContentInfoResponse(
-            status_code=404,
-            content_type="",
-            content_length=0,
-            accept_ranges="",
-            headers={},
-            method_used="HEAD"
-        )
+    async def test_is_video_content_not_video_url(self, content_processor):
+        """Тест что контент по URL без признаков видео не считается видео"""
+        result = await content_processor._is_video_content("https://example.com/page.html", _content_info())
 
-        mock_dependencies['content_getter'].get_content_info.return_value = content_info
+        assert result is False
 
-        result = await content_processor._is_video_content(url, headers)
+    @pytest.mark.asyncio
+    async def test_is_video_content_small_file_with_range(self, content_processor):
+        """Тест проверки маленького файла с поддержкой range"""
+        content_info = _content_info(content_type="text/plain", content_length=100000)
+
+        with patch.object(content_processor, '_is_video_url', return_value=True):
+            result = await content_processor._is_video_content("https://example.com/small.bin", content_info)
 
         assert result is False
 
     @pytest.mark.asyncio
-    async def test_is_video_content_with_error_in_response(self, content_processor, mock_dependencies, caplog):
-        """Тест проверки видео контента когда в ответе есть ошибка"""
-        url = "https://example.com/video.mp4"
-        headers = {"Accept": "*/*"}
-
-        content_info = ContentInfoResponse(
-            status_code=0,
-            content_type="",
-            content_length=0,
-            accept_ranges="",
-            headers={},
-            method_used="HEAD",
-            error="Connection timeout"
-        )
-
-        mock_dependencies['content_getter'].get_content_info.return_value = content_info
+    async def test_is_video_content_large_file_without_range(self, content_processor):
+        """Тест проверки большого файла без поддержки range"""
+        content_info = _content_info(content_type="text/plain", content_length=2000000, accept_ranges="none")
 
         with patch.object(content_processor, '_is_video_url', return_value=True):
-            with caplog.at_level('WARNING'):
-                result = await content_processor._is_video_content(url, headers)
+            result = await content_processor._is_video_content("https://example.com/large.bin", content_info)
 
-            assert result is True
-            assert "Error checking video content: Connection timeout" in caplog.text
+        assert result is False
 
     @pytest.mark.asyncio
-    async def test_is_video_content_exception_handling(self, content_processor, mock_dependencies):
-        """Тест обработки исключений при проверке видео контента"""
-        url = "https://example.com/video.mp4"
-        headers = {"Accept": "*/*"}
+    async def test_content_info_non_200_status(self, content_processor, mock_dependencies):
+        """Тест пробы контента со статусом не 200/206"""
+        mock_dependencies['content_getter'].get_content_info.return_value = _content_info(status_code=404)
 
-        mock_dependencies['content_getter'].get_content_info.side_effect = Exception("Network error")
-
-        with patch.object(content_processor, '_is_video_url', return_value=False):
-            result = await content_processor._is_video_content(url, headers)
+        result = await content_processor._content_info("https://example.com/video.mp4", {})
 
-            assert result is False
+        assert result is False
 
     @pytest.mark.asyncio
-    async def test_is_video_content_small_file_with_range(self, content_processor, mock_dependencies):
-        """Тест проверки маленького файла с поддержкой range"""
-        url = "https://example.com/small.bin"
-        headers = {"Accept": "*/*"}
-
-        content_info = ContentInfoResponse(
-            status_code=200,
-            content_type="application/octet-stream",
-            content_length=100000,
-            accept_ranges="bytes",
-            headers={},
-            method_used="HEAD"
-        )
-
-        mock_dependencies['content_getter'].get_content_info.return_value = content_info
+    async def test_content_info_with_error_in_response(self, content_processor, mock_dependencies):
+        """Тест что сетевая ошибка пробы не кэшируется"""
+        url = "https://example.com/video.mp4"
+        mock_dependencies['content_getter'].get_content_info.return_value = _content_info(
+            status_code=0, error="Connection timeout")
 
-        with patch.object(content_processor, '_is_video_url', return_value=False):
-            result = await content_processor._is_video_content(url, headers)
+        assert await content_processor._content_info(url, {}) is False
+        assert await content_processor._content_info(url, {}) is False
 
-            assert result is False
+        assert mock_dependencies['content_getter'].get_content_info.await_count == 2
 
     @pytest.mark.asyncio
-    async def test_is_video_content_large_file_without_range(self, content_processor, mock_dependencies):
-        """Тест проверки большого файла без поддержки range"""
-        url = "https://example.com/large.bin"
-        headers = {"Accept": "*/*"}
-
-        content_info = ContentInfoResponse(
-            status_code=200,
-            content_type="application/octet-stream",
-            content_length=2000000,
-            accept_ranges="none",
-            headers={},
-            method_used="HEAD"
-        )
+    async def test_content_info_exception_handling(self, content_processor, mock_dependencies):
+        """Тест обработки исключений при пробе контента"""
+        mock_dependencies['content_getter'].get_content_info.side_effect = Exception("Network error")
 
-        mock_dependencies['content_getter'].get_content_info.return_value = content_info
+        result = await content_processor._content_info("https://example.com/video.mp4", {})
 
-        with patch.object(content_processor, '_is_video_url', return_value=False):
-            result = await content_processor._is_video_content(url, headers)
+        assert result is False
 
-            assert result is False
+    @pytest.mark.asyncio
+    async def test_content_info_cached(self, content_processor, mock_dependencies):
+        """Тест что повторная проба того же URL берется из кэша"""
+        url = "https://example.com/video.mp4"
+        mock_dependencies['content_getter'].get_content_info.return_value = _content_info()
 
-    def test_is_video_url_by_extension(self, content_processor):
-        """Тест проверки видео URL по расширению файла"""
-        test_cases = [
-            "https://example.com/video.mp4",
-            "https://example.com/movie.avi",
-            "https://example.com/film.mkv",
-            "https://example.com/clip.mov"
-        ]
+        first = await content_processor._content_info(url, {})
+        second = await content_processor._content_info(url, {})
 
-        for url in test_cases:
-            result = content_processor._is_video_url(url)
-            assert result is True
+        assert first.content_type == second.content_type == "video/mp4"
+        mock_dependencies['content_getter'].get_content_info.assert_awaited_once()
 
-    def test_is_video_url_by_pattern(self, content_processor):
-        """Тест проверки видео URL по паттернам"""
-        test_cases = [
-            "https://example.com/api/video/stream123",
-            "https://example.com/stream/live",
-            "https://example.com/watch?video=true&id=123"
-        ]
+    @pytest.mark.asyncio
+    async def test_content_info_cached_for_repeat_range_requests(self, content_processor, mock_dependencies):
+        """Тест что перемотка (новые Range к тому же URL) не повторяет пробу контента"""
+        url = "https://example.com/video.mp4"
+        mock_dependencies['content_getter'].get_content_info.return_value = _content_info()
 
-        for url in test_cases:
-            result = content_processor._is_video_url(url)
-            assert result is True
+        for range_header in ("bytes=0-", "bytes=1000-", "bytes=500000-"):
+            result = await content_processor._content_info(url, {"Range": range_header})
+            assert result.content_length == 1024000
 
-    def test_is_video_url_negative_cases(self, content_processor):
-        """Тест отрицательных случаев проверки видео URL"""
-        test_cases = [
-            "https://example.com/image.jpg",
-            "https://example.com/document.pdf",
-            "https://example.com/audio.mp3",
-            "https://example.com/api/data",
-            "https://example.com/page.html"
-        ]
+        mock_dependencies['content_getter'].get_content_info.assert_awaited_once()
 
-        for url in test_cases:
-            result = content_processor._is_video_url(url)
-            assert result is False
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("header", ["Authorization", "Cookie"])
+    async def test_content_info_not_cached_with_client_credentials(self, content_processor, mock_dependencies, header):
+        """Тест что ответы на запросы с данными клиента не кэшируются"""
+        url = "https://example.com/video.mp4"
+        headers = {header: "secret"}
+        mock_dependencies['content_getter'].get_content_info.return_value = _content_info()
+
+        await content_processor._content_info(url, headers)
+        await content_processor._content_info(url, headers)
+
+        assert mock_dependencies['content_getter'].get_content_info.await_count == 2
+
+    @pytest.mark.parametrize("url", [
+        "https://example.com/video.mp4",
+        "https://example.com/movie.avi",
+        "https://example.com/film.mkv",
+        "https://example.com/clip.mov",
+        "https://example.com/CLIP.MOV",
+        "https://example.com/video.mp4;jsessionid=abc123",
+        "https://example.com/video.mp4;jsessionid=abc123?token=1",
+    ])
+    def test_is_video_url_by_extension(self, content_processor, url):
+        """Тест проверки видео URL по расширению файла"""
+        assert content_processor._is_video_url(url) is True
+
+    @pytest.mark.parametrize("url", [
+        "https://example.com/api/video/stream123",
+        "https://example.com/stream/live",
+        "https://example.com/watch?video=true&id=123",
+    ])
+    def test_is_video_url_by_pattern(self, content_processor, url):
+        """Тест проверки видео URL по паттернам"""
+        assert content_processor._is_video_url(url) is True
+
+    @pytest.mark.parametrize("url", [
+        "https://example.com/image.jpg",
+        "https://example.com/document.pdf",
+        "https://example.com/audio.mp3",
+        "https://example.com/api/data",
+        "https://example.com/page.html",
+    ])
+    def test_is_video_url_negative_cases(self, content_processor, url):
+        """Тест отрицательных случаев проверки видео URL"""
+        assert content_processor._is_video_url(url) is False
 
     def test_is_video_url_empty_path(self, content_processor):
         """Тест проверки видео URL с пустым путем"""
-        url = "https://example.com"
-
-        result = content_processor._is_video_url(url)
-
-        assert result is False
-
-    def test_is_video_content_type_positive(self, content_processor):
+        assert content_processor._is_video_url("https://example.com") is False
+
+    @pytest.mark.parametrize("content_type", [
+        "video/mp4",
+        "video/avi",
+        "video/x-matroska",
+        "video/quicktime",
+        "application/video+mp4",
+        "VIDEO/MP4",
+        "video/mp4; charset=utf-8",
+    ])
+    def test_is_video_content_type_positive(self, content_processor, content_type):
         """Тест положительных случаев проверки content-type"""
-        test_cases = [
-            "video/mp4",
-            "video/avi",
-            "video/x-matroska",
-            "video/quicktime",
-            "application/video+mp4",
-            "VIDEO/MP4"
-        ]
-
-        for content_type in test_cases:
-            result = content_processor._is_video_content_type(content_type)
-            assert result is True
-
-    def test_is_video_content_type_negative(self, content_processor):
+        assert content_processor._is_video_content_type(content_type) is True
+
+    @pytest.mark.parametrize("content_type", [
+        "image/jpeg",
+        "application/json",
+        "text/html",
+        "audio/mpeg",
+        "",
+        None,
+    ])
+    def test_is_video_content_type_negative(self, content_processor, content_type):
         """Тест отрицательных случаев проверки content-type"""
-        test_cases = [
-            "image/jpeg",
-            "application/json",
-            "text/html",
-            "audio/mpeg",
-            "",
-            None
-        ]
-
-        for content_type in test_cases:
-            result = content_processor._is_video_content_type(content_type)
-            assert result is False
+        assert content_processor._is_video_content_type(content_type) is False
 
     def test_initialization(self, mock_dependencies):
         """Тест инициализации ContentProcessor"""
@@ -365,79 +397,81 @@ class TestContentProcessor:
         assert processor.content_getter == mock_dependencies['content_getter']
         assert processor.video_streamer == mock_dependencies['video_streamer']
         assert processor.request_processor == mock_dependencies['request_processor']
-        assert processor.logger.name == 'lampa-proxy-content-processor'
+        assert processor.m3u8_processor == mock_dependencies['m3u8_processor']
+        assert processor.logger.name == 'content-processor'
 
     @pytest.mark.asyncio
-    async def test_process_content_logging(self, content_processor, mock_dependencies, caplog):
+    async def test_process_content_logging(self, content_processor, mock_dependencies, propagate_logs, caplog):
         """Тест логирования в process_content"""
         url = "https://example.com/video.mp4"
+        mock_dependencies['content_getter'].get_content_info.return_value = _content_info()
 
-        content_processor._is_video_content = AsyncMock(return_value=True)
-        mock_dependencies['video_streamer'].stream_video.return_value = Mock()
-
-        with caplog.at_level('INFO'):
+        with caplog.at_level('DEBUG', logger=content_processor.logger.name):
             await content_processor.process_content(url, 'GET')
 
         assert f"Processing GET content to: {url}" in caplog.text
-        assert f"Video content detected, using streaming: {url}" in caplog.text
 
     @pytest.mark.asyncio
-    async def test_is_video_content_logging(self, content_processor, mock_dependencies, caplog):
-        """Тест логирования в _is_video_content"""
+    async def test_is_video_content_logging(self, content_processor, propagate_logs, caplog):
+        """Тест логирования признаков видео в _is_video_content"""
         url = "https://example.com/video.mp4"
-        headers = {"Accept": "*/*"}
-
-        content_info = ContentInfoResponse(
-            status_code=200,
-            content_type="video/mp4",
-            content_length=1024000,
-            accept_ranges="bytes",
-            headers={},
-            method_used="HEAD"
-        )
 
-        mock_dependencies['content_getter'].get_content_info.return_value = content_info
+        with caplog.at_level('INFO', logger=content_processor.logger.name):
+            result = await content_processor._is_video_content(url, _content_info())
 
-        with caplog.at_level('INFO'):
-            result = await content_processor._is_video_content(url, headers)
-
-        assert "Video detected by content-type: video/mp4" in caplog.text
+        assert f"Video detected by CONTENT_TYPE|SIZE_RANGE: {url}" in caplog.text
         assert result is True
 
     @pytest.mark.asyncio
-    async def test_is_video_content_octet_stream_logging(self, content_processor, mock_dependencies, caplog):
+    async def test_is_video_content_octet_stream_logging(self, content_processor, propagate_logs, caplog):
         """Тест логирования для octet-stream в _is_video_content"""
         url = "https://example.com/video.mp4"
-        headers = {"Accept": "*/*"}
-
-        content_info = ContentInfoResponse(
-            status_code=200,
-            content_type="application/octet-stream",
-            content_length=1024000,
-            accept_ranges="bytes",
-            headers={},
-            method_used="HEAD"
-        )
-
-        mock_dependencies['content_getter'].get_content_info.return_value = content_info
+        content_info = _content_info(content_type="application/octet-stream", content_length=1024)
 
-        with caplog.at_level('INFO'):
-            result = await content_processor._is_video_content(url, headers)
+        with caplog.at_level('INFO', logger=content_processor.logger.name):
+            result = await content_processor._is_video_content(url, content_info)
 
-        assert f"Video detected as octet-stream with video URL: {url}" in caplog.text
+        assert f"Video detected by OCTET_STREAM: {url}" in caplog.text
         assert result is True
 
     @pytest.mark.asyncio
-    async def test_is_video_content_exception_logging(self, content_processor, mock_dependencies, caplog):
-        """Тест логирования исключений в _is_video_content"""
+    async def test_content_info_exception_logging(self, content_processor, mock_dependencies, propagate_logs, caplog):
+        """Тест логирования исключений при пробе контента"""
+        mock_dependencies['content_getter'].get_content_info.side_effect = Exception("Unexpected error")
+
+        with caplog.at_level('WARNING', logger=content_processor.logger.name):
+            await content_processor._content_info("https://example.com/video.mp4", {})
+
+        assert "Error checking m3u8 content: Unexpected error" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_content_info_cache_drops_sniffed_body(self, content_processor, mock_dependencies):
+        """Тест что в кэш попадают только метаданные пробы, без прочитанного начала тела"""
         url = "https://example.com/video.mp4"
-        headers = {"Accept": "*/*"}
+        mock_dependencies['content_getter'].get_content_info.return_value = _content_info(content=b"\x00" * 2048)
 
-        mock_dependencies['content_getter'].get_content_info.side_effect = Exception("Unexpected error")
+        first = await content_processor._content_info(url, {})
+        cached = await content_processor._content_info(url, {})
+
+        assert first.content == b"\x00" * 2048
+        assert cached.content is None
+        assert cached.content_type == "video/mp4"
+        mock_dependencies['content_getter'].get_content_info.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_content_info_m3u8_not_cached(self, content_processor, mock_dependencies):
+        """Тест что живой плейлист запрашивается заново, а не отдается из кэша"""
+        url = "https://example.com/live/index.m3u8"
+        mock_dependencies['content_getter'].get_content_info.side_effect = [
+            _content_info(content_type="application/vnd.apple.mpegurl", content_length=20,
+                          content=b"#EXTM3U\n#EXT-X-SEQ:1"),
+            _content_info(content_type="application/vnd.apple.mpegurl", content_length=20,
+                          content=b"#EXTM3U\n#EXT-X-SEQ:2"),
+        ]
 
-        with caplog.at_level('WARNING'):
-            with patch.object(content_processor, '_is_video_url', return_value=True):
-                result = await content_processor._is_video_content(url, headers)
+        first = await content_processor._content_info(url, {})
+        second = await content_processor._content_info(url, {})
 
-        assert "Error checking video content: Unexpected error" in caplog.text
-        assert result is True
\ No newline at end of file
+        assert first.content.endswith(b"1")
+        assert second.content.endswith(b"2")
+        assert mock_dependencies['content_getter'].get_content_info.await_count == 2
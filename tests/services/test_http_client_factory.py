@@ -1,19 +1,88 @@
+import asyncio
+
 import pytest
 import httpx
-from unittest.mock import Mock, AsyncMock, patch, call
+from types import SimpleNamespace
+from unittest.mock import Mock, MagicMock, call, ANY
 from typing import Dict
 
 from src.models.interfaces import IConfig, ITimeoutConfigurator
-from src.services.http_client_factory import HttpClientFactory
+from src.services.utils import http_client_factory as http_client_factory_module
+from src.services.utils.http_client_factory import HttpClientFactory, PooledClient, CLIENT_LIMITS
+
+
+# Параметры httpx.AsyncClient, общие для всех клиентов пула (timeout подставляется в тесте)
+CLIENT_PARAMS = {
+    'follow_redirects': True,
+    'verify': False,
+    'http2': True,
+    'limits': CLIENT_LIMITS,
+    'cookies': ANY,
+}
+
+CUSTOM_TIMEOUT = Mock(spec=httpx.Timeout)
+
+# (аргументы create_client, отличия параметров AsyncClient от CLIENT_PARAMS)
+CREATE_CLIENT_CASES = [
+    pytest.param({}, {}, id="default"),
+    pytest.param({'headers': {"User-Agent": "test-agent", "Accept": "application/json"}}, {}, id="custom_headers"),
+    pytest.param({'headers': None}, {}, id="none_headers"),
+    pytest.param({'proxy': "http://proxy.example.com:8080"}, {'proxy': "http://proxy.example.com:8080"}, id="proxy"),
+    pytest.param({'timeout': CUSTOM_TIMEOUT}, {'timeout': CUSTOM_TIMEOUT}, id="custom_timeout"),
+    pytest.param({'verify_ssl': True}, {'verify': True}, id="ssl_verification"),
+    pytest.param({'follow_redirects': False}, {'follow_redirects': False}, id="without_redirects"),
+    pytest.param({'is_video': True}, {}, id="video_content"),
+    pytest.param(
+        {
+            'headers': {"Authorization": "Bearer token"},
+            'is_video': True,
+            'follow_redirects': False,
+            'verify_ssl': True,
+            'proxy': "http://proxy:8080",
+            'timeout': CUSTOM_TIMEOUT,
+        },
+        {'timeout': CUSTOM_TIMEOUT, 'follow_redirects': False, 'verify': True, 'proxy': "http://proxy:8080"},
+        id="multiple_parameters",
+    ),
+]
+
+
+class _AsyncStub:
+    """Асинхронная заглушка метода: запоминает вызовы, возвращает return_value или бросает side_effect"""
+
+    def __init__(self, return_value=None, side_effect=None):
+        self.return_value = return_value
+        self.side_effect = side_effect
+        self.calls = []
+
+    async def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        if self.side_effect is not None:
+            raise self.side_effect
+        return self.return_value
+
+
+def _stub_client(**methods) -> SimpleNamespace:
+    """Заглушка httpx.AsyncClient: aclose и переданные асинхронные методы"""
+    return SimpleNamespace(aclose=_AsyncStub(), **methods)
+
+
+@pytest.fixture(scope="module")
+def event_loop():
+    """Один event loop на модуль: тесты только ожидают короткие корутины, создавать loop на каждый не нужно"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
 
 
 class TestHttpClientFactory:
     """Тесты для HttpClientFactory"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_dependencies(self):
-        """Создает моки всех зависимостей"""
+        """Создает моки всех зависимостей один раз на модуль: spec-моки дорого создавать"""
         config = Mock(spec=IConfig)
+        config.log_level = 'INFO'
         timeout_configurator = Mock(spec=ITimeoutConfigurator)
 
         return {
@@ -21,209 +90,86 @@ class TestHttpClientFactory:
             'timeout_configurator': timeout_configurator
         }
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def http_client_factory(self, mock_dependencies):
         """Создает экземпляр HttpClientFactory с моками зависимостей"""
         return HttpClientFactory(**mock_dependencies)
 
-    @pytest.mark.asyncio
-    async def test_create_client_default_params(self, http_client_factory, mock_dependencies):
-        """Тест создания клиента с параметрами по умолчанию"""
-        default_timeout = Mock()
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = default_timeout
-
-        mock_client = AsyncMock()
-
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client) as mock_client_class:
-            async with http_client_factory.create_client() as client:
-                pass
-
-        mock_dependencies['timeout_configurator'].create_timeout_config.assert_called_once()
-        mock_client_class.assert_called_once_with(
-            headers={},
-            timeout=default_timeout,
-            follow_redirects=True,
-            verify=False
-        )
+    @pytest.fixture(autouse=True)
+    def reset_dependencies(self, mock_dependencies, http_client_factory):
+        """Сбрасывает состояние общих моков и пул клиентов фабрики перед каждым тестом"""
+        for dependency in mock_dependencies.values():
+            dependency.reset_mock(return_value=True, side_effect=True)
+        http_client_factory._client_cache.clear()
+
+    @pytest.fixture(autouse=True)
+    def propagate_logs(self, http_client_factory, monkeypatch):
+        """Логгер фабрики не передает записи корневому логгеру, caplog их без этого не видит"""
+        monkeypatch.setattr(http_client_factory.logger, 'propagate', True)
+
+    @pytest.fixture(autouse=True)
+    def patched_async_client(self, monkeypatch):
+        """Подменяет httpx.AsyncClient один раз на тест, тесты настраивают и проверяют общий мок"""
+        mock_client_class = MagicMock()
+        monkeypatch.setattr(http_client_factory_module.httpx, 'AsyncClient', mock_client_class)
+        return mock_client_class
 
     @pytest.mark.asyncio
-    async def test_create_client_with_custom_headers(self, http_client_factory, mock_dependencies):
-        """Тест создания клиента с кастомными headers"""
-        headers = {"User-Agent": "test-agent", "Accept": "application/json"}
+    @pytest.mark.parametrize("kwargs,expected", CREATE_CLIENT_CASES)
+    async def test_create_client_params(self, http_client_factory, mock_dependencies, patched_async_client, kwargs, expected):
+        """Тест параметров, с которыми создается клиент пула"""
         default_timeout = Mock()
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = default_timeout
-
-        mock_client = AsyncMock()
+        create_timeout_config = mock_dependencies['timeout_configurator'].create_timeout_config
+        create_timeout_config.return_value = default_timeout
 
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client) as mock_client_class:
-            async with http_client_factory.create_client(headers=headers) as client:
-                pass
+        mock_client = _stub_client()
+        patched_async_client.return_value = mock_client
 
-        mock_client_class.assert_called_with(
-            headers=headers.copy(),
-            timeout=default_timeout,
-            follow_redirects=True,
-            verify=False
-        )
+        async with http_client_factory.create_client(**kwargs) as client:
+            pass
 
-    @pytest.mark.asyncio
-    async def test_create_client_with_proxy(self, http_client_factory, mock_dependencies, caplog):
-        """Тест создания клиента с прокси"""
-        proxy_url = "http://proxy.example.com:8080"
-        default_timeout = Mock()
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = default_timeout
-
-        mock_client = AsyncMock()
-
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client) as mock_client_class:
-            with caplog.at_level('INFO'):
-                async with http_client_factory.create_client(proxy=proxy_url) as client:
-                    pass
-
-        mock_client_class.assert_called_with(
-            headers={},
-            timeout=default_timeout,
-            follow_redirects=True,
-            verify=False,
-            proxy=proxy_url
-        )
-        assert f"Using specified proxy: {proxy_url}" in caplog.text
-
-    @pytest.mark.asyncio
-    async def test_create_client_with_custom_timeout(self, http_client_factory, mock_dependencies):
-        """Тест создания клиента с кастомным timeout"""
-        custom_timeout = Mock(spec=httpx.Timeout)
-
-        mock_client = AsyncMock()
-
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client) as mock_client_class:
-            async with http_client_factory.create_client(timeout=custom_timeout) as client:
-                pass
+        patched_async_client.assert_called_once_with(**{**CLIENT_PARAMS, 'timeout': default_timeout, **expected})
+        if 'timeout' in kwargs:
+            create_timeout_config.assert_not_called()
+        else:
+            create_timeout_config.assert_called_once()
 
-        mock_dependencies['timeout_configurator'].create_timeout_config.assert_not_called()
-        mock_client_class.assert_called_with(
-            headers={},
-            timeout=custom_timeout,
-            follow_redirects=True,
-            verify=False
-        )
+        # Заголовки привязываются к запросу, а не к общему клиенту
+        assert isinstance(client, PooledClient)
+        assert client.client is mock_client
+        assert client.headers == (kwargs.get('headers') or {})
 
     @pytest.mark.asyncio
-    async def test_create_client_with_ssl_verification(self, http_client_factory, mock_dependencies):
-        """Тест создания клиента с проверкой SSL"""
+    async def test_create_client_not_closed_on_exit(self, http_client_factory, mock_dependencies, patched_async_client):
+        """Тест что клиент из пула не закрывается при выходе из контекста"""
         default_timeout = Mock()
         mock_dependencies['timeout_configurator'].create_timeout_config.return_value = default_timeout
 
-        mock_client = AsyncMock()
+        mock_client = _stub_client()
+        patched_async_client.return_value = mock_client
 
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client) as mock_client_class:
-            async with http_client_factory.create_client(verify_ssl=True) as client:
-                pass
-
-        mock_client_class.assert_called_with(
-            headers={},
-            timeout=default_timeout,
-            follow_redirects=True,
-            verify=True
-        )
-
-    @pytest.mark.asyncio
-    async def test_create_client_without_redirects(self, http_client_factory, mock_dependencies):
-        """Тест создания клиента без следования редиректам"""
-        default_timeout = Mock()
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = default_timeout
-
-        mock_client = AsyncMock()
-
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client) as mock_client_class:
-            async with http_client_factory.create_client(follow_redirects=False) as client:
-                pass
-
-        mock_client_class.assert_called_with(
-            headers={},
-            timeout=default_timeout,
-            follow_redirects=False,
-            verify=False
-        )
-
-    @pytest.mark.asyncio
-    async def test_create_client_for_video_content(self, http_client_factory, mock_dependencies):
-        """Тест создания клиента для видео контента"""
-        default_timeout = Mock()
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = default_timeout
-
-        mock_client = AsyncMock()
-
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client) as mock_client_class:
-            async with http_client_factory.create_client(is_video=True) as client:
-                pass
+        async with http_client_factory.create_client() as client:
+            pass
 
-        mock_client_class.assert_called_with(
-            headers={},
-            timeout=default_timeout,
-            follow_redirects=True,
-            verify=False
-        )
+        assert mock_client.aclose.calls == []
 
     @pytest.mark.asyncio
-    async def test_create_client_closes_on_exit(self, http_client_factory, mock_dependencies):
-        """Тест что клиент закрывается при выходе из контекста"""
+    async def test_create_client_kept_on_exception(self, http_client_factory, mock_dependencies, patched_async_client):
+        """Тест что клиент остается в пуле при исключении внутри контекста"""
         default_timeout = Mock()
         mock_dependencies['timeout_configurator'].create_timeout_config.return_value = default_timeout
 
-        mock_client = AsyncMock()
+        mock_client = _stub_client()
+        patched_async_client.return_value = mock_client
 
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client):
+        try:
             async with http_client_factory.create_client() as client:
-                pass
+                raise ValueError("Test exception")
+        except ValueError:
+            pass
 
-        mock_client.aclose.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_create_client_closes_on_exception(self, http_client_factory, mock_dependencies):
-        """Тест что клиент закрывается даже при исключении внутри контекста"""
-        default_timeout = Mock()
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = default_timeout
-
-        mock_client = AsyncMock()
-
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client):
-            try:
-                async with http_client_factory.create_client() as client:
-                    raise ValueError("Test exception")
-            except ValueError:
-                pass
-
-        mock_client.aclose.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_create_client_multiple_parameters_combination(self, http_client_factory, mock_dependencies):
-        """Тест создания клиента с комбинацией различных параметров"""
-        custom_timeout = Mock(spec=httpx.Timeout)
-        headers = {"Authorization": "Bearer token"}
-        proxy = "http://proxy:8080"
-
-        mock_client = AsyncMock()
-
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client) as mock_client_class:
-            async with http_client_factory.create_client(
-                headers=headers,
-                is_video=True,
-                follow_redirects=False,
-                verify_ssl=True,
-                proxy=proxy,
-                timeout=custom_timeout
-            ) as client:
-                pass
-
-        mock_dependencies['timeout_configurator'].create_timeout_config.assert_not_called()
-        mock_client_class.assert_called_with(
-            headers=headers.copy(),
-            timeout=custom_timeout,
-            follow_redirects=False,
-            verify=True,
-            proxy=proxy
-        )
+        assert mock_client.aclose.calls == []
+        assert list(http_client_factory._client_cache.values()) == [mock_client]
 
     @pytest.mark.asyncio
     async def test_cleanup_empty_cache(self, http_client_factory):
@@ -233,42 +179,78 @@ class TestHttpClientFactory:
     @pytest.mark.asyncio
     async def test_cleanup_with_clients(self, http_client_factory):
         """Тест очистки кэша с клиентами"""
-        mock_client1 = AsyncMock()
-        mock_client2 = AsyncMock()
+        mock_client1 = _stub_client()
+        mock_client2 = _stub_client()
 
-        http_client_factory._client_cache = {
+        http_client_factory._client_cache.update({
             'client1': mock_client1,
             'client2': mock_client2
-        }
+        })
 
         await http_client_factory.cleanup()
 
-        mock_client1.aclose.assert_called_once()
-        mock_client2.aclose.assert_called_once()
+        assert len(mock_client1.aclose.calls) == 1
+        assert len(mock_client2.aclose.calls) == 1
         assert http_client_factory._client_cache == {}
 
     @pytest.mark.asyncio
     async def test_cleanup_with_client_close_error(self, http_client_factory, caplog):
         """Тест очистки кэша когда закрытие клиента вызывает ошибку"""
-        mock_client1 = AsyncMock()
-        mock_client2 = AsyncMock()
+        mock_client1 = _stub_client()
+        mock_client2 = _stub_client()
         mock_client1.aclose.side_effect = Exception("Close error")
 
-        http_client_factory._client_cache = {
+        http_client_factory._client_cache.update({
             'client1': mock_client1,
             'client2': mock_client2
-        }
+        })
 
         with caplog.at_level('WARNING'):
             await http_client_factory.cleanup()
 
-        mock_client1.aclose.assert_called_once()
-        mock_client2.aclose.assert_called_once()
+        assert len(mock_client1.aclose.calls) == 1
+        assert len(mock_client2.aclose.calls) == 1
         assert "Error closing cached client client1: Close error" in caplog.text
         assert http_client_factory._client_cache == {}
 
     @pytest.mark.asyncio
-    async def test_create_client_headers_isolation(self, http_client_factory, mock_dependencies):
+    async def test_discard_proxy_clients(self, http_client_factory, mock_dependencies, patched_async_client):
+        """Тест что клиенты выбывшего прокси убираются из кэша и закрываются, остальные остаются"""
+        removed_clients = [_stub_client(), _stub_client()]
+        kept_client = _stub_client()
+        patched_async_client.side_effect = [*removed_clients, kept_client]
+
+        async with http_client_factory.create_client(proxy="http://proxy1:8080"):
+            pass
+        async with http_client_factory.create_client(proxy="http://proxy1:8080", verify_ssl=True):
+            pass
+        async with http_client_factory.create_client(proxy="http://proxy2:8080"):
+            pass
+
+        http_client_factory.discard_proxy_clients("http://proxy1:8080")
+        await asyncio.gather(*http_client_factory._closing_tasks)
+
+        assert [len(client.aclose.calls) for client in removed_clients] == [1, 1]
+        assert kept_client.aclose.calls == []
+        assert list(http_client_factory._client_cache.values()) == [kept_client]
+
+    @pytest.mark.asyncio
+    async def test_cleanup_waits_for_discarded_clients(self, http_client_factory, patched_async_client):
+        """Тест что cleanup дожидается фонового закрытия клиентов выбывших прокси"""
+        mock_client = _stub_client()
+        patched_async_client.return_value = mock_client
+
+        async with http_client_factory.create_client(proxy="http://proxy1:8080"):
+            pass
+
+        http_client_factory.discard_proxy_clients("http://proxy1:8080")
+        await http_client_factory.cleanup()
+
+        assert len(mock_client.aclose.calls) == 1
+        assert http_client_factory._closing_tasks == set()
+
+    @pytest.mark.asyncio
+    async def test_create_client_headers_isolation(self, http_client_factory, mock_dependencies, patched_async_client):
         """Тест что headers изолированы и не мутируют внешний объект"""
         original_headers = {"original": "header"}
         headers = original_headers.copy()
@@ -276,14 +258,13 @@ class TestHttpClientFactory:
         default_timeout = Mock()
         mock_dependencies['timeout_configurator'].create_timeout_config.return_value = default_timeout
 
-        mock_client = AsyncMock()
+        mock_client = _stub_client()
+        patched_async_client.return_value = mock_client
 
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client) as mock_client_class:
-            async with http_client_factory.create_client(headers=headers) as client:
-                headers["modified"] = "true"
+        async with http_client_factory.create_client(headers=headers) as client:
+            headers["modified"] = "true"
 
-        call_kwargs = mock_client_class.call_args[1]
-        assert call_kwargs['headers'] == {"original": "header"}
+        assert client.headers == {"original": "header"}
 
     def test_initialization(self, mock_dependencies):
         """Тест инициализации HttpClientFactory"""
@@ -291,99 +272,108 @@ class TestHttpClientFactory:
 
         assert factory.config == mock_dependencies['config']
         assert factory.timeout_configurator == mock_dependencies['timeout_configurator']
-        assert factory.logger.name == 'lampa-proxy-http-factory'
+        assert factory.logger.name == 'http-factory'
         assert factory._client_cache == {}
 
     @pytest.mark.asyncio
-    async def test_create_client_multiple_contexts(self, http_client_factory, mock_dependencies):
-        """Тест создания нескольких клиентов в разных контекстах"""
+    async def test_create_client_multiple_contexts(self, http_client_factory, mock_dependencies, patched_async_client):
+        """Тест что клиент с теми же параметрами переиспользуется в разных контекстах"""
         default_timeout = Mock()
         mock_dependencies['timeout_configurator'].create_timeout_config.return_value = default_timeout
 
-        mock_client1 = AsyncMock()
-        mock_client2 = AsyncMock()
-
-        with patch('src.services.http_client_factory.httpx.AsyncClient') as mock_client_class:
-            mock_client_class.side_effect = [mock_client1, mock_client2]
-
-            async with http_client_factory.create_client() as client1:
-                pass
-
-            async with http_client_factory.create_client() as client2:
-                pass
-
-        assert mock_client_class.call_count == 2
-        mock_client1.aclose.assert_called_once()
-        mock_client2.aclose.assert_called_once()
+        mock_client1 = _stub_client()
+        mock_client2 = _stub_client()
 
-    @pytest.mark.asyncio
-    async def test_create_client_with_none_headers(self, http_client_factory, mock_dependencies):
-        """Тест создания клиента с явным None в headers"""
-        default_timeout = Mock()
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = default_timeout
+        patched_async_client.side_effect = [mock_client1, mock_client2]
 
-        mock_client = AsyncMock()
+        async with http_client_factory.create_client() as client1:
+            pass
 
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client) as mock_client_class:
-            async with http_client_factory.create_client(headers=None) as client:
-                pass
+        async with http_client_factory.create_client() as client2:
+            pass
 
-        mock_client_class.assert_called_with(
-            headers={},
-            timeout=default_timeout,
-            follow_redirects=True,
-            verify=False
-        )
+        assert patched_async_client.call_count == 1
+        assert client1.client is client2.client is mock_client1
+        assert mock_client1.aclose.calls == []
 
     @pytest.mark.asyncio
-    async def test_create_client_proxy_logging_only_when_proxy_present(self, http_client_factory, mock_dependencies, caplog):
+    async def test_create_client_proxy_logging_only_when_proxy_present(self, http_client_factory, mock_dependencies, patched_async_client, caplog):
         """Тест что логирование прокси происходит только когда прокси указан"""
         default_timeout = Mock()
         mock_dependencies['timeout_configurator'].create_timeout_config.return_value = default_timeout
 
-        mock_client = AsyncMock()
+        mock_client = _stub_client()
+        patched_async_client.return_value = mock_client
 
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client):
-            with caplog.at_level('INFO'):
-                async with http_client_factory.create_client() as client:
-                    pass
+        with caplog.at_level('INFO'):
+            async with http_client_factory.create_client() as client:
+                pass
 
         assert "Using specified proxy:" not in caplog.text
 
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client):
-            with caplog.at_level('INFO'):
-                async with http_client_factory.create_client(proxy="http://proxy:8080") as client:
-                    pass
+        with caplog.at_level('INFO'):
+            async with http_client_factory.create_client(proxy="http://proxy:8080") as client:
+                pass
 
         assert "Using specified proxy: http://proxy:8080" in caplog.text
 
     @pytest.mark.asyncio
     async def test_cleanup_logging(self, http_client_factory, caplog):
         """Тест логирования при очистке кэша"""
-        mock_client = AsyncMock()
-        http_client_factory._client_cache = {'test_client': mock_client}
+        mock_client = _stub_client()
+        http_client_factory._client_cache.update({'test_client': mock_client})
 
-        with caplog.at_level('DEBUG'):
+        with caplog.at_level('DEBUG', logger=http_client_factory.logger.name):
             await http_client_factory.cleanup()
 
         assert "Closed cached client: test_client" in caplog.text
 
     @pytest.mark.asyncio
-    async def test_create_client_real_usage_pattern(self, http_client_factory, mock_dependencies):
+    async def test_create_client_real_usage_pattern(self, http_client_factory, mock_dependencies, patched_async_client):
         """Тест реального паттерна использования клиента"""
         default_timeout = Mock()
         mock_dependencies['timeout_configurator'].create_timeout_config.return_value = default_timeout
 
-        mock_client = AsyncMock()
         mock_response = Mock()
-        mock_client.get.return_value = mock_response
+        mock_client = _stub_client(get=_AsyncStub(return_value=mock_response))
+
+        patched_async_client.return_value = mock_client
+
+        async with http_client_factory.create_client(
+            headers={"User-Agent": "Test"},
+            follow_redirects=False
+        ) as client:
+            response = await client.get("https://example.com")
+
+        assert mock_client.get.calls == [(("https://example.com",), {'headers': {"User-Agent": "Test"}})]
+        assert mock_client.aclose.calls == []
+
+    @pytest.mark.asyncio
+    async def test_create_client_separate_cache_entries(self, http_client_factory, mock_dependencies, patched_async_client):
+        """Тест что разные параметры соединения дают разные клиенты"""
+        default_timeout = Mock()
+        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = default_timeout
+
+        patched_async_client.side_effect = [_stub_client(), _stub_client()]
+
+        async with http_client_factory.create_client(proxy="http://proxy:8080") as client1:
+            pass
+
+        async with http_client_factory.create_client() as client2:
+            pass
+
+        assert patched_async_client.call_count == 2
+        assert client1.client is not client2.client
+        assert len(http_client_factory._client_cache) == 2
+
+    @pytest.mark.asyncio
+    async def test_pooled_client_merges_request_headers(self):
+        """Тест что заголовки запроса дополняют заголовки контекста"""
+        mock_client = _stub_client(head=_AsyncStub())
+        client = PooledClient(mock_client, {"User-Agent": "Test", "Accept": "*/*"})
 
-        with patch('src.services.http_client_factory.httpx.AsyncClient', return_value=mock_client):
-            async with http_client_factory.create_client(
-                headers={"User-Agent": "Test"},
-                follow_redirects=False
-            ) as client:
-                response = await client.get("https://example.com")
+        await client.head("https://example.com", headers={"Accept": "video/mp4"})
 
-        mock_client.get.assert_called_once_with("https://example.com")
-        mock_client.aclose.assert_called_once()
\ No newline at end of file
+        assert mock_client.head.calls == [
+            (("https://example.com",), {'headers': {"User-Agent": "Test", "Accept": "video/mp4"}})
+        ]
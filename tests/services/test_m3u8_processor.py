@@ -0,0 +1,244 @@
+import pytest
+import httpx
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+from src.models.responses import ContentInfoResponse
+from src.services.processors import m3u8_processor
+from src.services.processors.m3u8_processor import M3U8Processor
+from src.services.utils.http_client_factory import PooledClient
+from src.utils.url_utils import encode_base64_url
+
+
+PLAYLIST_URL = "https://cdn.example.com/live/index.m3u8"
+ENC_PREFIX = "http://proxy.local/enc2/"
+PROXY = "http://proxy.example.com:8080"
+
+
+def _proxied(url: str) -> str:
+    """Ожидаемая переписанная ссылка"""
+    return ENC_PREFIX + encode_base64_url(url)
+
+
+class _AsyncContext:
+    """Асинхронный контекстный менеджер, отдающий заранее заданное значение"""
+
+    def __init__(self, value):
+        self.value = value
+
+    async def __aenter__(self):
+        return self.value
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+class TestM3U8Processor:
+    """Тесты для M3U8Processor: потоковая перезапись плейлиста через MockTransport"""
+
+    @pytest.fixture
+    def routes(self):
+        """Ответы MockTransport по пути запроса: фабрика httpx.Response"""
+        return {}
+
+    @pytest.fixture
+    async def dependencies(self, routes):
+        """Конфигурация, фабрика клиентов поверх MockTransport и генератор прокси без прокси"""
+        def handler(request: httpx.Request) -> httpx.Response:
+            return routes[request.url.path]()
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        config = SimpleNamespace(log_level='INFO', our_scheme='http', our_domain='proxy.local')
+        http_factory = SimpleNamespace(create_client=Mock(
+            side_effect=lambda headers=None, **kwargs: _AsyncContext(PooledClient(client, dict(headers or {})))))
+        proxy_generator = SimpleNamespace(
+            has_proxies=Mock(return_value=False),
+            get_proxy=AsyncMock(return_value=PROXY),
+            mark_success=Mock(),
+            mark_failure=Mock(),
+            release=Mock())
+        timeout_configurator = SimpleNamespace(create_timeout_config=Mock(return_value=None))
+
+        yield SimpleNamespace(
+            config=config,
+            http_factory=http_factory,
+            proxy_generator=proxy_generator,
+            timeout_configurator=timeout_configurator)
+        await client.aclose()
+
+    @pytest.fixture
+    def processor(self, dependencies):
+        return M3U8Processor(
+            dependencies.config,
+            dependencies.http_factory,
+            dependencies.proxy_generator,
+            dependencies.timeout_configurator,
+            SimpleNamespace())
+
+    @staticmethod
+    async def _read(response) -> str:
+        return b''.join([chunk async for chunk in response.body_iterator]).decode('utf-8')
+
+    @staticmethod
+    def _serve(routes, *chunks: bytes):
+        """Плейлист источника, отдаваемый заданными кусками"""
+        async def body():
+            for chunk in chunks:
+                yield chunk
+
+        routes['/live/index.m3u8'] = lambda: httpx.Response(200, content=body())
+
+    @pytest.mark.asyncio
+    async def test_lines_split_across_chunks(self, processor, routes, monkeypatch):
+        """Тест что строка, разрезанная границей чанка, переписывается целиком"""
+        # Arrange
+        monkeypatch.setattr(m3u8_processor, 'M3U8_CHUNK_SIZE', 7)
+        self._serve(routes, b"#EXTM3U\n#EXTINF:4,\nhttps://media.exa", b"mple.com/seg1.ts\n#EXTINF:4,\nseg2", b".ts\n")
+
+        # Act
+        result = await self._read(await processor.process_request(PLAYLIST_URL, headers={}))
+
+        # Assert
+        assert result == (
+            "#EXTM3U\n#EXTINF:4,\n"
+            f"{_proxied('https://media.example.com/seg1.ts')}\n"
+            "#EXTINF:4,\n"
+            f"{_proxied('https://cdn.example.com/live/seg2.ts')}\n"
+        )
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("newline", ["\r\n", "\r"])
+    async def test_line_endings_preserved(self, processor, routes, monkeypatch, newline):
+        """Тест CRLF и одиночного CR: окончания строк сохраняются, URL переписываются"""
+        # Arrange
+        monkeypatch.setattr(m3u8_processor, 'M3U8_CHUNK_SIZE', 5)
+        playlist = newline.join(["#EXTM3U", "#EXTINF:4,", "seg1.ts", "#EXTINF:4,", "seg2.ts", ""])
+        self._serve(routes, playlist.encode('utf-8'))
+
+        # Act
+        result = await self._read(await processor.process_request(PLAYLIST_URL, headers={}))
+
+        # Assert
+        assert result == newline.join([
+            "#EXTM3U",
+            "#EXTINF:4,",
+            _proxied("https://cdn.example.com/live/seg1.ts"),
+            "#EXTINF:4,",
+            _proxied("https://cdn.example.com/live/seg2.ts"),
+            "",
+        ])
+
+    @pytest.mark.asyncio
+    async def test_relative_and_root_relative_urls(self, processor, routes):
+        """Тест что относительные ссылки разрешаются от URL плейлиста, а от корня - от домена"""
+        # Arrange
+        self._serve(routes, b"#EXTM3U\n../vod/seg1.ts\n/media/seg2.ts\nseg3.ts?token=abc\n")
+
+        # Act
+        result = await self._read(await processor.process_request(PLAYLIST_URL, headers={}))
+
+        # Assert
+        assert result.splitlines() == [
+            "#EXTM3U",
+            _proxied("https://cdn.example.com/vod/seg1.ts"),
+            _proxied("https://cdn.example.com/media/seg2.ts"),
+            _proxied("https://cdn.example.com/live/seg3.ts?token=abc"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_uri_attributes_rewritten(self, processor, routes):
+        """Тест что переписывается только URI= в #EXT-X-KEY и #EXT-X-MAP, остальные атрибуты остаются"""
+        # Arrange
+        self._serve(
+            routes,
+            b'#EXTM3U\n'
+            b'#EXT-X-KEY:METHOD=AES-128,URI="https://keys.example.com/key.bin",IV=0x1234\n'
+            b'#EXT-X-MAP:URI="init.mp4",BYTERANGE="720@0"\n'
+            b'#EXT-X-TARGETDURATION:4\n')
+
+        # Act
+        result = await self._read(await processor.process_request(PLAYLIST_URL, headers={}))
+
+        # Assert
+        assert result.splitlines() == [
+            "#EXTM3U",
+            f'#EXT-X-KEY:METHOD=AES-128,URI="{_proxied("https://keys.example.com/key.bin")}",IV=0x1234',
+            f'#EXT-X-MAP:URI="{_proxied("https://cdn.example.com/live/init.mp4")}",BYTERANGE="720@0"',
+            "#EXT-X-TARGETDURATION:4",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_prefetched_prefix_reused(self, processor, dependencies):
+        """Тест что плейлист, целиком вошедший в начало файла из пробы, не запрашивается повторно"""
+        # Arrange
+        playlist = b"#EXTM3U\n#EXTINF:4,\nseg1.ts\n"
+        content_info = ContentInfoResponse(
+            status_code=206,
+            content_type="application/vnd.apple.mpegurl",
+            content_length=len(playlist),
+            accept_ranges="bytes",
+            headers={},
+            method_used="GET_SNIFF",
+            content=playlist)
+
+        # Act
+        result = await self._read(await processor.process_request(PLAYLIST_URL, headers={}, content_info=content_info))
+
+        # Assert
+        assert result == f"#EXTM3U\n#EXTINF:4,\n{_proxied('https://cdn.example.com/live/seg1.ts')}\n"
+        dependencies.http_factory.create_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("content_length, headers", [
+        (4096, {}),  # Начало файла неполное
+        (27, {'content-encoding': 'gzip'}),  # Размер относится к сжатому телу
+    ])
+    async def test_prefetched_prefix_not_usable(self, processor, dependencies, routes, content_length, headers):
+        """Тест что неполное или сжатое начало файла не отдается, плейлист запрашивается заново"""
+        # Arrange
+        playlist = b"#EXTM3U\n#EXTINF:4,\nseg1.ts\n"
+        self._serve(routes, playlist)
+        content_info = ContentInfoResponse(
+            status_code=206,
+            content_type="application/vnd.apple.mpegurl",
+            content_length=content_length,
+            accept_ranges="bytes",
+            headers=headers,
+            method_used="GET_SNIFF",
+            content=playlist)
+
+        # Act
+        await self._read(await processor.process_request(PLAYLIST_URL, headers={}, content_info=content_info))
+
+        # Assert
+        dependencies.http_factory.create_client.assert_called_once()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status_code", [403, 404, 500])
+    async def test_non_200_returns_none_and_releases_proxy(self, processor, dependencies, routes, status_code):
+        """Тест что ошибочный статус возвращает None и освобождает прокси"""
+        # Arrange
+        dependencies.proxy_generator.has_proxies.return_value = True
+        routes['/live/index.m3u8'] = lambda: httpx.Response(status_code, content=b'error')
+
+        # Act
+        result = await processor.process_request(PLAYLIST_URL, headers={})
+
+        # Assert
+        assert result is None
+        dependencies.proxy_generator.release.assert_called_once_with(PROXY)
+
+    @pytest.mark.asyncio
+    async def test_streamed_playlist_releases_proxy(self, processor, dependencies, routes):
+        """Тест что прокси занят, пока плейлист отдается, и освобождается после отдачи"""
+        # Arrange
+        dependencies.proxy_generator.has_proxies.return_value = True
+        self._serve(routes, b"#EXTM3U\nseg1.ts\n")
+
+        # Act
+        response = await processor.process_request(PLAYLIST_URL, headers={})
+        dependencies.proxy_generator.release.assert_not_called()
+        await self._read(response)
+
+        # Assert
+        dependencies.proxy_generator.release.assert_called_once_with(PROXY)
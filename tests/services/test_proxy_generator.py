@@ -1,25 +1,61 @@
+import asyncio
+
 import pytest
-from unittest.mock import Mock, AsyncMock
+from unittest.mock import Mock
 from typing import Optional
 
 from src.models.interfaces import IProxyManager, IConfig
-from src.services.proxy_generator import DefaultProxyGenerator
+from src.services.proxy.proxy_generator import DefaultProxyGenerator
+
+
+# (use_proxy, working_proxies, ожидаемый результат get_proxy)
+_PROXY_MATRIX = [
+    (True, ["p1", "p2"], "p1"),
+    (True, [], None),
+    (True, None, None),
+    (False, ["p1", "p2"], None),
+    (False, [], None),
+    (False, None, None),
+]
+
+# Непустые коллекции прокси разных типов: list, tuple, set, dict (ключи)
+_PROXY_COLLECTIONS = [
+    ["p1", "p2"],
+    ("p1", "p2"),
+    {"p1", "p2"},
+    {"p1": "url1", "p2": "url2"},
+]
+
+
+@pytest.fixture(scope="module")
+def event_loop():
+    """Один event loop на модуль: тесты только ожидают короткие корутины, создавать loop на каждый не нужно"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
 
 
 class TestDefaultProxyGenerator:
     """Тесты для DefaultProxyGenerator"""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def mock_dependencies(self):
-        """Создает моки всех зависимостей"""
+        """Создает моки всех зависимостей один раз на модуль: spec-моки дорого создавать"""
         proxy_manager = Mock(spec=IProxyManager)
         config = Mock(spec=IConfig)
+        config.log_level = 'INFO'
 
         return {
             'proxy_manager': proxy_manager,
             'config': config
         }
 
+    @pytest.fixture(autouse=True)
+    def reset_dependencies(self, mock_dependencies):
+        """Сбрасывает вызовы и настроенные ответы общих моков перед каждым тестом"""
+        for dependency in mock_dependencies.values():
+            dependency.reset_mock(return_value=True, side_effect=True)
+
     @pytest.fixture
     def proxy_generator(self, mock_dependencies):
         """Создает экземпляр DefaultProxyGenerator с моками зависимостей"""
@@ -33,7 +69,7 @@ class TestDefaultProxyGenerator:
         # Assert
         assert generator.proxy_manager == mock_dependencies['proxy_manager']
         assert generator.config == mock_dependencies['config']
-        assert generator.logger.name == 'lampa-proxy-generator'
+        assert generator.logger.name == 'proxy-generator'
 
     @pytest.mark.asyncio
     async def test_get_proxy_with_proxies_available(self, proxy_generator, mock_dependencies):
@@ -42,14 +78,31 @@ class TestDefaultProxyGenerator:
         expected_proxy = "http://proxy.example.com:8080"
         mock_dependencies['config'].use_proxy = True
         mock_dependencies['proxy_manager'].working_proxies = [expected_proxy, "http://proxy2.example.com:8080"]
-        mock_dependencies['proxy_manager'].get_random_proxy.return_value = expected_proxy
+        mock_dependencies['proxy_manager'].get_proxy_p2c.return_value = expected_proxy
 
         # Act
         result = await proxy_generator.get_proxy()
 
         # Assert
         assert result == expected_proxy
-        mock_dependencies['proxy_manager'].get_random_proxy.assert_called_once()
+        mock_dependencies['proxy_manager'].get_proxy_p2c.assert_called_once()
+
+    def test_has_proxies_cached_until_invalidated(self, proxy_generator, mock_dependencies):
+        """Тест что has_proxies кэшируется до изменения списка прокси"""
+        # Arrange
+        mock_dependencies['config'].use_proxy = True
+        mock_dependencies['proxy_manager'].working_proxies = ["proxy1"]
+        assert proxy_generator.has_proxies() is True
+
+        # Act
+        mock_dependencies['proxy_manager'].working_proxies = []
+        cached = proxy_generator.has_proxies()
+        invalidate = mock_dependencies['proxy_manager'].add_listener.call_args[0][0]
+        invalidate()
+
+        # Assert
+        assert cached is True
+        assert proxy_generator.has_proxies() is False
 
     @pytest.mark.asyncio
     async def test_get_proxy_when_no_proxies_available(self, proxy_generator, mock_dependencies):
@@ -63,7 +116,7 @@ class TestDefaultProxyGenerator:
 
         # Assert
         assert result is None
-        mock_dependencies['proxy_manager'].get_random_proxy.assert_not_called()
+        mock_dependencies['proxy_manager'].get_proxy_p2c.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_get_proxy_when_use_proxy_false(self, proxy_generator, mock_dependencies):
@@ -77,7 +130,7 @@ class TestDefaultProxyGenerator:
 
         # Assert
         assert result is None
-        mock_dependencies['proxy_manager'].get_random_proxy.assert_not_called()
+        mock_dependencies['proxy_manager'].get_proxy_p2c.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_get_proxy_when_working_proxies_none(self, proxy_generator, mock_dependencies):
@@ -91,34 +144,41 @@ class TestDefaultProxyGenerator:
 
         # Assert
         assert result is None
-        mock_dependencies['proxy_manager'].get_random_proxy.assert_not_called()
+        mock_dependencies['proxy_manager'].get_proxy_p2c.assert_not_called()
 
-    @pytest.mark.asyncio
-    async def test_mark_success(self, proxy_generator, mock_dependencies):
+    def test_mark_success(self, proxy_generator, mock_dependencies):
         """Тест отметки успешного использования прокси"""
         # Arrange
         proxy = "http://proxy.example.com:8080"
-        mock_dependencies['proxy_manager'].mark_proxy_success = AsyncMock()
 
         # Act
-        await proxy_generator.mark_success(proxy)
+        proxy_generator.mark_success(proxy)
 
         # Assert
         mock_dependencies['proxy_manager'].mark_proxy_success.assert_called_once_with(proxy)
 
-    @pytest.mark.asyncio
-    async def test_mark_failure(self, proxy_generator, mock_dependencies):
+    def test_mark_failure(self, proxy_generator, mock_dependencies):
         """Тест отметки неудачного использования прокси"""
         # Arrange
         proxy = "http://proxy.example.com:8080"
-        mock_dependencies['proxy_manager'].mark_proxy_failure = AsyncMock()
 
         # Act
-        await proxy_generator.mark_failure(proxy)
+        proxy_generator.mark_failure(proxy)
 
         # Assert
         mock_dependencies['proxy_manager'].mark_proxy_failure.assert_called_once_with(proxy)
 
+    def test_release(self, proxy_generator, mock_dependencies):
+        """Тест возврата выданного прокси"""
+        # Arrange
+        proxy = "http://proxy.example.com:8080"
+
+        # Act
+        proxy_generator.release(proxy)
+
+        # Assert
+        mock_dependencies['proxy_manager'].release_proxy.assert_called_once_with(proxy)
+
     def test_has_proxies_true(self, proxy_generator, mock_dependencies):
         """Тест has_proxies возвращает True при наличии прокси"""
         # Arrange
@@ -192,84 +252,34 @@ class TestDefaultProxyGenerator:
         assert result is True
 
     @pytest.mark.asyncio
-    async def test_get_proxy_integration_with_has_proxies(self, proxy_generator, mock_dependencies):
+    @pytest.mark.parametrize("use_proxy,working_proxies,expected", _PROXY_MATRIX)
+    async def test_get_proxy_integration_with_has_proxies(self, proxy_generator, mock_dependencies,
+                                                          use_proxy, working_proxies, expected):
         """Интеграционный тест get_proxy с has_proxies"""
         # Arrange
-        test_cases = [
-            # (use_proxy, working_proxies, expected_result)
-            (True, ["p1", "p2"], "p1"),
-            (True, [], None),
-            (True, None, None),
-            (False, ["p1", "p2"], None),
-            (False, [], None),
-            (False, None, None),
-        ]
-
-        for use_proxy, working_proxies, expected in test_cases:
-            mock_dependencies['config'].use_proxy = use_proxy
-            mock_dependencies['proxy_manager'].working_proxies = working_proxies
-
-            if working_proxies and len(working_proxies) > 0 and use_proxy:
-                mock_dependencies['proxy_manager'].get_random_proxy.return_value = working_proxies[0]
-
-            # Act
-            result = await proxy_generator.get_proxy()
-
-            # Assert
-            assert result == expected, f"Failed for use_proxy={use_proxy}, working_proxies={working_proxies}"
-
-    @pytest.mark.asyncio
-    async def test_mark_success_with_async_manager(self, proxy_generator, mock_dependencies):
-        """Тест mark_success с асинхронным менеджером прокси"""
-        # Arrange
-        proxy = "http://proxy.example.com:8080"
-
-        # Создаем асинхронный мок
-        async_mock = AsyncMock()
-        mock_dependencies['proxy_manager'].mark_proxy_success = async_mock
-
-        # Act
-        await proxy_generator.mark_success(proxy)
-
-        # Assert
-        async_mock.assert_called_once_with(proxy)
-
-    @pytest.mark.asyncio
-    async def test_mark_failure_with_async_manager(self, proxy_generator, mock_dependencies):
-        """Тест mark_failure с асинхронным менеджером прокси"""
-        # Arrange
-        proxy = "http://proxy.example.com:8080"
-
-        # Создаем асинхронный мок
-        async_mock = AsyncMock()
-        mock_dependencies['proxy_manager'].mark_proxy_failure = async_mock
+        mock_dependencies['config'].use_proxy = use_proxy
+        mock_dependencies['proxy_manager'].working_proxies = working_proxies
+        if expected:
+            mock_dependencies['proxy_manager'].get_proxy_p2c.return_value = expected
 
         # Act
-        await proxy_generator.mark_failure(proxy)
+        result = await proxy_generator.get_proxy()
 
         # Assert
-        async_mock.assert_called_once_with(proxy)
+        assert result == expected
 
-    def test_has_proxies_with_different_collection_types(self, proxy_generator, mock_dependencies):
+    @pytest.mark.parametrize("working_proxies", _PROXY_COLLECTIONS, ids=lambda proxies: type(proxies).__name__)
+    def test_has_proxies_with_different_collection_types(self, proxy_generator, mock_dependencies, working_proxies):
         """Тест has_proxies с различными типами коллекций"""
         # Arrange
         mock_dependencies['config'].use_proxy = True
+        mock_dependencies['proxy_manager'].working_proxies = working_proxies
 
-        test_cases = [
-            (["p1", "p2"], True),  # list
-            (("p1", "p2"), True),  # tuple
-            ({"p1", "p2"}, True),  # set
-            ({"p1": "url1", "p2": "url2"}, True),  # dict (keys)
-        ]
-
-        for working_proxies, expected in test_cases:
-            mock_dependencies['proxy_manager'].working_proxies = working_proxies
-
-            # Act
-            result = proxy_generator.has_proxies()
+        # Act
+        result = proxy_generator.has_proxies()
 
-            # Assert
-            assert result == expected, f"Failed for working_proxies type: {type(working_proxies)}"
+        # Assert
+        assert result is True
 
     @pytest.mark.asyncio
     async def test_get_proxy_returns_none_when_has_proxies_false(self, proxy_generator, mock_dependencies):
@@ -284,20 +294,20 @@ class TestDefaultProxyGenerator:
 
         # Assert
         assert result is None
-        mock_dependencies['proxy_manager'].get_random_proxy.assert_not_called()
+        mock_dependencies['proxy_manager'].get_proxy_p2c.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_get_proxy_calls_get_random_proxy_when_has_proxies_true(self, proxy_generator, mock_dependencies):
-        """Тест что get_proxy вызывает get_random_proxy когда has_proxies возвращает True"""
+    async def test_get_proxy_calls_get_proxy_p2c_when_has_proxies_true(self, proxy_generator, mock_dependencies):
+        """Тест что get_proxy вызывает get_proxy_p2c когда has_proxies возвращает True"""
         # Arrange
         expected_proxy = "http://proxy.example.com:8080"
         mock_dependencies['config'].use_proxy = True
         mock_dependencies['proxy_manager'].working_proxies = [expected_proxy]
-        mock_dependencies['proxy_manager'].get_random_proxy.return_value = expected_proxy
+        mock_dependencies['proxy_manager'].get_proxy_p2c.return_value = expected_proxy
 
         # Act
         result = await proxy_generator.get_proxy()
 
         # Assert
         assert result == expected_proxy
-        mock_dependencies['proxy_manager'].get_random_proxy.assert_called_once()
\ No newline at end of file
+        mock_dependencies['proxy_manager'].get_proxy_p2c.assert_called_once()
\ No newline at end of file
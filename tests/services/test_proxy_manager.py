@@ -1,12 +1,27 @@
+import asyncio
+import logging
 import pytest
 import httpx
 import random
 from unittest.mock import Mock, AsyncMock, patch, call
 from typing import List, Dict
 
-from src.models.interfaces import IHttpClientFactory, ITimeoutConfigurator
+from src.models.interfaces import IConfig, IHttpClientFactory, ITimeoutConfigurator
 from src.models.responses import ProxyStatsResponse
-from src.services.proxy_manager import ProxyManager
+from src.services.proxy.proxy_manager import PROXY_TEST_URLS, ProxyManager, _normalize_proxy, logger as proxy_manager_logger
+
+
+class _AsyncContext:
+    """Асинхронный контекстный менеджер, отдающий заранее заданное значение"""
+
+    def __init__(self, value):
+        self.value = value
+
+    async def __aenter__(self):
+        return self.value
+
+    async def __aexit__(self, *exc_info):
+        return None
 
 
 class TestProxyManager:
@@ -15,14 +30,47 @@ class TestProxyManager:
     @pytest.fixture
     def mock_dependencies(self):
         """Создает моки всех зависимостей"""
+        config = Mock(spec=IConfig)
+        config.log_level = 'DEBUG'
         http_factory = Mock(spec=IHttpClientFactory)
+        # В реализации create_client - asynccontextmanager, а не корутина
+        http_factory.create_client = Mock()
         timeout_configurator = Mock(spec=ITimeoutConfigurator)
 
         return {
+            'config': config,
             'http_factory': http_factory,
             'timeout_configurator': timeout_configurator
         }
 
+    @pytest.fixture(autouse=True)
+    def capture_logs(self, monkeypatch):
+        """Логгер модуля общий и не передает записи корневому: caplog видит их только так"""
+        monkeypatch.setattr(proxy_manager_logger, 'propagate', True)
+        level = proxy_manager_logger.level
+        proxy_manager_logger.setLevel(logging.DEBUG)
+        yield
+        proxy_manager_logger.setLevel(level)
+
+    @pytest.fixture
+    async def routes(self, mock_dependencies):
+        """Ответы тестовых URL по хосту: фабрика httpx.Response или исключение, сеть подменена MockTransport"""
+        routes = {}
+        requested = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requested.append(request.url.host)
+            route = routes[request.url.host]
+            if isinstance(route, Exception):
+                raise route
+            return route()
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        mock_dependencies['http_factory'].create_client.return_value = _AsyncContext(client)
+        routes['requested'] = requested
+        yield routes
+        await client.aclose()
+
     @pytest.fixture
     def proxy_manager(self, mock_dependencies):
         """Создает экземпляр ProxyManager с моками зависимостей"""
@@ -38,7 +86,7 @@ class TestProxyManager:
         assert manager.timeout_configurator == mock_dependencies['timeout_configurator']
         assert manager._working_proxies == []
         assert manager._proxy_stats == {}
-        assert manager.logger.name == 'lampa-proxy-manager'
+        assert manager.logger.name == 'proxy-manager'
 
     @pytest.mark.asyncio
     async def test_validate_proxies_empty_list(self, proxy_manager, caplog):
@@ -76,6 +124,28 @@ class TestProxyManager:
         mock_dependencies['timeout_configurator'].create_timeout_config.assert_called_with(30.0)
         assert proxy_manager.test_proxy.call_count == 3
 
+    @pytest.mark.asyncio
+    async def test_validate_proxies_max_working(self, proxy_manager, caplog):
+        """Тест остановки валидации после нахождения нужного числа рабочих прокси"""
+        # Arrange
+        proxy_list = ["proxy1:8080", "proxy2:8080", "proxy3:8080"]
+
+        async def fake_test_proxy(proxy, timeout):
+            if proxy == "proxy3:8080":
+                await asyncio.sleep(10)
+            return True
+
+        proxy_manager.test_proxy = fake_test_proxy
+
+        # Act
+        with caplog.at_level('INFO'):
+            result = await asyncio.wait_for(
+                proxy_manager.validate_proxies(proxy_list, max_working=2), timeout=1)
+
+        # Assert
+        assert result == ["proxy1:8080", "proxy2:8080"]
+        assert "Proxy validation completed: 2/3 working" in caplog.text
+
     @pytest.mark.asyncio
     async def test_validate_proxies_all_fail(self, proxy_manager, mock_dependencies, caplog):
         """Тест когда все прокси не прошли валидацию"""
@@ -94,21 +164,18 @@ class TestProxyManager:
         assert result == []
         assert "Proxy validation completed: 0/2 working" in caplog.text
 
+    @staticmethod
+    def _route_all(routes, route):
+        for test_url in PROXY_TEST_URLS:
+            routes[httpx.URL(test_url).host] = route
+
     @pytest.mark.asyncio
-    async def test_test_proxy_success(self, proxy_manager, mock_dependencies, caplog):
+    async def test_test_proxy_success(self, proxy_manager, mock_dependencies, routes, caplog):
         """Тест успешного тестирования прокси"""
         # Arrange
         proxy = "192.168.1.1:8080"
         timeout = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.headers = {'content-type': 'application/json'}
-        mock_response.json.return_value = {"ip": "192.168.1.1"}
-
-        mock_client.get.return_value = mock_response
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        self._route_all(routes, lambda: httpx.Response(200, json={"ip": "192.168.1.1"}))
 
         # Act
         with caplog.at_level('INFO'):
@@ -125,45 +192,29 @@ class TestProxyManager:
         assert f"Testing proxy {proxy} with URL:" in caplog.text
 
     @pytest.mark.asyncio
-    async def test_test_proxy_empty_proxy(self, proxy_manager, caplog):
-        """Тест тестирования пустого прокси"""
+    async def test_test_proxy_first_success_wins(self, proxy_manager, routes):
+        """Тест что одного ответа 200 достаточно, даже если остальные URL не работают"""
         # Arrange
-        proxy = ""
+        self._route_all(routes, httpx.ConnectError("Connection failed"))
+        routes[httpx.URL(PROXY_TEST_URLS[-1]).host] = lambda: httpx.Response(200, text="192.168.1.1")
 
         # Act
-        with caplog.at_level('DEBUG'):
-            result = await proxy_manager.test_proxy(proxy)
+        result = await proxy_manager.test_proxy("working-proxy:8080")
 
         # Assert
-        assert result is False
-        assert "Empty proxy provided for testing" in caplog.text
-
-    @pytest.mark.asyncio
-    async def test_test_proxy_whitespace_proxy(self, proxy_manager):
-        """Тест тестирования прокси из пробелов"""
-        # Arrange
-        proxy = "   "
-
-        # Act
-        result = await proxy_manager.test_proxy(proxy)
-
-        # Assert
-        assert result is False
+        assert result is True
+        assert len(routes['requested']) == len(PROXY_TEST_URLS)
 
     @pytest.mark.asyncio
     async def test_test_proxy_connection_error(self, proxy_manager, mock_dependencies, caplog):
         """Тест тестирования прокси с ошибкой соединения"""
         # Arrange
         proxy = "invalid-proxy:8080"
-        timeout = Mock()
-
-        mock_client = AsyncMock()
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
-        mock_client.get.side_effect = httpx.ConnectError("Connection failed")
+        mock_dependencies['http_factory'].create_client.side_effect = httpx.ConnectError("Connection failed")
 
         # Act
         with caplog.at_level('WARNING'):
-            result = await proxy_manager.test_proxy(proxy, timeout)
+            result = await proxy_manager.test_proxy(proxy, Mock())
 
         # Assert
         assert result is False
@@ -174,62 +225,74 @@ class TestProxyManager:
         """Тест тестирования прокси с таймаутом"""
         # Arrange
         proxy = "slow-proxy:8080"
-        timeout = Mock()
-
-        mock_client = AsyncMock()
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
-        mock_client.get.side_effect = httpx.TimeoutException("Timeout")
+        mock_dependencies['http_factory'].create_client.side_effect = httpx.TimeoutException("Timeout")
 
         # Act
         with caplog.at_level('WARNING'):
-            result = await proxy_manager.test_proxy(proxy, timeout)
+            result = await proxy_manager.test_proxy(proxy, Mock())
 
         # Assert
         assert result is False
         assert f"✗ Proxy {proxy} timeout" in caplog.text
 
     @pytest.mark.asyncio
-    async def test_test_proxy_all_urls_fail(self, proxy_manager, mock_dependencies, caplog):
+    async def test_test_proxy_all_urls_fail(self, proxy_manager, routes, caplog):
         """Тест когда все тестовые URL не сработали"""
         # Arrange
         proxy = "failing-proxy:8080"
-        timeout = Mock()
-
-        mock_client = AsyncMock()
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
-        mock_client.get.side_effect = Exception("All URLs failed")
+        self._route_all(routes, httpx.ConnectError("Connection failed"))
 
         # Act
         with caplog.at_level('WARNING'):
-            result = await proxy_manager.test_proxy(proxy, timeout)
+            result = await proxy_manager.test_proxy(proxy, Mock())
 
         # Assert
         assert result is False
+        assert f"✗ Proxy {proxy} failed for https://ifconfig.me/ip: Connection failed" in caplog.text
         assert f"✗ Proxy {proxy} failed for all test URLs" in caplog.text
 
     @pytest.mark.asyncio
-    async def test_test_proxy_non_200_status(self, proxy_manager, mock_dependencies, caplog):
+    async def test_test_proxy_non_200_status(self, proxy_manager, routes, caplog):
         """Тест прокси возвращающего не 200 статус"""
         # Arrange
         proxy = "bad-status-proxy:8080"
-        timeout = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = Mock()
-        mock_response.status_code = 403
-        mock_client.get.return_value = mock_response
-
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        self._route_all(routes, lambda: httpx.Response(403))
 
         # Act
         with caplog.at_level('WARNING'):
-            result = await proxy_manager.test_proxy(proxy, timeout)
+            result = await proxy_manager.test_proxy(proxy, Mock())
 
         # Assert
         assert result is False
         assert f"Proxy {proxy} returned status 403" in caplog.text
 
-    def test_normalize_proxy_http(self, proxy_manager):
+    @pytest.mark.asyncio
+    async def test_test_proxy_empty_proxy(self, proxy_manager, caplog):
+        """Тест тестирования пустого прокси"""
+        # Arrange
+        proxy = ""
+
+        # Act
+        with caplog.at_level('DEBUG'):
+            result = await proxy_manager.test_proxy(proxy)
+
+        # Assert
+        assert result is False
+        assert "Empty proxy provided for testing" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_test_proxy_whitespace_proxy(self, proxy_manager):
+        """Тест тестирования прокси из пробелов"""
+        # Arrange
+        proxy = "   "
+
+        # Act
+        result = await proxy_manager.test_proxy(proxy)
+
+        # Assert
+        assert result is False
+
+    def test_normalize_proxy_http(self):
         """Тест нормализации HTTP прокси"""
         # Arrange
         test_cases = [
@@ -240,12 +303,12 @@ class TestProxyManager:
 
         for input_proxy, expected in test_cases:
             # Act
-            result = proxy_manager._normalize_proxy(input_proxy)
+            result = _normalize_proxy(input_proxy)
 
             # Assert
             assert result == expected
 
-    def test_normalize_proxy_socks5(self, proxy_manager):
+    def test_normalize_proxy_socks5(self):
         """Тест нормализации SOCKS5 прокси"""
         # Arrange
         test_cases = [
@@ -256,7 +319,7 @@ class TestProxyManager:
 
         for input_proxy, expected in test_cases:
             # Act
-            result = proxy_manager._normalize_proxy(input_proxy)
+            result = _normalize_proxy(input_proxy)
 
             # Assert
             assert result == expected
@@ -314,76 +377,99 @@ class TestProxyManager:
         proxies = ["proxy1:8080", "proxy2:8080", "proxy3:8080"]
         proxy_manager._working_proxies = proxies
 
-        with patch('random.choice') as mock_choice:
-            mock_choice.return_value = "proxy2:8080"
+        with patch('random.choices') as mock_choices:
+            mock_choices.return_value = ["proxy2:8080"]
 
             # Act
             result = proxy_manager.get_random_proxy()
 
         # Assert
         assert result == "proxy2:8080"
-        mock_choice.assert_called_once_with(proxies)
+        mock_choices.assert_called_once_with(proxies, weights=[1, 1, 1])
 
-    def test_get_random_proxy_no_proxies(self, proxy_manager, caplog):
-        """Тест получения случайного прокси когда прокси нет"""
+    @pytest.mark.asyncio
+    async def test_get_random_proxy_weighted_by_stats(self, proxy_manager):
+        """Тест что веса выбора учитывают статистику и обновляются после отметок"""
         # Arrange
-        proxy_manager._working_proxies = []
+        await proxy_manager.add_proxy("proxy1:8080")
+        await proxy_manager.add_proxy("proxy2:8080")
+        for _ in range(3):
+            proxy_manager.mark_proxy_success("proxy1:8080")
+        proxy_manager.mark_proxy_failure("proxy2:8080")
 
-        # Act
-        with caplog.at_level('DEBUG'):
+        with patch('random.choices') as mock_choices:
+            mock_choices.return_value = ["proxy1:8080"]
+
+            # Act
             result = proxy_manager.get_random_proxy()
 
         # Assert
-        assert result is None
-        assert "No working proxies available" in caplog.text
+        assert result == "proxy1:8080"
+        mock_choices.assert_called_once_with(["proxy1:8080", "proxy2:8080"], weights=[3, 1])
 
-    def test_get_proxy_with_failover_no_proxies(self, proxy_manager):
-        """Тест получения прокси с фейловером когда прокси нет"""
+    @pytest.mark.asyncio
+    async def test_get_proxy_p2c_prefers_less_loaded(self, proxy_manager):
+        """Тест что p2c выбирает прокси с меньшим числом незавершенных запросов"""
         # Arrange
-        proxy_manager._working_proxies = []
+        await proxy_manager.add_proxy("proxy1:8080")
+        await proxy_manager.add_proxy("proxy2:8080")
 
         # Act
-        result = proxy_manager.get_proxy_with_failover()
+        first = proxy_manager.get_proxy_p2c()
+        second = proxy_manager.get_proxy_p2c()
+        proxy_manager.release_proxy(first)
+        third = proxy_manager.get_proxy_p2c()
 
         # Assert
-        assert result is None
+        assert {first, second} == {"proxy1:8080", "proxy2:8080"}
+        assert third == first
+        assert proxy_manager._inflight[second] == 1
 
-    def test_get_proxy_with_failover_with_exclusions(self, proxy_manager, caplog):
-        """Тест получения прокси с фейловером и исключениями"""
+    @pytest.mark.asyncio
+    async def test_get_proxy_p2c_prefers_lower_rtt(self, proxy_manager):
+        """Тест что при равной загрузке p2c выбирает прокси с меньшей задержкой"""
         # Arrange
-        proxies = ["proxy1:8080", "proxy2:8080", "proxy3:8080"]
-        excluded = ["proxy1:8080", "proxy3:8080"]
-        proxy_manager._working_proxies = proxies
-
-        # Настраиваем статистику для сортировки
-        proxy_manager._proxy_stats = {
-            "proxy1:8080": {"success": 10, "failures": 1},
-            "proxy2:8080": {"success": 15, "failures": 2},  # Лучшая статистика
-            "proxy3:8080": {"success": 5, "failures": 3},
-        }
+        await proxy_manager.add_proxy("proxy1:8080")
+        await proxy_manager.add_proxy("proxy2:8080")
+        proxy_manager.record_rtt("proxy1:8080", 2.0)
+        proxy_manager.record_rtt("proxy2:8080", 0.1)
 
         # Act
-        with caplog.at_level('DEBUG'):
-            result = proxy_manager.get_proxy_with_failover(excluded_proxies=excluded)
+        result = proxy_manager.get_proxy_p2c()
 
         # Assert
         assert result == "proxy2:8080"
-        assert f"Selected proxy with failover: proxy2:8080" in caplog.text
 
-    def test_get_proxy_with_failover_all_excluded(self, proxy_manager, caplog):
-        """Тест когда все прокси исключены"""
+    @pytest.mark.asyncio
+    async def test_record_rtt_smoothing(self, proxy_manager):
+        """Тест скользящего среднего задержки и игнорирования неизвестных прокси"""
         # Arrange
-        proxies = ["proxy1:8080", "proxy2:8080"]
-        excluded = proxies.copy()
-        proxy_manager._working_proxies = proxies
+        await proxy_manager.add_proxy("proxy1:8080")
 
         # Act
-        with caplog.at_level('WARNING'):
-            result = proxy_manager.get_proxy_with_failover(excluded_proxies=excluded)
+        proxy_manager.record_rtt("proxy1:8080", 1.0)
+        proxy_manager.record_rtt("proxy1:8080", 2.0)
+        proxy_manager.record_rtt("unknown:8080", 1.0)
+
+        # Assert
+        assert proxy_manager._rtt["proxy1:8080"] == pytest.approx(1.2)
+        assert "unknown:8080" not in proxy_manager._rtt
+
+        proxy_manager.remove_proxy("proxy1:8080")
+        assert "proxy1:8080" not in proxy_manager._rtt
+
+    def test_get_random_proxy_no_proxies(self, proxy_manager, caplog):
+        """Тест получения случайного прокси когда прокси нет"""
+        # Arrange
+        proxy_manager._working_proxies = []
+
+        # Act
+        with caplog.at_level('DEBUG'):
+            result = proxy_manager.get_random_proxy()
 
         # Assert
         assert result is None
-        assert "No available proxies after failover exclusion" in caplog.text
+        assert "No working proxies available" in caplog.text
 
     @pytest.mark.asyncio
     async def test_mark_proxy_success(self, proxy_manager, caplog):
@@ -394,7 +480,7 @@ class TestProxyManager:
 
         # Act
         with caplog.at_level('DEBUG'):
-            await proxy_manager.mark_proxy_success(proxy)
+            proxy_manager.mark_proxy_success(proxy)
 
         # Assert
         assert proxy_manager._proxy_stats[proxy]['success'] == 1
@@ -407,7 +493,7 @@ class TestProxyManager:
         proxy = "unknown-proxy:8080"
 
         # Act
-        await proxy_manager.mark_proxy_success(proxy)
+        proxy_manager.mark_proxy_success(proxy)
 
         # Assert
         # Не должно быть исключения
@@ -421,7 +507,7 @@ class TestProxyManager:
 
         # Act
         with caplog.at_level('WARNING'):
-            await proxy_manager.mark_proxy_failure(proxy)
+            proxy_manager.mark_proxy_failure(proxy)
 
         # Assert
         assert proxy_manager._proxy_stats[proxy]['failures'] == 1
@@ -436,7 +522,7 @@ class TestProxyManager:
 
         # Act - отмечаем 6 неудач (больше порога в 5)
         for i in range(6):
-            await proxy_manager.mark_proxy_failure(proxy)
+            proxy_manager.mark_proxy_failure(proxy)
 
         # Assert
         assert proxy not in proxy_manager._working_proxies
@@ -449,7 +535,7 @@ class TestProxyManager:
         proxy = ""
 
         # Act
-        await proxy_manager.mark_proxy_failure(proxy)
+        proxy_manager.mark_proxy_failure(proxy)
 
         # Assert
         # Не должно быть исключения
@@ -463,7 +549,7 @@ class TestProxyManager:
 
         # Act
         with caplog.at_level('WARNING'):
-            result = await proxy_manager.remove_proxy(proxy)
+            result = proxy_manager.remove_proxy(proxy)
 
         # Assert
         assert result is True
@@ -478,19 +564,21 @@ class TestProxyManager:
         proxy = "unknown-proxy:8080"
 
         # Act
-        result = await proxy_manager.remove_proxy(proxy)
+        result = proxy_manager.remove_proxy(proxy)
 
         # Assert
         assert result is False
 
-    def test_get_stats(self, proxy_manager, caplog):
+    @pytest.mark.asyncio
+    async def test_get_stats(self, proxy_manager, caplog):
         """Тест получения статистики"""
         # Arrange
-        proxy_manager._working_proxies = ["proxy1:8080", "proxy2:8080"]
-        proxy_manager._proxy_stats = {
-            "proxy1:8080": {"success": 10, "failures": 2},
-            "proxy2:8080": {"success": 5, "failures": 1},
-        }
+        for proxy, success, failures in (("proxy1:8080", 10, 2), ("proxy2:8080", 5, 1)):
+            await proxy_manager.add_proxy(proxy)
+            for _ in range(success):
+                proxy_manager.mark_proxy_success(proxy)
+            for _ in range(failures):
+                proxy_manager.mark_proxy_failure(proxy)
 
         # Act
         with caplog.at_level('DEBUG'):
@@ -504,52 +592,24 @@ class TestProxyManager:
         assert result.proxy_stats == proxy_manager._proxy_stats
         assert "Proxy stats: 2 working, 15 total successes, 3 total failures" in caplog.text
 
-    def test_get_detailed_stats(self, proxy_manager):
-        """Тест получения детальной статистики"""
-        # Arrange
-        proxy_manager._working_proxies = ["proxy1:8080", "proxy2:8080"]
-        proxy_manager._proxy_stats = {
-            "proxy1:8080": {"success": 10, "failures": 2},
-            "proxy2:8080": {"success": 5, "failures": 1},
-        }
-
-        # Act
-        result = proxy_manager.get_detailed_stats()
-
-        # Assert
-        assert result['total_working'] == 2
-        assert result['total_success'] == 15
-        assert result['total_failures'] == 3
-        assert result['total_proxies_tested'] == 2
-        assert result['success_rate'] == 15 / 18  # 15 успехов из 18 запросов
-
-    def test_get_detailed_stats_zero_requests(self, proxy_manager):
-        """Тест детальной статистики при нулевых запросах"""
-        # Arrange
-        proxy_manager._working_proxies = []
-        proxy_manager._proxy_stats = {}
-
-        # Act
-        result = proxy_manager.get_detailed_stats()
-
-        # Assert
-        assert result['success_rate'] == 0
-
-    def test_clear_stats(self, proxy_manager, caplog):
-        """Тест очистки статистики"""
+    @pytest.mark.asyncio
+    async def test_get_stats_after_remove(self, proxy_manager):
+        """Тест что статистика удаленного прокси не входит в суммы"""
         # Arrange
-        proxy_manager._proxy_stats = {
-            "proxy1:8080": {"success": 10, "failures": 2},
-            "proxy2:8080": {"success": 5, "failures": 1},
-        }
+        await proxy_manager.add_proxy("proxy1:8080")
+        await proxy_manager.add_proxy("proxy2:8080")
+        proxy_manager.mark_proxy_success("proxy1:8080")
+        proxy_manager.mark_proxy_success("proxy2:8080")
+        proxy_manager.mark_proxy_failure("proxy2:8080")
 
         # Act
-        with caplog.at_level('INFO'):
-            proxy_manager.clear_stats()
+        proxy_manager.remove_proxy("proxy2:8080")
+        result = proxy_manager.get_stats()
 
         # Assert
-        assert proxy_manager._proxy_stats == {}
-        assert "Proxy statistics cleared" in caplog.text
+        assert result.total_working == 1
+        assert result.total_success == 1
+        assert result.total_failures == 0
 
     def test_len(self, proxy_manager):
         """Тест метода __len__"""
@@ -617,83 +677,3 @@ class TestProxyManager:
 
         # Act & Assert
         assert proxy_manager.proxy_stats == expected_stats
-
-    @pytest.mark.asyncio
-    async def test_test_proxy_with_json_response(self, proxy_manager, mock_dependencies, caplog):
-        """Тест тестирования прокси с JSON ответом"""
-        # Arrange
-        proxy = "json-proxy:8080"
-        timeout = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.headers = {'content-type': 'application/json'}
-        mock_response.json.return_value = {"ip": "192.168.1.1"}
-
-        mock_client.get.return_value = mock_response
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
-
-        # Act
-        with caplog.at_level('INFO'):
-            result = await proxy_manager.test_proxy(proxy, timeout)
-
-        # Assert
-        assert result is True
-        assert "application/json" in caplog.text
-
-    @pytest.mark.asyncio
-    async def test_test_proxy_with_text_response(self, proxy_manager, mock_dependencies, caplog):
-        """Тест тестирования прокси с текстовым ответом"""
-        # Arrange
-        proxy = "text-proxy:8080"
-        timeout = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.headers = {'content-type': 'text/plain'}
-        mock_response.text = "192.168.1.1"
-
-        mock_client.get.return_value = mock_response
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
-
-        # Act
-        with caplog.at_level('INFO'):
-            result = await proxy_manager.test_proxy(proxy, timeout)
-
-        # Assert
-        assert result is True
-
-    @pytest.mark.asyncio
-    async def test_test_proxy_success_first_url(self, proxy_manager, mock_dependencies):
-        """Тест когда первый тестовый URL успешен"""
-        # Arrange
-        proxy = "working-proxy:8080"
-        timeout = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.headers = {'content-type': 'text/plain'}
-
-        mock_client.get.return_value = mock_response
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
-
-        # Act
-        result = await proxy_manager.test_proxy(proxy, timeout)
-
-        # Assert
-        assert result is True
-        # Должен быть только один вызов, так как первый URL успешен
-        assert mock_client.get.call_count == 1
-
-    @pytest.mark.asyncio
-    async def test_initialization_logging(self, mock_dependencies, caplog):
-        """Тест логирования при инициализации"""
-        # Act
-        with caplog.at_level('INFO'):
-            ProxyManager(**mock_dependencies)
-
-        # Assert
-        assert "ProxyManager initialized with HttpClientFactory" in caplog.text
\ No newline at end of file
@@ -0,0 +1,234 @@
+import asyncio
+import logging
+
+import pytest
+import httpx
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from src.services.processors.request_processor import RequestProcessor
+from src.services.processors.video_streamer_processor import VideoStreamerProcessor
+from src.services.proxy.proxy_generator import DefaultProxyGenerator
+from src.services.proxy.proxy_manager import ProxyManager
+from src.services.utils.content_info_getter import ContentInfoGetter
+from src.services.utils.http_client_factory import PooledClient
+
+
+PROXY = "http://proxy.example.com:8080"
+
+
+@pytest.fixture(scope="module", autouse=True)
+def mute_logs():
+    """Тесты не проверяют логи - отключаем их на время модуля"""
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+class _AsyncContext:
+    """Асинхронный контекстный менеджер, отдающий заранее заданное значение"""
+
+    def __init__(self, value):
+        self.value = value
+
+    async def __aenter__(self):
+        return self.value
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+class TestProxyRelease:
+    """Выданный прокси возвращается при любом исходе запроса, а не только после отметки успеха или ошибки"""
+
+    @pytest.fixture
+    def routes(self):
+        """Ответы MockTransport по пути запроса: фабрика httpx.Response или исключение"""
+        return {}
+
+    @pytest.fixture
+    async def dependencies(self, routes):
+        """Настоящие ProxyManager и DefaultProxyGenerator, сеть подменена MockTransport"""
+        def handler(request: httpx.Request) -> httpx.Response:
+            route = routes[request.url.path]
+            if isinstance(route, Exception):
+                raise route
+            return route()
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        config = SimpleNamespace(
+            log_level='INFO',
+            use_proxy=True,
+            user_agent='test-user-agent',
+            max_redirects=5,
+            max_range_size=10485760,
+        )
+        http_factory = SimpleNamespace(
+            create_client=lambda headers=None, **kwargs: _AsyncContext(PooledClient(client, dict(headers or {}))),
+            discard_proxy_clients=Mock())
+        timeout_configurator = SimpleNamespace(create_timeout_config=lambda multiplier: None)
+
+        proxy_manager = ProxyManager(config, http_factory, timeout_configurator)
+        await proxy_manager.add_proxy(PROXY)
+        proxy_generator = DefaultProxyGenerator(proxy_manager, config)
+
+        yield SimpleNamespace(
+            config=config,
+            http_factory=http_factory,
+            timeout_configurator=timeout_configurator,
+            proxy_manager=proxy_manager,
+            proxy_generator=proxy_generator,
+        )
+        await client.aclose()
+
+    @pytest.fixture
+    def video_streamer(self, dependencies):
+        return VideoStreamerProcessor(
+            dependencies.config,
+            dependencies.http_factory,
+            SimpleNamespace(),
+            dependencies.proxy_generator,
+            dependencies.timeout_configurator)
+
+    @pytest.fixture
+    def request_processor(self, dependencies):
+        return RequestProcessor(
+            dependencies.config,
+            dependencies.http_factory,
+            dependencies.proxy_generator,
+            dependencies.timeout_configurator)
+
+    @pytest.fixture
+    def content_getter(self, dependencies):
+        return ContentInfoGetter(
+            dependencies.config,
+            dependencies.http_factory,
+            dependencies.proxy_generator,
+            dependencies.timeout_configurator)
+
+    @staticmethod
+    def _inflight(dependencies) -> int:
+        return dependencies.proxy_manager._inflight.get(PROXY, 0)
+
+    @pytest.fixture
+    def endless_video(self, routes):
+        """Видео, которое отдает первый чанк и дальше ждет бесконечно"""
+        async def chunks():
+            yield b"\x00" * 1024
+            await asyncio.Event().wait()
+
+        routes['/video.mp4'] = lambda: httpx.Response(200, content=chunks())
+
+    @pytest.mark.asyncio
+    async def test_video_stream_cancelled(self, video_streamer, dependencies, endless_video):
+        """Тест что отмена потока клиентом возвращает прокси"""
+        # Arrange
+        received = asyncio.Event()
+
+        async def consume():
+            async for _ in video_streamer._create_stream_generator("https://example.com/video.mp4", {}):
+                received.set()
+
+        task = asyncio.create_task(consume())
+        await received.wait()
+        assert self._inflight(dependencies) == 1
+
+        # Act
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        # Assert
+        assert self._inflight(dependencies) == 0
+
+    @pytest.mark.asyncio
+    async def test_video_stream_closed_by_client(self, video_streamer, dependencies, endless_video):
+        """Тест что закрытие генератора (GeneratorExit) возвращает прокси"""
+        # Arrange
+        stream = video_streamer._create_stream_generator("https://example.com/video.mp4", {})
+        await stream.__anext__()
+        assert self._inflight(dependencies) == 1
+
+        # Act
+        await stream.aclose()
+
+        # Assert
+        assert self._inflight(dependencies) == 0
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status_code", [404, 416, 500])
+    async def test_video_stream_error_status(self, video_streamer, dependencies, routes, status_code):
+        """Тест что ранний выход по статусу источника возвращает прокси"""
+        # Arrange
+        routes['/video.mp4'] = lambda: httpx.Response(status_code)
+
+        # Act
+        chunks = [chunk async for chunk in video_streamer._create_stream_generator("https://example.com/video.mp4", {})]
+
+        # Assert
+        assert chunks == []
+        assert self._inflight(dependencies) == 0
+
+    @pytest.mark.asyncio
+    async def test_request_redirect(self, request_processor, dependencies, routes):
+        """Тест что оба запроса цепочки редиректа возвращают прокси"""
+        # Arrange
+        routes['/old'] = lambda: httpx.Response(302, headers={'location': 'https://example.com/new'})
+        routes['/new'] = lambda: httpx.Response(200, content=b'ok')
+
+        # Act
+        response = await request_processor.process_request("https://example.com/old")
+
+        # Assert
+        assert response.status == 200
+        assert self._inflight(dependencies) == 0
+
+    @pytest.mark.asyncio
+    async def test_request_timeout(self, request_processor, dependencies, routes):
+        """Тест что таймаут возвращает прокси"""
+        # Arrange
+        routes['/slow'] = httpx.ReadTimeout("Request timed out")
+
+        # Act
+        response = await request_processor.process_request("https://example.com/slow")
+
+        # Assert
+        assert response.status == 408
+        assert self._inflight(dependencies) == 0
+
+    @pytest.mark.asyncio
+    async def test_request_success_released_once(self, request_processor, dependencies, routes):
+        """Тест что успешный запрос возвращает прокси ровно один раз"""
+        # Arrange
+        routes['/api'] = lambda: httpx.Response(200, content=b'ok')
+        dependencies.proxy_manager.get_proxy_p2c()
+
+        # Act
+        await request_processor.process_request("https://example.com/api")
+
+        # Assert
+        assert self._inflight(dependencies) == 1
+        assert dependencies.proxy_manager.proxy_stats[PROXY]['success'] == 1
+
+    @pytest.mark.asyncio
+    async def test_head_request_error(self, content_getter, dependencies, routes):
+        """Тест что ошибка HEAD запроса возвращает прокси"""
+        # Arrange
+        routes['/video.mp4'] = httpx.ConnectError("Connection failed")
+
+        # Act
+        result = await content_getter._try_head_request("https://example.com/video.mp4", {})
+
+        # Assert
+        assert result.error
+        assert self._inflight(dependencies) == 0
+
+    @pytest.mark.asyncio
+    async def test_removed_proxy_clients_discarded(self, dependencies):
+        """Тест что удаление прокси из рабочего списка закрывает его клиенты в фабрике"""
+        # Act
+        for _ in range(6):
+            dependencies.proxy_generator.mark_failure(PROXY)
+
+        # Assert
+        assert PROXY not in dependencies.proxy_manager.working_proxies
+        dependencies.http_factory.discard_proxy_clients.assert_called_once_with(PROXY)
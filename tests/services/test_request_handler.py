@@ -1,3 +1,5 @@
+import logging
+
 import pytest
 import json
 from unittest.mock import Mock, AsyncMock, patch
@@ -7,7 +9,14 @@ from fastapi.responses import StreamingResponse, JSONResponse, Response
 
 from src.models.interfaces import IContentProcessor, IConfig
 from src.models.responses import ProxyResponse
-from src.services.request_handler import RequestHandler
+from src.services.handlers.request_handler import RequestHandler
+
+
+def _proxy_response(**fields) -> ProxyResponse:
+    """ProxyResponse с заполненными обязательными полями, которые тестам не важны"""
+    fields.setdefault('currentUrl', 'https://example.com')
+    fields.setdefault('cookie', [])
+    return ProxyResponse(**fields)
 
 
 class TestRequestHandler:
@@ -18,6 +27,7 @@ class TestRequestHandler:
         """Создает моки всех зависимостей"""
         content_processor = Mock(spec=IContentProcessor)
         config = Mock(spec=IConfig)
+        config.log_level = 'INFO'
 
         return {
             'content_processor': content_processor,
@@ -25,9 +35,15 @@ class TestRequestHandler:
         }
 
     @pytest.fixture
-    def request_handler(self, mock_dependencies):
+    def request_handler(self, mock_dependencies, monkeypatch):
         """Создает экземпляр RequestHandler с моками зависимостей"""
-        return RequestHandler(**mock_dependencies)
+        handler = RequestHandler(**mock_dependencies)
+        # Логгер приложения не передает записи корневому - caplog видит их только так
+        monkeypatch.setattr(handler.logger, 'propagate', True)
+        level = handler.logger.level
+        handler.logger.setLevel(logging.DEBUG)
+        yield handler
+        handler.logger.setLevel(level)
 
     def test_initialization(self, mock_dependencies):
         """Тест инициализации RequestHandler"""
@@ -37,7 +53,7 @@ class TestRequestHandler:
         # Assert
         assert handler.content_processor == mock_dependencies['content_processor']
         assert handler.config == mock_dependencies['config']
-        assert handler.logger.name == 'lampa-proxy-request-handler'
+        assert handler.logger.name == 'request-handler'
 
     @pytest.mark.asyncio
     async def test_handle_request_empty_path(self, request_handler, caplog):
@@ -65,7 +81,7 @@ class TestRequestHandler:
         request_handler._handle_direct_request = AsyncMock(return_value=({"data": "test"}, 200, "application/json"))
 
         # Act
-        with caplog.at_level('INFO'):
+        with caplog.at_level('DEBUG'):
             result = await request_handler.handle_request(path, method)
 
         # Assert
@@ -84,7 +100,7 @@ class TestRequestHandler:
         request_handler._handle_encoded_request = AsyncMock(return_value=({"result": "success"}, 200, "application/json"))
 
         # Act
-        with caplog.at_level('INFO'):
+        with caplog.at_level('DEBUG'):
             result = await request_handler.handle_request(path, method)
 
         # Assert
@@ -101,7 +117,7 @@ class TestRequestHandler:
         request_handler._handle_encoded_request = AsyncMock(return_value=({"result": "success"}, 200, "application/json"))
 
         # Act
-        with caplog.at_level('INFO'):
+        with caplog.at_level('DEBUG'):
             result = await request_handler.handle_request(path)
 
         # Assert
@@ -117,7 +133,7 @@ class TestRequestHandler:
         request_handler._handle_encoded_request = AsyncMock(return_value=({"result": "success"}, 200, "application/json"))
 
         # Act
-        with caplog.at_level('INFO'):
+        with caplog.at_level('DEBUG'):
             result = await request_handler.handle_request(path)
 
         # Assert
@@ -133,7 +149,7 @@ class TestRequestHandler:
         request_handler._handle_encoded_request = AsyncMock(return_value=({"result": "success"}, 200, "application/json"))
 
         # Act
-        with caplog.at_level('INFO'):
+        with caplog.at_level('DEBUG'):
             result = await request_handler.handle_request(path)
 
         # Assert
@@ -189,8 +205,8 @@ class TestRequestHandler:
         segments = ["enc", "encoded_data"]
 
         # Мокируем декодирование
-        with patch('src.services.request_handler.decode_base64_url', return_value="decoded_data"):
-            with patch('src.services.request_handler.parse_encoded_data', return_value=({}, [])):
+        with patch('src.services.handlers.request_handler.decode_base64_url', return_value="decoded_data"):
+            with patch('src.services.handlers.request_handler.parse_encoded_data', return_value=({}, [])):
                 # Act & Assert
                 with pytest.raises(ValueError) as exc_info:
                     await request_handler._handle_encoded_request(segments, "GET", None, {}, {})
@@ -204,8 +220,8 @@ class TestRequestHandler:
         segments = ["enc2", "encoded_data"]
 
         # Мокируем декодирование
-        with patch('src.services.request_handler.decode_base64_url', return_value="decoded_data"):
-            with patch('src.services.request_handler.parse_encoded_data', return_value=({}, [])):
+        with patch('src.services.handlers.request_handler.decode_base64_url', return_value="decoded_data"):
+            with patch('src.services.handlers.request_handler.parse_encoded_data', return_value=({}, [])):
                 # Act & Assert
                 with pytest.raises(ValueError) as exc_info:
                     await request_handler._handle_encoded_request(segments, "GET", None, {}, {})
@@ -226,11 +242,11 @@ class TestRequestHandler:
         }
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.decode_base64_url', return_value="decoded_data"):
-            with patch('src.services.request_handler.parse_encoded_data', return_value=(encoded_params, [])):
-                with patch('src.services.request_handler.build_url', return_value="https://target.com"):
+        with patch('src.services.handlers.request_handler.decode_base64_url', return_value="decoded_data"):
+            with patch('src.services.handlers.request_handler.parse_encoded_data', return_value=(encoded_params, [])):
+                with patch('src.services.handlers.request_handler.build_url', return_value="https://target.com"):
                     # Мокируем процессор контента
-                    proxy_response = ProxyResponse(
+                    proxy_response = _proxy_response(
                         status=200,
                         body=b'{"result": "success"}',
                         headers={"content-type": "application/json"}
@@ -254,16 +270,16 @@ class TestRequestHandler:
         query_params = {"existing": "param"}
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.decode_base64_url') as mock_decode:
+        with patch('src.services.handlers.request_handler.decode_base64_url') as mock_decode:
             mock_decode.side_effect = [
                 "decoded_main",  # Первый вызов для encoded_data
                 "key1=value1&key2=value2"  # Второй вызов для additional_param
             ]
 
-            with patch('src.services.request_handler.parse_encoded_data', return_value=({}, ["url", "segment"])):
-                with patch('src.services.request_handler.build_url', return_value="https://target.com"):
+            with patch('src.services.handlers.request_handler.parse_encoded_data', return_value=({}, ["url", "segment"])):
+                with patch('src.services.handlers.request_handler.build_url', return_value="https://target.com") as mock_build_url:
                     # Мокируем процессор контента
-                    proxy_response = ProxyResponse(
+                    proxy_response = _proxy_response(
                         status=200,
                         body=b'{"result": "success"}',
                         headers={"content-type": "application/json"}
@@ -274,9 +290,10 @@ class TestRequestHandler:
                     await request_handler._handle_encoded_request(segments, "GET", None, query_params, {})
 
         # Assert
-        assert query_params["existing"] == "param"
-        assert query_params["key1"] == "value1"
-        assert query_params["key2"] == "value2"
+        mock_build_url.assert_called_once_with(
+            ["url", "segment"], {"existing": "param", "key1": "value1", "key2": "value2"})
+        # Параметры запроса клиента не изменяются
+        assert query_params == {"existing": "param"}
 
     @pytest.mark.asyncio
     async def test_handle_encoded_request_streaming_response(self, request_handler, mock_dependencies):
@@ -285,9 +302,9 @@ class TestRequestHandler:
         segments = ["enc", "encoded_data", "segment1"]
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.decode_base64_url', return_value="decoded_data"):
-            with patch('src.services.request_handler.parse_encoded_data', return_value=({}, [])):
-                with patch('src.services.request_handler.build_url', return_value="https://target.com"):
+        with patch('src.services.handlers.request_handler.decode_base64_url', return_value="decoded_data"):
+            with patch('src.services.handlers.request_handler.parse_encoded_data', return_value=({}, [])):
+                with patch('src.services.handlers.request_handler.build_url', return_value="https://target.com"):
                     # Создаем мок StreamingResponse
                     streaming_response = Mock(spec=StreamingResponse)
                     mock_dependencies['content_processor'].process_content = AsyncMock(return_value=streaming_response)
@@ -305,12 +322,12 @@ class TestRequestHandler:
         segments = ["enc", "encoded_data", "segment1"]
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.decode_base64_url', return_value="decoded_data"):
-            with patch('src.services.request_handler.parse_encoded_data', return_value=({}, [])):
-                with patch('src.services.request_handler.build_url', return_value="https://target.com"):
-                    with patch('src.services.request_handler.is_valid_json', return_value=True):
+        with patch('src.services.handlers.request_handler.decode_base64_url', return_value="decoded_data"):
+            with patch('src.services.handlers.request_handler.parse_encoded_data', return_value=({}, [])):
+                with patch('src.services.handlers.request_handler.build_url', return_value="https://target.com"):
+                    with patch('src.services.handlers.request_handler.is_valid_json', return_value=True):
                         # Мокируем процессор контента
-                        proxy_response = ProxyResponse(
+                        proxy_response = _proxy_response(
                             status=200,
                             body=b'{"result": "success"}',
                             headers={"content-type": "application/json"}
@@ -332,12 +349,12 @@ class TestRequestHandler:
         segments = ["enc3", "encoded_data", "segment1"]
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.decode_base64_url', return_value="decoded_data"):
-            with patch('src.services.request_handler.parse_encoded_data', return_value=({}, [])):
-                with patch('src.services.request_handler.build_url', return_value="https://target.com"):
-                    with patch('src.services.request_handler.is_valid_json', return_value=True):
+        with patch('src.services.handlers.request_handler.decode_base64_url', return_value="decoded_data"):
+            with patch('src.services.handlers.request_handler.parse_encoded_data', return_value=({}, [])):
+                with patch('src.services.handlers.request_handler.build_url', return_value="https://target.com"):
+                    with patch('src.services.handlers.request_handler.is_valid_json', return_value=True):
                         # Мокируем процессор контента
-                        proxy_response = ProxyResponse(
+                        proxy_response = _proxy_response(
                             status=200,
                             body=b'{"result": "success"}',
                             headers={"content-type": "text/html"}  # text/html но валидный JSON
@@ -348,9 +365,10 @@ class TestRequestHandler:
                         result = await request_handler._handle_encoded_request(segments, "GET", None, {}, {})
 
         # Assert
-        assert result[0] == proxy_response  # Для enc3 возвращается как есть
+        assert isinstance(result[0], Response)  # Для enc3 весь ProxyResponse уже сериализован
+        assert json.loads(result[0].body)['body'] == '{"result": "success"}'
         assert result[1] == 200
-        assert result[2] == "text/html"
+        assert result[2] == "application/json"
 
     @pytest.mark.asyncio
     async def test_handle_encoded_request_proxy_response_binary(self, request_handler, mock_dependencies):
@@ -359,11 +377,11 @@ class TestRequestHandler:
         segments = ["enc", "encoded_data", "segment1"]
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.decode_base64_url', return_value="decoded_data"):
-            with patch('src.services.request_handler.parse_encoded_data', return_value=({}, [])):
-                with patch('src.services.request_handler.build_url', return_value="https://target.com"):
+        with patch('src.services.handlers.request_handler.decode_base64_url', return_value="decoded_data"):
+            with patch('src.services.handlers.request_handler.parse_encoded_data', return_value=({}, [])):
+                with patch('src.services.handlers.request_handler.build_url', return_value="https://target.com"):
                     # Мокируем процессор контента
-                    proxy_response = ProxyResponse(
+                    proxy_response = _proxy_response(
                         status=200,
                         body=b'binary_data',
                         headers={"content-type": "application/octet-stream"}
@@ -385,9 +403,9 @@ class TestRequestHandler:
         segments = ["enc", "encoded_data", "segment1"]
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.decode_base64_url', return_value="decoded_data"):
-            with patch('src.services.request_handler.parse_encoded_data', return_value=({}, [])):
-                with patch('src.services.request_handler.build_url', return_value="https://target.com"):
+        with patch('src.services.handlers.request_handler.decode_base64_url', return_value="decoded_data"):
+            with patch('src.services.handlers.request_handler.parse_encoded_data', return_value=({}, [])):
+                with patch('src.services.handlers.request_handler.build_url', return_value="https://target.com"):
                     # Мокируем процессор контента возвращающий неизвестный тип
                     mock_dependencies['content_processor'].process_content = AsyncMock(return_value="unknown_result")
 
@@ -406,9 +424,9 @@ class TestRequestHandler:
         request_headers = {"User-Agent": "test"}
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.build_url', return_value="https://example.com/api/data?param=value"):
+        with patch('src.services.handlers.request_handler.build_url', return_value="https://example.com/api/data?param=value"):
             # Мокируем процессор контента
-            proxy_response = ProxyResponse(
+            proxy_response = _proxy_response(
                 status=200,
                 body=b'response_data',
                 headers={"content-type": "text/plain"}
@@ -436,9 +454,9 @@ class TestRequestHandler:
         request_headers = {"Range": "bytes=0-1000"}
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.build_url', return_value="https://example.com/video.mp4"):
+        with patch('src.services.handlers.request_handler.build_url', return_value="https://example.com/video.mp4"):
             # Мокируем процессор контента
-            proxy_response = ProxyResponse(
+            proxy_response = _proxy_response(
                 status=206,
                 body=b'video_data',
                 headers={"content-type": "video/mp4"}
@@ -465,7 +483,7 @@ class TestRequestHandler:
         path = "https://example.com/video.mp4"
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.build_url', return_value="https://example.com/video.mp4"):
+        with patch('src.services.handlers.request_handler.build_url', return_value="https://example.com/video.mp4"):
             # Создаем мок StreamingResponse
             streaming_response = Mock(spec=StreamingResponse)
             mock_dependencies['content_processor'].process_content = AsyncMock(return_value=streaming_response)
@@ -483,7 +501,7 @@ class TestRequestHandler:
         path = "https://example.com/data"
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.build_url', return_value="https://example.com/data"):
+        with patch('src.services.handlers.request_handler.build_url', return_value="https://example.com/data"):
             # Мокируем процессор контента возвращающий неизвестный тип
             mock_dependencies['content_processor'].process_content = AsyncMock(return_value="unknown")
 
@@ -521,16 +539,16 @@ class TestRequestHandler:
         segments = ["enc2", "encoded_data", "invalid_param"]
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.decode_base64_url') as mock_decode:
+        with patch('src.services.handlers.request_handler.decode_base64_url') as mock_decode:
             mock_decode.side_effect = [
                 "decoded_main",  # Первый вызов успешен
                 Exception("Decoding error")  # Второй вызов падает
             ]
 
-            with patch('src.services.request_handler.parse_encoded_data', return_value=({}, ["url"])):
-                with patch('src.services.request_handler.build_url', return_value="https://target.com"):
+            with patch('src.services.handlers.request_handler.parse_encoded_data', return_value=({}, ["url"])):
+                with patch('src.services.handlers.request_handler.build_url', return_value="https://target.com"):
                     # Мокируем процессор контента
-                    proxy_response = ProxyResponse(
+                    proxy_response = _proxy_response(
                         status=200,
                         body=b'response',
                         headers={"content-type": "text/plain"}
@@ -550,16 +568,16 @@ class TestRequestHandler:
         segments = ["enc2", "encoded_data", "param_without_value"]
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.decode_base64_url') as mock_decode:
+        with patch('src.services.handlers.request_handler.decode_base64_url') as mock_decode:
             mock_decode.side_effect = [
                 "decoded_main",
                 "key_without_value"  # Параметр без знака =
             ]
 
-            with patch('src.services.request_handler.parse_encoded_data', return_value=({}, ["url"])):
-                with patch('src.services.request_handler.build_url', return_value="https://target.com"):
+            with patch('src.services.handlers.request_handler.parse_encoded_data', return_value=({}, ["url"])):
+                with patch('src.services.handlers.request_handler.build_url', return_value="https://target.com"):
                     # Мокируем процессор контента
-                    proxy_response = ProxyResponse(
+                    proxy_response = _proxy_response(
                         status=200,
                         body=b'response',
                         headers={"content-type": "text/plain"}
@@ -569,7 +587,7 @@ class TestRequestHandler:
                     # Act
                     await request_handler._handle_encoded_request(segments, "GET", None, {}, {})
 
-        # Assert - параметр без значения должен быть добавлен как ключ с None
+        # Assert - параметр без значения должен быть добавлен как ключ с пустой строкой
 
     @pytest.mark.asyncio
     async def test_handle_encoded_request_logging(self, request_handler, mock_dependencies, caplog):
@@ -578,11 +596,11 @@ class TestRequestHandler:
         segments = ["enc", "encoded_data", "segment1"]
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.decode_base64_url', return_value="decoded_data"):
-            with patch('src.services.request_handler.parse_encoded_data', return_value=({}, [])):
-                with patch('src.services.request_handler.build_url', return_value="https://target.com"):
+        with patch('src.services.handlers.request_handler.decode_base64_url', return_value="decoded_data"):
+            with patch('src.services.handlers.request_handler.parse_encoded_data', return_value=({}, [])):
+                with patch('src.services.handlers.request_handler.build_url', return_value="https://target.com"):
                     # Мокируем процессор контента
-                    proxy_response = ProxyResponse(
+                    proxy_response = _proxy_response(
                         status=200,
                         body=b'response',
                         headers={"content-type": "text/plain"}
@@ -590,7 +608,7 @@ class TestRequestHandler:
                     mock_dependencies['content_processor'].process_content = AsyncMock(return_value=proxy_response)
 
                     # Act
-                    with caplog.at_level('INFO'):
+                    with caplog.at_level('DEBUG'):
                         await request_handler._handle_encoded_request(segments, "GET", None, {}, {})
 
         # Assert
@@ -605,9 +623,9 @@ class TestRequestHandler:
         path = "https://example.com/data"
 
         # Мокируем утилиты
-        with patch('src.services.request_handler.build_url', return_value="https://example.com/data"):
+        with patch('src.services.handlers.request_handler.build_url', return_value="https://example.com/data"):
             # Мокируем процессор контента
-            proxy_response = ProxyResponse(
+            proxy_response = _proxy_response(
                 status=200,
                 body=b'response',
                 headers={"content-type": "text/plain"}
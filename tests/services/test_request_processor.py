@@ -0,0 +1,567 @@
+import pytest
+import httpx
+from unittest.mock import Mock, AsyncMock, MagicMock, ANY
+
+from src.models.interfaces import IConfig, IHttpClientFactory, IProxyGenerator, ITimeoutConfigurator
+from src.services.processors.request_processor import RequestProcessor
+from src.services.utils.http_client_factory import PooledClient
+
+
+# Заголовки, которые процессор добавляет к каждому запросу
+DEFAULT_HEADERS = {
+    'User-Agent': 'test-user-agent',
+    'Accept': 'application/json, text/javascript, */*; q=0.01',
+    'Accept-Language': 'en-GB,en-US;q=0.9,en;q=0.8,ru;q=0.7',
+    'Cache-Control': 'no-cache',
+    'Pragma': 'no-cache',
+}
+
+
+class _AsyncContext:
+    """Асинхронный контекстный менеджер, отдающий заранее заданное значение"""
+
+    def __init__(self, value):
+        self.value = value
+
+    async def __aenter__(self):
+        return self.value
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+async def _stream_body(*chunks: bytes):
+    """Одноразовый асинхронный итератор тела, как request.stream() у Starlette"""
+    for chunk in chunks:
+        yield chunk
+
+
+class TestRequestProcessor:
+    """Тесты для RequestProcessor"""
+
+    @pytest.fixture
+    def mock_dependencies(self):
+        """Создает моки всех зависимостей"""
+        config = Mock(spec=IConfig)
+        http_factory = Mock(spec=IHttpClientFactory)
+        # create_client используется как асинхронный контекстный менеджер
+        http_factory.create_client = MagicMock()
+        proxy_generator = Mock(spec=IProxyGenerator)
+        proxy_generator.get_proxy = AsyncMock(return_value=None)
+        proxy_generator.has_proxies.return_value = False
+        timeout_configurator = Mock(spec=ITimeoutConfigurator)
+
+        # Настройка конфигурации по умолчанию
+        config.user_agent = "test-user-agent"
+        config.max_redirects = 5
+        config.log_level = 'INFO'
+
+        return {
+            'config': config,
+            'http_factory': http_factory,
+            'proxy_generator': proxy_generator,
+            'timeout_configurator': timeout_configurator
+        }
+
+    @pytest.fixture
+    def routes(self):
+        """Ответы MockTransport по пути запроса: параметры httpx.Response или исключение"""
+        return {}
+
+    @pytest.fixture
+    def sent_requests(self):
+        """Запросы, дошедшие до MockTransport"""
+        return []
+
+    @pytest.fixture(autouse=True)
+    async def transport_client(self, mock_dependencies, routes, sent_requests):
+        """Настоящий httpx-клиент, сеть подменена MockTransport. Заголовки передает PooledClient, как у фабрики"""
+        def handler(request: httpx.Request) -> httpx.Response:
+            sent_requests.append(request)
+            route = routes[request.url.path]
+            if isinstance(route, Exception):
+                raise route
+            return httpx.Response(**route)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        mock_dependencies['http_factory'].create_client.side_effect = (
+            lambda headers=None, **kwargs: _AsyncContext(PooledClient(client, dict(headers or {}))))
+        yield client
+        await client.aclose()
+
+    @pytest.fixture
+    def request_processor(self, mock_dependencies):
+        """Создает экземпляр RequestProcessor с моками зависимостей"""
+        return RequestProcessor(**mock_dependencies)
+
+    @pytest.fixture
+    def propagate_logs(self, request_processor, monkeypatch):
+        """Логгер процессора не передает записи корневому логгеру, caplog их без этого не видит"""
+        monkeypatch.setattr(request_processor.logger, 'propagate', True)
+
+    def test_initialization(self, mock_dependencies):
+        """Тест инициализации RequestProcessor"""
+        # Act
+        processor = RequestProcessor(**mock_dependencies)
+
+        # Assert
+        assert processor.config == mock_dependencies['config']
+        assert processor.http_factory == mock_dependencies['http_factory']
+        assert processor.proxy_generator == mock_dependencies['proxy_generator']
+        assert processor.timeout_configurator == mock_dependencies['timeout_configurator']
+        assert processor.logger.name == 'request-processor'
+
+    @pytest.mark.asyncio
+    async def test_process_request_success_get(self, request_processor, mock_dependencies, routes, sent_requests,
+                                               propagate_logs, caplog):
+        """Тест успешного GET запроса"""
+        # Arrange
+        target_url = "https://example.com/api/data"
+        method = "GET"
+
+        timeout = Mock()
+        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = timeout
+
+        routes['/api/data'] = {'status_code': 200, 'content': b'{"result": "success"}', 'headers': {
+            'content-type': 'application/json',
+            'set-cookie': 'session=abc123'
+        }}
+
+        # Act
+        with caplog.at_level('DEBUG', logger=request_processor.logger.name):
+            response = await request_processor.process_request(target_url, method)
+
+        # Assert
+        assert response.status == 200
+        assert response.body == b'{"result": "success"}'
+        assert response.currentUrl == target_url
+        assert response.headers['set-cookie'] == ['session=abc123']
+
+        mock_dependencies['http_factory'].create_client.assert_called_with(
+            headers=DEFAULT_HEADERS,
+            is_video=False,
+            follow_redirects=False,
+            verify_ssl=False,
+            proxy=None,
+            timeout=timeout
+        )
+        assert [request.method for request in sent_requests] == ['GET']
+        assert f"Processing {method} request to: {target_url}" in caplog.text
+        assert "Response status: 200" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_process_request_success_with_proxy(self, request_processor, mock_dependencies, routes):
+        """Тест успешного запроса с прокси"""
+        # Arrange
+        target_url = "https://example.com/api/data"
+        proxy_url = "http://proxy.example.com:8080"
+
+        mock_dependencies['proxy_generator'].has_proxies.return_value = True
+        mock_dependencies['proxy_generator'].get_proxy.return_value = proxy_url
+
+        timeout = Mock()
+        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = timeout
+
+        routes['/api/data'] = {'status_code': 200, 'content': b'response text'}
+
+        # Act
+        response = await request_processor.process_request(target_url)
+
+        # Assert
+        assert response.status == 200
+        mock_dependencies['proxy_generator'].mark_success.assert_called_with(proxy_url)
+        mock_dependencies['timeout_configurator'].create_timeout_config.assert_called_with(10)
+        mock_dependencies['http_factory'].create_client.assert_called_with(
+            headers=ANY,
+            is_video=False,
+            follow_redirects=False,
+            verify_ssl=False,
+            proxy=proxy_url,
+            timeout=timeout
+        )
+
+    @pytest.mark.asyncio
+    async def test_process_request_with_custom_headers(self, request_processor, mock_dependencies, routes):
+        """Тест запроса с кастомными заголовками"""
+        # Arrange
+        target_url = "https://example.com/api/data"
+        headers = {"Authorization": "Bearer token", "Custom-Header": "value"}
+
+        routes['/api/data'] = {'status_code': 200, 'content': b'response'}
+
+        # Act
+        await request_processor.process_request(target_url, headers=headers)
+
+        # Assert
+        call_headers = mock_dependencies['http_factory'].create_client.call_args[1]['headers']
+        assert call_headers['User-Agent'] == 'test-user-agent'  # из конфига
+        assert call_headers['Authorization'] == 'Bearer token'  # из кастомных headers
+        assert call_headers['Custom-Header'] == 'value'  # из кастомных headers
+
+    @pytest.mark.asyncio
+    async def test_process_request_post_with_dict_data(self, request_processor, routes, sent_requests):
+        """Тест POST запроса с данными в виде словаря"""
+        # Arrange
+        target_url = "https://example.com/api/data"
+        data = {"key": "value", "number": 123}
+
+        routes['/api/data'] = {'status_code': 200, 'content': b'response'}
+
+        # Act
+        await request_processor.process_request(target_url, "POST", data)
+
+        # Assert
+        assert sent_requests[0].method == 'POST'
+        assert sent_requests[0].content == b'key=value&number=123'
+
+    @pytest.mark.asyncio
+    async def test_process_request_post_with_content_data(self, request_processor, routes, sent_requests):
+        """Тест POST запроса с данными в виде контента"""
+        # Arrange
+        target_url = "https://example.com/api/data"
+        data = b"binary data content"
+
+        routes['/api/data'] = {'status_code': 200, 'content': b'response'}
+
+        # Act
+        await request_processor.process_request(target_url, "POST", data)
+
+        # Assert
+        assert sent_requests[0].content == data
+
+    @pytest.mark.asyncio
+    async def test_process_request_post_streamed_body_with_length(self, request_processor, routes, sent_requests):
+        """Тест потокового тела с известным размером: Content-Length клиента, без chunked"""
+        # Arrange
+        target_url = "https://example.com/api/upload"
+        headers = {"Content-Length": "11"}
+
+        routes['/api/upload'] = {'status_code': 200, 'content': b'ok'}
+
+        # Act
+        response = await request_processor.process_request(
+            target_url, "POST", _stream_body(b"hello ", b"world"), headers)
+
+        # Assert
+        assert response.status == 200
+        assert sent_requests[0].headers['content-length'] == '11'
+        assert 'transfer-encoding' not in sent_requests[0].headers
+        assert sent_requests[0].content == b"hello world"
+
+    @pytest.mark.asyncio
+    async def test_process_request_post_streamed_body_without_length(self, request_processor, routes, sent_requests):
+        """Тест потокового тела без известного размера: уходит chunked"""
+        # Arrange
+        target_url = "https://example.com/api/upload"
+
+        routes['/api/upload'] = {'status_code': 200, 'content': b'ok'}
+
+        # Act
+        await request_processor.process_request(target_url, "POST", _stream_body(b"hello ", b"world"))
+
+        # Assert
+        assert sent_requests[0].headers['transfer-encoding'] == 'chunked'
+        assert sent_requests[0].content == b"hello world"
+
+    @pytest.mark.asyncio
+    async def test_process_request_redirect(self, request_processor, routes, propagate_logs, caplog):
+        """Тест обработки редиректа"""
+        # Arrange
+        target_url = "https://example.com/old"
+        redirect_url = "https://example.com/new"
+
+        routes['/old'] = {'status_code': 302, 'headers': {'location': redirect_url}}
+        routes['/new'] = {'status_code': 200, 'content': b'final response'}
+
+        # Act
+        with caplog.at_level('INFO', logger=request_processor.logger.name):
+            response = await request_processor.process_request(target_url)
+
+        # Assert
+        assert response.status == 200
+        assert response.currentUrl == redirect_url
+        assert response.body == b'final response'
+        assert "Following redirect 1 to: https://example.com/new" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_process_request_redirect_relative_url(self, request_processor, routes, sent_requests):
+        """Тест обработки редиректа с относительным URL"""
+        # Arrange
+        target_url = "https://example.com/old"
+
+        routes['/old'] = {'status_code': 302, 'headers': {'location': '/new'}}
+        routes['/new'] = {'status_code': 200, 'content': b'response'}
+
+        # Act
+        response = await request_processor.process_request(target_url)
+
+        # Assert
+        assert response.currentUrl == "https://example.com/new"
+        assert str(sent_requests[1].url) == "https://example.com/new"
+
+    @pytest.mark.asyncio
+    async def test_process_request_streamed_body_across_redirect(self, request_processor, routes, sent_requests):
+        """Тест что потоковое тело повторяется при редиректе 307, а не уходит пустым"""
+        # Arrange
+        target_url = "https://example.com/old"
+        redirect_url = "https://example.com/new"
+        headers = {"Content-Length": "11"}
+
+        routes['/old'] = {'status_code': 307, 'headers': {'location': redirect_url}}
+        routes['/new'] = {'status_code': 200, 'content': b'stored'}
+
+        # Act
+        response = await request_processor.process_request(
+            target_url, "POST", _stream_body(b"hello ", b"world"), headers)
+
+        # Assert
+        assert response.status == 200
+        assert [request.method for request in sent_requests] == ['POST', 'POST']
+        assert [request.content for request in sent_requests] == [b"hello world", b"hello world"]
+        assert sent_requests[1].headers['content-length'] == '11'
+
+    @pytest.mark.asyncio
+    async def test_handle_redirect_too_many_redirects(self, request_processor, mock_dependencies):
+        """Тест превышения максимального количества редиректов"""
+        # Arrange
+        mock_dependencies['config'].max_redirects = 2
+        response = httpx.Response(302, headers={'location': 'https://example.com/loop2'})
+
+        # Act & Assert
+        with pytest.raises(ValueError, match="Too many redirects"):
+            await request_processor._handle_redirect(response, {}, 'GET', None, redirect_count=2)
+
+    @pytest.mark.asyncio
+    async def test_process_request_redirect_without_location(self, request_processor, routes):
+        """Тест редиректа без заголовка Location"""
+        # Arrange
+        routes['/redirect'] = {'status_code': 302}
+
+        # Act
+        response = await request_processor.process_request("https://example.com/redirect")
+
+        # Assert
+        assert response.status == 500
+        assert "Redirect response without Location header" in response.error
+
+    @pytest.mark.asyncio
+    async def test_process_request_timeout(self, request_processor, routes, propagate_logs, caplog):
+        """Тест обработки таймаута"""
+        # Arrange
+        target_url = "https://example.com/slow"
+        routes['/slow'] = httpx.TimeoutException("Request timed out")
+
+        # Act
+        with caplog.at_level('ERROR', logger=request_processor.logger.name):
+            response = await request_processor.process_request(target_url)
+
+        # Assert
+        assert response.status == 408
+        assert response.error == 'Request timeout'
+        assert f"✕ Request timeout: {target_url}" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_process_request_connection_error(self, request_processor, mock_dependencies, routes,
+                                                    propagate_logs, caplog):
+        """Тест обработки ошибки соединения"""
+        # Arrange
+        target_url = "https://example.com/unreachable"
+        proxy_url = "http://proxy.example.com:8080"
+
+        mock_dependencies['proxy_generator'].has_proxies.return_value = True
+        mock_dependencies['proxy_generator'].get_proxy.return_value = proxy_url
+        routes['/unreachable'] = httpx.ConnectError("Connection failed")
+
+        # Act
+        with caplog.at_level('ERROR', logger=request_processor.logger.name):
+            response = await request_processor.process_request(target_url)
+
+        # Assert
+        assert response.status == 500
+        assert 'Request failed' in response.error
+        mock_dependencies['proxy_generator'].mark_failure.assert_called_with(proxy_url)
+        assert f"✕ Request failed: {target_url}" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_process_request_unexpected_error(self, request_processor, mock_dependencies, routes,
+                                                    propagate_logs, caplog):
+        """Тест обработки неожиданной ошибки"""
+        # Arrange
+        target_url = "https://example.com/error"
+        proxy_url = "http://proxy.example.com:8080"
+
+        mock_dependencies['proxy_generator'].has_proxies.return_value = True
+        mock_dependencies['proxy_generator'].get_proxy.return_value = proxy_url
+        routes['/error'] = ValueError("Unexpected error")
+
+        # Act
+        with caplog.at_level('ERROR', logger=request_processor.logger.name):
+            response = await request_processor.process_request(target_url)
+
+        # Assert
+        assert response.status == 500
+        assert 'Unexpected error' in response.error
+        mock_dependencies['proxy_generator'].mark_failure.assert_called_with(proxy_url)
+        assert f"✕ Unexpected error: {target_url}" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_process_request_invalid_url_no_hostname(self, request_processor, sent_requests):
+        """Тест запроса с невалидным URL без hostname"""
+        # Act
+        response = await request_processor.process_request("https:///path")
+
+        # Assert
+        assert response.status == 500
+        assert 'Invalid hostname' in response.error
+        assert sent_requests == []
+
+    @pytest.mark.asyncio
+    async def test_process_request_empty_url(self, request_processor):
+        """Тест запроса с пустым URL"""
+        # Act & Assert
+        with pytest.raises(ValueError, match="Empty URL"):
+            await request_processor.process_request("")
+
+    @pytest.mark.parametrize("input_url, expected", [
+        ("https://http://example.com", "http://example.com"),
+        ("http://https://example.com", "https://example.com"),
+        ("https://https://example.com", "https://example.com"),
+        ("HTTPS://http://example.com", "http://example.com"),
+        # Снимается один протокол за вызов
+        ("https://http://https://example.com", "http://https://example.com"),
+    ])
+    def test_normalize_url_duplicate_protocol(self, request_processor, propagate_logs, caplog, input_url, expected):
+        """Тест нормализации URL с дублирующимся протоколом"""
+        # Act
+        with caplog.at_level('DEBUG', logger=request_processor.logger.name):
+            result = request_processor._normalize_url(input_url)
+
+        # Assert
+        assert result == expected
+        assert "Removed duplicate protocol" in caplog.text
+
+    def test_normalize_url_protocol_relative(self, request_processor, propagate_logs, caplog):
+        """Тест нормализации protocol-relative URL"""
+        # Act
+        with caplog.at_level('DEBUG', logger=request_processor.logger.name):
+            result = request_processor._normalize_url("//example.com/path")
+
+        # Assert
+        assert result == "https://example.com/path"
+        assert "Fixed protocol-relative URL" in caplog.text
+
+    def test_normalize_url_missing_slash(self, request_processor, propagate_logs, caplog):
+        """Тест нормализации URL с отсутствующим слэшем"""
+        # Act
+        with caplog.at_level('DEBUG', logger=request_processor.logger.name):
+            result = request_processor._normalize_url("https:/example.com")
+
+        # Assert
+        assert result == "https://example.com"
+        assert "Normalized URL: https://example.com" in caplog.text
+
+    def test_normalize_url_no_protocol(self, request_processor):
+        """Тест нормализации URL без протокола"""
+        assert request_processor._normalize_url("example.com/path") == "https://example.com/path"
+
+    def test_normalize_url_already_normalized(self, request_processor):
+        """Тест нормализации уже нормализованного URL"""
+        assert request_processor._normalize_url("https://example.com/path") == "https://example.com/path"
+
+    def test_normalize_url_empty_url(self, request_processor):
+        """Тест нормализации пустого URL"""
+        with pytest.raises(ValueError, match="Empty URL"):
+            request_processor._normalize_url("")
+
+    @pytest.mark.asyncio
+    async def test_process_request_put_method(self, request_processor, routes, sent_requests):
+        """Тест PUT запроса"""
+        # Arrange
+        routes['/api/resource'] = {'status_code': 200, 'content': b'updated'}
+
+        # Act
+        await request_processor.process_request("https://example.com/api/resource", "PUT", {"key": "value"})
+
+        # Assert
+        assert sent_requests[0].method == 'PUT'
+        assert sent_requests[0].content == b'key=value'
+
+    @pytest.mark.asyncio
+    async def test_process_request_delete_method(self, request_processor, routes, sent_requests):
+        """Тест DELETE запроса"""
+        # Arrange
+        routes['/api/resource/123'] = {'status_code': 204}
+
+        # Act
+        response = await request_processor.process_request("https://example.com/api/resource/123", "DELETE")
+
+        # Assert
+        assert response.status == 204
+        assert sent_requests[0].method == 'DELETE'
+        assert sent_requests[0].content == b''
+
+    @pytest.mark.asyncio
+    async def test_process_request_multiple_cookies(self, request_processor, routes):
+        """Тест обработки множественных cookies"""
+        # Arrange
+        routes['/api/data'] = {'status_code': 200, 'headers': [
+            ('set-cookie', 'session=abc123'),
+            ('set-cookie', 'user=john'),
+            ('content-type', 'application/json'),
+        ]}
+
+        # Act
+        response = await request_processor.process_request("https://example.com/api/data")
+
+        # Assert
+        assert response.headers['set-cookie'] == ['session=abc123', 'user=john']
+        assert response.cookie == ['session=abc123', 'user=john']
+
+    @pytest.mark.asyncio
+    async def test_process_request_case_insensitive_headers(self, request_processor, routes):
+        """Тест case-insensitive обработки заголовков"""
+        # Arrange
+        routes['/api/data'] = {'status_code': 200, 'headers': {
+            'Set-Cookie': 'session=abc123',
+            'Content-Type': 'application/json'
+        }}
+
+        # Act
+        response = await request_processor.process_request("https://example.com/api/data")
+
+        # Assert
+        assert 'set-cookie' in response.headers
+        assert 'content-type' in response.headers
+
+    @pytest.mark.asyncio
+    async def test_process_request_default_headers(self, request_processor, mock_dependencies, routes):
+        """Тест что заголовки по умолчанию устанавливаются правильно"""
+        # Arrange
+        routes['/api/data'] = {'status_code': 200, 'content': b'response'}
+
+        # Act - без передачи headers
+        await request_processor.process_request("https://example.com/api/data")
+
+        # Assert
+        call_headers = mock_dependencies['http_factory'].create_client.call_args[1]['headers']
+        for key, value in DEFAULT_HEADERS.items():
+            assert call_headers[key] == value
+
+    @pytest.mark.asyncio
+    async def test_handle_redirect_with_post_data(self, request_processor, routes, sent_requests):
+        """Тест обработки редиректа с POST данными"""
+        # Arrange
+        target_url = "https://example.com/old"
+        redirect_url = "https://example.com/new"
+        data = {"key": "value"}
+
+        # Temporary Redirect сохраняет метод и тело
+        routes['/old'] = {'status_code': 307, 'headers': {'location': redirect_url}}
+        routes['/new'] = {'status_code': 200, 'content': b'response'}
+
+        # Act
+        response = await request_processor.process_request(target_url, "POST", data)
+
+        # Assert
+        assert response.currentUrl == redirect_url
+        assert [request.content for request in sent_requests] == [b'key=value', b'key=value']
@@ -2,22 +2,29 @@ import pytest
 import httpx
 from unittest.mock import Mock
 
+from src.config.app_config import AppConfig
 from src.models.interfaces import IConfig
-from src.services.timeout_configurator import TimeoutConfigurator
+from src.services.utils.timeout_configurator import TimeoutConfigurator, _make_timeout
 
 
 class TestTimeoutConfigurator:
     """Тесты для TimeoutConfigurator"""
 
+    @pytest.fixture(autouse=True)
+    def clear_timeout_cache(self):
+        """Таймауты кэшируются на уровне модуля - каждый тест начинает с пустого кэша"""
+        _make_timeout.cache_clear()
+        yield
+        _make_timeout.cache_clear()
+
     @pytest.fixture
-    def mock_config(self):
-        """Создает мок конфигурации"""
-        config = Mock(spec=IConfig)
-        config.timeout_connect = 5.0
-        config.timeout_read = 30.0
-        config.timeout_write = 30.0
-        config.timeout_pool = 10.0
-        return config
+    def mock_config(self, monkeypatch):
+        """Создает настоящую конфигурацию с таймаутами из окружения"""
+        monkeypatch.setenv('TIMEOUT_CONNECT', '5.0')
+        monkeypatch.setenv('TIMEOUT_READ', '30.0')
+        monkeypatch.setenv('TIMEOUT_WRITE', '30.0')
+        monkeypatch.setenv('TIMEOUT_POOL', '10.0')
+        return AppConfig()
 
     @pytest.fixture
     def timeout_configurator(self, mock_config):
@@ -272,4 +279,28 @@ class TestTimeoutConfigurator:
         assert timeout.connect == mock_config.timeout_connect * multiplier
         assert timeout.read == mock_config.timeout_read * multiplier
         assert timeout.write == mock_config.timeout_write * multiplier
-        assert timeout.pool == mock_config.timeout_pool * multiplier
\ No newline at end of file
+        assert timeout.pool == mock_config.timeout_pool * multiplier
+
+    def test_create_timeout_config_cached(self, timeout_configurator, mock_config):
+        """Тест что одинаковые параметры возвращают один и тот же объект таймаута"""
+        # Act
+        first = timeout_configurator.create_timeout_config(10)
+        second = timeout_configurator.create_timeout_config(10)
+        other = timeout_configurator.create_timeout_config(30)
+
+        # Assert
+        assert first is second
+        assert other is not first
+
+    def test_cache_clear(self, timeout_configurator):
+        """Тест сброса кэша таймаутов"""
+        # Arrange
+        first = timeout_configurator.create_timeout_config(10)
+
+        # Act
+        timeout_configurator.cache_clear()
+        second = timeout_configurator.create_timeout_config(10)
+
+        # Assert
+        assert first is not second
+        assert first.connect == second.connect
@@ -1,5 +1,8 @@
 import pytest
 import asyncio
+import logging
+
+import httpx
 from unittest.mock import Mock, AsyncMock, patch, call
 from typing import Dict, Optional
 from fastapi import HTTPException
@@ -7,11 +10,25 @@ from fastapi.responses import StreamingResponse
 
 from src.models.interfaces import IConfig, IHttpClientFactory, IContentInfoGetter, IProxyGenerator, ITimeoutConfigurator
 from src.models.responses import ContentInfoResponse
-from src.services.video_streamer import VideoStreamer
+from src.services.processors.video_streamer_processor import VideoStreamerProcessor, logger as video_streamer_logger
+from src.services.utils.http_client_factory import PooledClient
+
+
+class _AsyncContext:
+    """Асинхронный контекстный менеджер, отдающий заранее заданное значение"""
+
+    def __init__(self, value):
+        self.value = value
 
+    async def __aenter__(self):
+        return self.value
 
-class TestVideoStreamer:
-    """Тесты для VideoStreamer"""
+    async def __aexit__(self, *exc_info):
+        return None
+
+
+class TestVideoStreamerProcessor:
+    """Тесты для VideoStreamerProcessor"""
 
     @pytest.fixture
     def mock_dependencies(self):
@@ -22,7 +39,11 @@ class TestVideoStreamer:
         proxy_generator = Mock(spec=IProxyGenerator)
         timeout_configurator = Mock(spec=ITimeoutConfigurator)
 
+        # В реализации create_client - asynccontextmanager, а не корутина
+        http_factory.create_client = Mock()
+
         # Настройка конфигурации по умолчанию
+        config.log_level = 'INFO'
         config.stream_chunk_size = 8192
         config.max_range_size = 10485760  # 10MB
 
@@ -34,15 +55,42 @@ class TestVideoStreamer:
             'timeout_configurator': timeout_configurator
         }
 
+    @pytest.fixture(autouse=True)
+    def capture_logs(self, monkeypatch):
+        """Логгер модуля общий и не передает записи корневому: caplog видит их только так"""
+        monkeypatch.setattr(video_streamer_logger, 'propagate', True)
+        level = video_streamer_logger.level
+        video_streamer_logger.setLevel(logging.DEBUG)
+        yield
+        video_streamer_logger.setLevel(level)
+
+    @pytest.fixture
+    async def routes(self, mock_dependencies):
+        """Ответы источника по пути запроса: фабрика httpx.Response или исключение, сеть подменена MockTransport"""
+        routes = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            route = routes[request.url.path]
+            if isinstance(route, Exception):
+                raise route
+            return route()
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        mock_dependencies['http_factory'].create_client.side_effect = (
+            lambda headers=None, **kwargs: _AsyncContext(PooledClient(client, dict(headers or {}))))
+        mock_dependencies['proxy_generator'].has_proxies.return_value = False
+        yield routes
+        await client.aclose()
+
     @pytest.fixture
     def video_streamer(self, mock_dependencies):
-        """Создает экземпляр VideoStreamer с моками зависимостей"""
-        return VideoStreamer(**mock_dependencies)
+        """Создает экземпляр VideoStreamerProcessor с моками зависимостей"""
+        return VideoStreamerProcessor(**mock_dependencies)
 
     def test_initialization(self, mock_dependencies):
         """Тест инициализации VideoStreamer"""
         # Act
-        streamer = VideoStreamer(**mock_dependencies)
+        streamer = VideoStreamerProcessor(**mock_dependencies)
 
         # Assert
         assert streamer.config == mock_dependencies['config']
@@ -50,7 +98,7 @@ class TestVideoStreamer:
         assert streamer.content_getter == mock_dependencies['content_getter']
         assert streamer.proxy_generator == mock_dependencies['proxy_generator']
         assert streamer.timeout_configurator == mock_dependencies['timeout_configurator']
-        assert streamer.logger.name == 'lampa-proxy-video-streamer'
+        assert streamer.logger.name == 'video-streamer'
 
     @pytest.mark.asyncio
     async def test_stream_video_success_without_range(self, video_streamer, mock_dependencies, caplog):
@@ -71,7 +119,7 @@ class TestVideoStreamer:
         mock_dependencies['content_getter'].get_content_info.return_value = content_info
 
         # Мокируем создание генератора потока
-        video_streamer._create_stream_generator = AsyncMock(return_value=AsyncMock())
+        video_streamer._create_stream_generator = Mock(return_value=iter(()))
 
         # Act
         with caplog.at_level('INFO'):
@@ -88,7 +136,7 @@ class TestVideoStreamer:
         mock_dependencies['content_getter'].get_content_info.assert_called_once_with(
             target_url, request_headers, use_head=True
         )
-        assert "Streaming video with range support from:" in caplog.text
+        assert "Video content detected, using streaming:" in caplog.text
         assert "Content info: status=200, size=1024000, type=video/mp4" in caplog.text
 
     @pytest.mark.asyncio
@@ -110,7 +158,7 @@ class TestVideoStreamer:
 
         mock_dependencies['content_getter'].get_content_info.return_value = content_info
 
-        video_streamer._create_stream_generator = AsyncMock(return_value=AsyncMock())
+        video_streamer._create_stream_generator = Mock(return_value=iter(()))
 
         # Act
         with caplog.at_level('INFO'):
@@ -124,7 +172,7 @@ class TestVideoStreamer:
         assert result.headers['Content-Length'] == '1000'  # 1000 bytes (0-999)
 
         assert "Requested range: 0-999 (file size: 1024000)" in caplog.text
-        assert "Sending Range to source: bytes=0-999" in caplog.text
+        assert "Streaming Range to source: bytes=0-999" in caplog.text
 
     @pytest.mark.asyncio
     async def test_stream_video_content_info_error(self, video_streamer, mock_dependencies):
@@ -152,6 +200,32 @@ class TestVideoStreamer:
         assert exc_info.value.status_code == 500
         assert "Failed to get video info: Connection failed" in str(exc_info.value.detail)
 
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status_code", [403, 404, 500])
+    async def test_stream_video_error_status(self, video_streamer, mock_dependencies, status_code, caplog):
+        """Тест что ошибочный статус пробы не превращается в пустой 200"""
+        # Arrange
+        request_headers = {}
+        mock_dependencies['content_getter'].get_content_info.return_value = ContentInfoResponse(
+            status_code=status_code,
+            content_type="text/html",
+            content_length=512,
+            accept_ranges="",
+            headers={},
+            method_used="HEAD"
+        )
+        video_streamer._create_stream_generator = Mock()
+
+        # Act
+        with caplog.at_level('WARNING'):
+            result = await video_streamer.stream_video("https://example.com/video.mp4", request_headers, "bytes=0-")
+
+        # Assert
+        assert result is None
+        assert request_headers == {}
+        video_streamer._create_stream_generator.assert_not_called()
+        assert f"Source returned status {status_code}, video streaming skipped" in caplog.text
+
     @pytest.mark.asyncio
     async def test_stream_video_unknown_file_size(self, video_streamer, mock_dependencies, caplog):
         """Тест потоковой передачи с неизвестным размером файла"""
@@ -170,7 +244,7 @@ class TestVideoStreamer:
 
         mock_dependencies['content_getter'].get_content_info.return_value = content_info
 
-        video_streamer._create_stream_generator = AsyncMock(return_value=AsyncMock())
+        video_streamer._create_stream_generator = Mock(return_value=iter(()))
 
         # Act
         with caplog.at_level('WARNING'):
@@ -183,39 +257,25 @@ class TestVideoStreamer:
         assert "File size is unknown, range requests may not work properly" in caplog.text
 
     @pytest.mark.asyncio
-    async def test_create_stream_generator_success(self, video_streamer, mock_dependencies, caplog):
+    async def test_create_stream_generator_success(self, video_streamer, mock_dependencies, routes, caplog):
         """Тест успешного создания генератора потока"""
         # Arrange
         target_url = "https://example.com/video.mp4"
         request_headers = {"Range": "bytes=0-999"}
+        timeout = Mock()
+        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = timeout
 
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = AsyncMock()
-        mock_response.status_code = 206
-        mock_response.headers = {
-            'content-type': 'video/mp4',
-            'content-range': 'bytes 0-999/1024000',
-            'content-length': '1000'
-        }
-
-        # Симулируем поток данных
         chunks = [b'chunk1', b'chunk2', b'chunk3']
-        mock_response.aiter_bytes.return_value = AsyncMock()
-        mock_response.aiter_bytes.return_value.__aiter__.return_value = iter(chunks)
 
-        mock_client.stream.return_value.__aenter__.return_value = mock_response
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        async def body():
+            for chunk in chunks:
+                yield chunk
 
-        # Act
-        generator = video_streamer._create_stream_generator(target_url, request_headers)
+        routes['/video.mp4'] = lambda: httpx.Response(
+            206, headers={'content-type': 'video/mp4', 'content-range': 'bytes 0-999/1024000'}, content=body())
 
-        # Проверяем генератор
-        received_chunks = []
-        async for chunk in generator:
-            received_chunks.append(chunk)
+        # Act
+        received_chunks = [chunk async for chunk in video_streamer._create_stream_generator(target_url, request_headers)]
 
         # Assert
         assert received_chunks == chunks
@@ -225,242 +285,139 @@ class TestVideoStreamer:
             follow_redirects=True,
             verify_ssl=False,
             proxy=None,
-            timeout=Mock()
+            timeout=timeout
         )
-        mock_client.stream.assert_called_with('GET', target_url)
+        mock_dependencies['timeout_configurator'].create_timeout_config.assert_called_with(30.0)
         assert "Source response status: 206" in caplog.text
 
     @pytest.mark.asyncio
-    async def test_create_stream_generator_with_proxy(self, video_streamer, mock_dependencies):
+    async def test_create_stream_generator_with_proxy(self, video_streamer, mock_dependencies, routes):
         """Тест создания генератора потока с прокси"""
         # Arrange
         target_url = "https://example.com/video.mp4"
         request_headers = {}
         proxy_url = "http://proxy.example.com:8080"
+        timeout = Mock()
 
         mock_dependencies['proxy_generator'].has_proxies.return_value = True
         mock_dependencies['proxy_generator'].get_proxy.return_value = proxy_url
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
+        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = timeout
 
-        mock_client = AsyncMock()
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.headers = {}
-        mock_response.aiter_bytes.return_value = AsyncMock()
-        mock_response.aiter_bytes.return_value.__aiter__.return_value = iter([b'data'])
+        async def body():
+            yield b'data'
 
-        mock_client.stream.return_value.__aenter__.return_value = mock_response
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        routes['/video.mp4'] = lambda: httpx.Response(200, content=body())
 
         # Act
         async for _ in video_streamer._create_stream_generator(target_url, request_headers):
             pass
 
         # Assert
-        mock_dependencies['proxy_generator'].mark_success.assert_called_with(proxy_url)
-        mock_dependencies['timeout_configurator'].create_timeout_config.assert_called_with(30.0)
+        mock_dependencies['proxy_generator'].mark_success.assert_called_once_with(proxy_url)
+        mock_dependencies['proxy_generator'].release.assert_called_once_with(proxy_url)
+        mock_dependencies['timeout_configurator'].create_timeout_config.assert_called_with(60.0)
         mock_dependencies['http_factory'].create_client.assert_called_with(
             headers=request_headers,
             is_video=True,
             follow_redirects=True,
             verify_ssl=False,
             proxy=proxy_url,
-            timeout=Mock()
+            timeout=timeout
         )
 
     @pytest.mark.asyncio
-    async def test_create_stream_generator_404_error(self, video_streamer, mock_dependencies, caplog):
-        """Тест обработки 404 ошибки"""
-        # Arrange
-        target_url = "https://example.com/missing-video.mp4"
-        request_headers = {}
-
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = AsyncMock()
-        mock_response.status_code = 404
-        mock_response.headers = {}
-
-        mock_client.stream.return_value.__aenter__.return_value = mock_response
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
-
-        # Act
-        generator = video_streamer._create_stream_generator(target_url, request_headers)
-
-        # Должен завершиться без данных
-        chunks = []
-        async for chunk in generator:
-            chunks.append(chunk)
-
-        # Assert
-        assert chunks == []
-        assert "Video not found (404):" in caplog.text
-
-    @pytest.mark.asyncio
-    async def test_create_stream_generator_416_error(self, video_streamer, mock_dependencies, caplog):
-        """Тест обработки 416 ошибки (Range Not Satisfiable)"""
-        # Arrange
-        target_url = "https://example.com/video.mp4"
-        request_headers = {}
-
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = AsyncMock()
-        mock_response.status_code = 416
-        mock_response.headers = {}
-
-        mock_client.stream.return_value.__aenter__.return_value = mock_response
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
-
-        # Act
-        generator = video_streamer._create_stream_generator(target_url, request_headers)
-
-        chunks = []
-        async for chunk in generator:
-            chunks.append(chunk)
-
-        # Assert
-        assert chunks == []
-        assert "Range not satisfiable (416):" in caplog.text
-
-    @pytest.mark.asyncio
-    async def test_create_stream_generator_server_error(self, video_streamer, mock_dependencies, caplog):
-        """Тест обработки ошибки сервера (5xx)"""
+    @pytest.mark.parametrize("status_code, message", [
+        (404, "Video not found (404):"),
+        (416, "Range not satisfiable (416):"),
+        (500, "Source server error 500:"),
+    ])
+    async def test_create_stream_generator_error_status(self, video_streamer, routes, caplog, status_code, message):
+        """Тест что ошибочный статус источника завершает поток без данных"""
         # Arrange
-        target_url = "https://example.com/video.mp4"
-        request_headers = {}
-
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = AsyncMock()
-        mock_response.status_code = 500
-        mock_response.headers = {}
-
-        mock_client.stream.return_value.__aenter__.return_value = mock_response
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        routes['/video.mp4'] = lambda: httpx.Response(status_code, content=b'error page')
 
         # Act
-        generator = video_streamer._create_stream_generator(target_url, request_headers)
-
-        chunks = []
-        async for chunk in generator:
-            chunks.append(chunk)
+        chunks = [chunk async for chunk in video_streamer._create_stream_generator("https://example.com/video.mp4", {})]
 
         # Assert
         assert chunks == []
-        assert "Source server error 500:" in caplog.text
+        assert message in caplog.text
 
     @pytest.mark.asyncio
-    async def test_create_stream_generator_cancelled_error(self, video_streamer, mock_dependencies, caplog):
+    async def test_create_stream_generator_cancelled_error(self, video_streamer, routes, caplog):
         """Тест обработки CancelledError"""
         # Arrange
-        target_url = "https://example.com/video.mp4"
-        request_headers = {}
-
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.headers = {}
-
-        # Симулируем CancelledError при итерации
         async def chunks_with_cancel():
             yield b'chunk1'
             raise asyncio.CancelledError()
 
-        mock_response.aiter_bytes.return_value = chunks_with_cancel()
-
-        mock_client.stream.return_value.__aenter__.return_value = mock_response
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        routes['/video.mp4'] = lambda: httpx.Response(200, content=chunks_with_cancel())
 
         # Act
-        generator = video_streamer._create_stream_generator(target_url, request_headers)
-
-        chunks = []
-        try:
-            async for chunk in generator:
-                chunks.append(chunk)
-        except asyncio.CancelledError:
-            pass
+        chunks = [chunk async for chunk in video_streamer._create_stream_generator("https://example.com/video.mp4", {})]
 
         # Assert
         assert chunks == [b'chunk1']
         assert "Video stream was cancelled by client" in caplog.text
 
     @pytest.mark.asyncio
-    async def test_create_stream_generator_exception(self, video_streamer, mock_dependencies, caplog):
+    async def test_create_stream_generator_exception(self, video_streamer, mock_dependencies, routes, caplog):
         """Тест обработки общего исключения"""
         # Arrange
-        target_url = "https://example.com/video.mp4"
-        request_headers = {}
         proxy_url = "http://proxy.example.com:8080"
 
         mock_dependencies['proxy_generator'].has_proxies.return_value = True
         mock_dependencies['proxy_generator'].get_proxy.return_value = proxy_url
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_client.stream.side_effect = Exception("Streaming error")
-
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        routes['/video.mp4'] = Exception("Streaming error")
 
         # Act
-        generator = video_streamer._create_stream_generator(target_url, request_headers)
-
-        chunks = []
-        async for chunk in generator:
-            chunks.append(chunk)
+        chunks = [chunk async for chunk in video_streamer._create_stream_generator("https://example.com/video.mp4", {})]
 
         # Assert
         assert chunks == []
-        mock_dependencies['proxy_generator'].mark_failure.assert_called_with(proxy_url)
-        assert "Video stream error: Streaming error" in caplog.text
+        mock_dependencies['proxy_generator'].mark_failure.assert_called_once_with(proxy_url)
+        mock_dependencies['proxy_generator'].release.assert_called_once_with(proxy_url)
+        assert "Unexpected video stream error: Streaming error" in caplog.text
 
     @pytest.mark.asyncio
-    async def test_create_stream_generator_stop_iteration(self, video_streamer, mock_dependencies, caplog):
+    async def test_create_stream_generator_stop_iteration(self, video_streamer, routes, caplog):
         """Тест остановки генератора при достижении ожидаемого количества байт"""
         # Arrange
-        target_url = "https://example.com/video.mp4"
-        request_headers = {}
+        async def body():
+            # Первый чанк уже достигает ожидаемого количества
+            yield b'x' * 1000
+            yield b'should_not_be_yielded'
 
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = AsyncMock()
-        mock_response.status_code = 206
-        mock_response.headers = {
-            'content-range': 'bytes 0-999/1024000',  # Ожидается 1000 байт
-            'content-length': '1000'
-        }
+        routes['/video.mp4'] = lambda: httpx.Response(
+            206, headers={'content-range': 'bytes 0-999/1024000'}, content=body())
 
-        # Первый чанк уже достигает ожидаемого количества
-        chunks = [b'x' * 1000, b'should_not_be_yielded']
-        mock_response.aiter_bytes.return_value = AsyncMock()
-        mock_response.aiter_bytes.return_value.__aiter__.return_value = iter(chunks)
+        # Act
+        received_chunks = [chunk async for chunk in video_streamer._create_stream_generator("https://example.com/video.mp4", {})]
 
-        mock_client.stream.return_value.__aenter__.return_value = mock_response
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        # Assert
+        assert received_chunks == [b'x' * 1000]
+        assert "Reached expected end of stream: 1000/1000 bytes" in caplog.text
 
-        # Act
-        generator = video_streamer._create_stream_generator(target_url, request_headers)
+    @pytest.mark.asyncio
+    async def test_create_stream_generator_progress_log(self, video_streamer, routes, caplog, monkeypatch):
+        """Тест что прогресс пишется при пересечении порога, даже если чанки не кратны шагу"""
+        # Arrange
+        monkeypatch.setattr('src.services.processors.video_streamer_processor.PROGRESS_LOG_STEP', 1000)
+
+        async def body():
+            for _ in range(7):
+                yield b'x' * 333
+
+        routes['/video.mp4'] = lambda: httpx.Response(200, content=body())
 
-        received_chunks = []
-        async for chunk in generator:
-            received_chunks.append(chunk)
+        # Act
+        with caplog.at_level('DEBUG', logger=video_streamer_logger.name):
+            async for _ in video_streamer._create_stream_generator("https://example.com/video.mp4", {}):
+                pass
 
         # Assert
-        assert len(received_chunks) == 1  # Только первый чанк
-        assert received_chunks[0] == b'x' * 1000
-        assert "Reached expected end of stream: 1000/1000 bytes" in caplog.text
+        progress = [record for record in caplog.records if record.getMessage().startswith("Stream progress")]
+        assert len(progress) == 2  # 1332 и 2331 байт
 
     def test_get_expected_bytes_from_content_range(self, video_streamer, caplog):
         """Тест получения ожидаемого количества байт из content-range"""
@@ -608,7 +565,7 @@ class TestVideoStreamer:
         file_size = 1000
 
         # Act
-        with caplog.at_level('DEBUG'):
+        with caplog.at_level('DEBUG', logger=video_streamer_logger.name):
             start, end = video_streamer._parse_range_header(range_header, file_size)
 
         # Assert
@@ -741,7 +698,7 @@ class TestVideoStreamer:
         )
 
         mock_dependencies['content_getter'].get_content_info.return_value = content_info
-        video_streamer._create_stream_generator = AsyncMock(return_value=AsyncMock())
+        video_streamer._create_stream_generator = Mock(return_value=iter(()))
 
         test_cases = [
             (None, False),  # Без range
@@ -762,34 +719,22 @@ class TestVideoStreamer:
                 assert 'Content-Range' not in result.headers
 
     @pytest.mark.asyncio
-    async def test_create_stream_generator_logging(self, video_streamer, mock_dependencies, caplog):
+    async def test_create_stream_generator_logging(self, video_streamer, routes, caplog):
         """Тест логирования в генераторе потока"""
         # Arrange
-        target_url = "https://example.com/video.mp4"
-        request_headers = {}
-
-        mock_dependencies['proxy_generator'].has_proxies.return_value = False
-        mock_dependencies['timeout_configurator'].create_timeout_config.return_value = Mock()
-
-        mock_client = AsyncMock()
-        mock_response = AsyncMock()
-        mock_response.status_code = 200
-        mock_response.headers = {
-            'content-type': 'video/mp4',
-            'content-length': '1000'
-        }
-        mock_response.aiter_bytes.return_value = AsyncMock()
-        mock_response.aiter_bytes.return_value.__aiter__.return_value = iter([b'chunk1', b'chunk2'])
+        async def body():
+            yield b'chunk1'
+            yield b'chunk2'
 
-        mock_client.stream.return_value.__aenter__.return_value = mock_response
-        mock_dependencies['http_factory'].create_client.return_value.__aenter__.return_value = mock_client
+        routes['/video.mp4'] = lambda: httpx.Response(
+            200, headers={'content-type': 'video/mp4', 'content-length': '12'}, content=body())
 
         # Act
         with caplog.at_level('INFO'):
-            async for _ in video_streamer._create_stream_generator(target_url, request_headers):
+            async for _ in video_streamer._create_stream_generator("https://example.com/video.mp4", {}):
                 pass
 
         # Assert
         assert "Video content-type: video/mp4" in caplog.text
-        assert "Content-Length: 1000" in caplog.text
-        assert "Video stream completed: 12 bytes streamed" in caplog.text  # 6 + 6 bytes
\ No newline at end of file
+        assert "Content-Length: 12" in caplog.text
+        assert "Video stream completed: 12 bytes streamed" in caplog.text  # 6 + 6 bytes
@@ -0,0 +1,207 @@
+import base64
+import json
+
+import pytest
+
+from src.utils.url_utils import (
+    build_url,
+    decode_base64_url,
+    encode_base64_url,
+    is_valid_json,
+    normalize_url,
+    parse_encoded_data,
+    parse_range_header,
+)
+
+
+class TestDecodeBase64Url:
+    """Тесты для decode_base64_url"""
+
+    @pytest.mark.parametrize("url", [
+        "https://example.com/video.mp4",
+        "https://example.com/path?query=a&b=c",
+        "https://example.com/ünïcode/файл",
+        "a",
+        "ab",
+        "abc",
+    ])
+    def test_roundtrip(self, url):
+        """Тест что закодированная без padding строка декодируется обратно"""
+        assert decode_base64_url(encode_base64_url(url)) == url
+
+    def test_urlsafe_alphabet(self):
+        """Тест URL-safe алфавита (- и _)"""
+        original = "https://example.com/?a=>>>&b=???"
+        encoded = base64.urlsafe_b64encode(original.encode()).decode().rstrip('=')
+        assert '-' in encoded or '_' in encoded
+
+        assert decode_base64_url(encoded) == original
+
+    def test_standard_alphabet(self):
+        """Тест стандартного алфавита (+ и /)"""
+        original = "https://example.com/?a=>>>&b=???"
+        encoded = base64.b64encode(original.encode()).decode()
+        assert '+' in encoded or '/' in encoded
+
+        assert decode_base64_url(encoded) == original
+
+    def test_mixed_alphabet(self):
+        """Тест строки, в которой смешаны оба алфавита"""
+        original = "https://example.com/?a=>>>&b=???"
+        encoded = base64.b64encode(original.encode()).decode().rstrip('=')
+        mixed = encoded.replace('+', '-', 1)
+        assert '+' in mixed or '/' in mixed
+
+        assert decode_base64_url(mixed) == original
+
+    def test_percent_encoded_input(self):
+        """Тест что URL-encoded base64 сначала раскодируется"""
+        original = "https://example.com/?a=>>>&b=???"
+        encoded = base64.b64encode(original.encode()).decode()
+        quoted = encoded.replace('+', '%2B').replace('/', '%2F').replace('=', '%3D')
+
+        assert decode_base64_url(quoted) == original
+
+    @pytest.mark.parametrize("value", ["a", "a" * 5])
+    def test_invalid_base64(self, value):
+        """Тест что невалидный base64 приводит к ValueError"""
+        with pytest.raises(ValueError):
+            decode_base64_url(value)
+
+    def test_invalid_utf8(self):
+        """Тест что байты не в UTF-8 приводят к ValueError"""
+        encoded = base64.urlsafe_b64encode(b'\xff\xfe').decode().rstrip('=')
+
+        with pytest.raises(ValueError, match="Invalid UTF-8"):
+            decode_base64_url(encoded)
+
+
+class TestNormalizeUrl:
+    """Тесты для normalize_url"""
+
+    @pytest.mark.parametrize("url, expected", [
+        ("https://http://example.com", "http://example.com"),
+        ("http://https://example.com", "https://example.com"),
+        ("https://https://example.com/a", "https://example.com/a"),
+        ("HTTPS://http://example.com/a", "http://example.com/a"),
+        # Снимается один протокол за вызов
+        ("https://http://https://example.com", "http://https://example.com"),
+        ("//example.com/a", "https://example.com/a"),
+        ("https:/example.com/a", "https://example.com/a"),
+        ("example.com/a", "https://example.com/a"),
+        ("http://example.com/a", "http://example.com/a"),
+    ])
+    def test_normalize(self, url, expected):
+        assert normalize_url(url) == expected
+
+    def test_empty(self):
+        with pytest.raises(ValueError, match="Empty URL"):
+            normalize_url("")
+
+
+class TestParseEncodedData:
+    """Тесты для parse_encoded_data"""
+
+    @pytest.mark.parametrize("encoded, expected", [
+        ("", ({}, [])),
+        ("https:/example.com/video.mp4", ({}, ["https:", "example.com", "video.mp4"])),
+        ("param/a=1/param/b=2/https:/example.com/v.mp4",
+         ({"a": "1", "b": "2"}, ["https:", "example.com", "v.mp4"])),
+        # Параметр в середине пути - URL это сегменты после последнего параметра
+        ("x/param/a=1/https:/example.com", ({"a": "1"}, ["https:", "example.com"])),
+        # Сегмент без '=' параметром не считается
+        ("param/novalue/param/a=1/example.com", ({"a": "1"}, ["example.com"])),
+        # URL-encoded значение раскодируется, без '%' остается как есть
+        ("param/Cookie=a%3Db%3B%20c/example.com", ({"Cookie": "a=b; c"}, ["example.com"])),
+        ("param/a=1+2/example.com", ({"a": "1+2"}, ["example.com"])),
+        # Пустой ключ и завершающий слеш
+        ("param/=1/example.com/", ({"": "1"}, ["example.com", ""])),
+        # Только параметры - URL пустой
+        ("param/a=1", ({"a": "1"}, [])),
+    ])
+    def test_parse(self, encoded, expected):
+        assert parse_encoded_data(encoded) == expected
+
+
+class TestBuildUrl:
+    """Тесты для build_url"""
+
+    @pytest.mark.parametrize("segments, query_params, expected", [
+        (["https:", "", "example.com", "a"], None, "https://example.com/a"),
+        (["https:", "example.com", "a"], None, "https://example.com/a"),
+        (["example.com/a"], {"x": "1"}, "https://example.com/a?x=1"),
+        (["https://example.com/a?y=2"], {"x": "1"}, "https://example.com/a?y=2&x=1"),
+        (["https://example.com/a?"], {"x": "1"}, "https://example.com/a?x=1"),
+        (["https://example.com/a#frag"], {"x": "1"}, "https://example.com/a?x=1#frag"),
+        (["https://example.com/a?y=2#frag"], [("x", "1"), ("x", "2")], "https://example.com/a?y=2&x=1&x=2#frag"),
+        (["https://example.com/a"], {"q": "a b&c"}, "https://example.com/a?q=a+b%26c"),
+    ])
+    def test_build(self, segments, query_params, expected):
+        assert build_url(segments, query_params) == expected
+
+    @pytest.mark.parametrize("path, expected", [
+        # Ссылка внутри текста вырезается до первого пробельного символа
+        ("junk https://example.com/v.mp4 tail", "https://example.com/v.mp4"),
+        ("prefixHTTPS://example.com/a", "HTTPS://example.com/a"),
+        ("x:// then http://example.com/b", "http://example.com/b"),
+    ])
+    def test_embedded_url(self, path, expected):
+        assert build_url([path]) == expected
+
+    @pytest.mark.parametrize("segments", [[], ["https:///path"], ["https://?q=1"]])
+    def test_invalid(self, segments):
+        with pytest.raises(ValueError):
+            build_url(segments)
+
+    def test_invalid_query_params_type(self):
+        with pytest.raises(ValueError, match="query_params must be"):
+            build_url(["https://example.com"], "x=1")
+
+
+class TestIsValidJson:
+    """Тесты для is_valid_json"""
+
+    @pytest.mark.parametrize("text", [
+        '{"a": 1}',
+        b'[1, 2, 3]',
+        '  {"a": [1, {"b": null}]}\n',
+        # Принимает json.loads, но не orjson: тело потом разбирается json.loads
+        '[NaN]',
+        '[Infinity, -Infinity]',
+        '[1e400]',
+        '["\\ud800"]',
+        b'{"a": NaN}',
+    ])
+    def test_valid(self, text):
+        assert is_valid_json(text) is True
+        json.loads(text)
+
+    @pytest.mark.parametrize("text", [
+        '', b'', '   ', '1', '"string"', 'null',
+        '{"a": 1', '[1, 2', '{"a": 1}}x', '{a: 1}', b'["\xff"]',
+    ])
+    def test_invalid(self, text):
+        assert is_valid_json(text) is False
+
+
+class TestParseRangeHeader:
+    """Тесты для parse_range_header"""
+
+    @pytest.mark.parametrize("range_header, file_size, expected", [
+        (None, 1000, (0, 999)),
+        ("", 0, (0, 0)),
+        ("bytes=100-199", 1000, (100, 199)),
+        ("bytes=500-", 1000, (500, 999)),
+        ("BYTES=10-20", 1000, (10, 20)),
+        ("bytes=500-", 0, (500, 0)),
+        ("bytes=2000-2999", 1000, (999, 999)),
+        ("bytes=500-1500", 1000, (500, 999)),
+        ("bytes=200-100", 1000, (100, 200)),
+        # Из нескольких диапазонов берется первый
+        ("bytes=0-99,200-299", 1000, (0, 99)),
+        # Неподдерживаемые форматы - весь файл
+        ("bytes=-100", 1000, (0, 999)),
+        ("invalid", 1000, (0, 999)),
+    ])
+    def test_parse(self, range_header, file_size, expected):
+        assert parse_range_header(range_header, file_size) == expected